@@ -9,6 +9,14 @@ import base64
 import traceback
 from aiohttp import web
 from version_manager import get_version
+from db_manager import DatabaseManager
+from job_scheduler import JobScheduler
+from log_writer import log_writer
+from embed_cache import embed_cache
+from static_server import StaticAssetServer
+from image_resizer import ImageResizer
+from log_dispatcher import LogDispatcher
+from message_pipeline import MessagePipeline
 import json
 from datetime import datetime, timezone, date
 
@@ -48,6 +56,16 @@ bot = commands.Bot(
     application_id=APPLICATION_ID
 )
 
+# Shared pooled SQLite connections for every cog (see db_manager.py)
+bot.db = DatabaseManager()
+# Durable timers shared by every cog (see job_scheduler.py)
+bot.scheduler = JobScheduler(bot)
+# Batched, rate-limited posting to log channels (see log_dispatcher.py)
+bot.log_dispatcher = LogDispatcher(bot)
+# One on_message listener that fans out to cog handlers (see message_pipeline.py)
+bot.message_pipeline = MessagePipeline(bot)
+bot.add_listener(bot.message_pipeline.dispatch, "on_message")
+
 # --- Capture stdout/stderr ---
 startup_output = io.StringIO()
 old_stdout = sys.stdout
@@ -55,6 +73,55 @@ old_stderr = sys.stderr
 sys.stdout = startup_output
 sys.stderr = startup_output
 
+SAVED_EMBED_DIR = os.path.join(os.path.dirname(__file__), "embed-builder-web", "data")
+
+
+def _build_sendembed(embed_data):
+    """Build the embed for a sendembed: button, or None when there is no data."""
+    if not embed_data:
+        return None
+
+    embed = discord.Embed(
+        title=embed_data.get("title"),
+        description=embed_data.get("description"),
+        color=discord.Color(embed_data.get("color", 0)) if embed_data.get("color") else None
+    )
+    
+    # Add fields
+    for field in embed_data.get("fields", []):
+        embed.add_field(
+            name=field.get("name", ""),
+            value=field.get("value", ""),
+            inline=field.get("inline", False)
+        )
+    
+    # Add footer
+    if embed_data.get("footer"):
+        footer = embed_data["footer"]
+        embed.set_footer(
+            text=footer.get("text"),
+            icon_url=footer.get("icon_url")
+        )
+    
+    # Add thumbnail
+    if embed_data.get("thumbnail"):
+        embed.set_thumbnail(url=embed_data["thumbnail"].get("url"))
+    
+    # Add image
+    if embed_data.get("image"):
+        embed.set_image(url=embed_data["image"].get("url"))
+    
+    # Add author
+    if embed_data.get("author"):
+        author = embed_data["author"]
+        embed.set_author(
+            name=author.get("name"),
+            url=author.get("url"),
+            icon_url=author.get("icon_url")
+        )
+    return embed
+
+
 @bot.event
 async def on_interaction(interaction: discord.Interaction):
     """Handle button interactions for embed sending."""
@@ -76,84 +143,36 @@ async def on_interaction(interaction: discord.Interaction):
             ephemeral_flag = parts[2]
             is_ephemeral = ephemeral_flag == "e"
             
-            # Load the embed data
-            embed_data = None
-            
-            # Check if target is a send_json:b64 format
+            # Compiled embeds are cached by payload hash / saved file (see embed_cache.py)
             if target.startswith("send_json:"):
-                import base64
-                import json
+                b64_data = target.split(":", 1)[1]
                 try:
-                    b64_data = target.split(":", 1)[1]
-                    json_text = base64.b64decode(b64_data).decode("utf-8")
-                    embed_data = json.loads(json_text)
+                    embed = embed_cache.get(
+                        embed_cache.payload_key(b64_data),
+                        lambda: _build_sendembed(json.loads(base64.b64decode(b64_data).decode("utf-8")))
+                    )
                 except Exception as e:
                     await interaction.response.send_message(f"Failed to decode embed data: {e}", ephemeral=True)
                     return
-            
+
             # Check if target is a saved embed key
             elif target:
-                import os
-                embed_dir = os.path.join(os.path.dirname(__file__), "embed-builder-web", "data")
-                os.makedirs(embed_dir, exist_ok=True)
-                embed_file = os.path.join(embed_dir, f"{target}.json")
-                
-                if os.path.exists(embed_file):
-                    try:
-                        with open(embed_file, "r", encoding="utf-8") as f:
-                            saved_data = json.load(f)
-                        embed_data = saved_data.get("embed", saved_data)
-                    except Exception as e:
-                        await interaction.response.send_message(f"Failed to load saved embed: {e}", ephemeral=True)
-                        return
-                else:
+                embed_file = os.path.join(SAVED_EMBED_DIR, f"{target}.json")
+                try:
+                    embed = embed_cache.get_file(embed_file, lambda saved: _build_sendembed(saved.get("embed", saved)))
+                except FileNotFoundError:
                     await interaction.response.send_message(f"Saved embed '{target}' not found.", ephemeral=True)
                     return
-            
-            if not embed_data:
+                except Exception as e:
+                    await interaction.response.send_message(f"Failed to load saved embed: {e}", ephemeral=True)
+                    return
+            else:
+                embed = None
+
+            if embed is None:
                 await interaction.response.send_message("No embed data found.", ephemeral=True)
                 return
-            
-            # Create Discord embed
-            embed = discord.Embed(
-                title=embed_data.get("title"),
-                description=embed_data.get("description"),
-                color=discord.Color(embed_data.get("color", 0)) if embed_data.get("color") else None
-            )
-            
-            # Add fields
-            for field in embed_data.get("fields", []):
-                embed.add_field(
-                    name=field.get("name", ""),
-                    value=field.get("value", ""),
-                    inline=field.get("inline", False)
-                )
-            
-            # Add footer
-            if embed_data.get("footer"):
-                footer = embed_data["footer"]
-                embed.set_footer(
-                    text=footer.get("text"),
-                    icon_url=footer.get("icon_url")
-                )
-            
-            # Add thumbnail
-            if embed_data.get("thumbnail"):
-                embed.set_thumbnail(url=embed_data["thumbnail"].get("url"))
-            
-            # Add image
-            if embed_data.get("image"):
-                embed.set_image(url=embed_data["image"].get("url"))
-            
-            # Add author
-            if embed_data.get("author"):
-                author = embed_data["author"]
-                embed.set_author(
-                    name=author.get("name"),
-                    url=author.get("url"),
-                    icon_url=author.get("icon_url")
-                )
-            
+
             # Send the embed (always ephemeral for button interactions)
             await interaction.response.send_message(embed=embed, ephemeral=True)
             
@@ -189,6 +208,8 @@ async def on_ready():
         print(f"Failed to DM console output: {e}")
     
     print(f"Logged in as {bot.user} (ID: {bot.user.id})")
+    # Start dispatching durable jobs (no-op after the first on_ready)
+    await bot.scheduler.start()
     await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name="High Rock"))
     
     # Send version to specified channel
@@ -317,19 +338,25 @@ async def start_webserver():
     os.makedirs(http_dir, exist_ok=True)
 
     app = web.Application()
-    app.router.add_static("/", http_dir, show_index=True)
+    # ETag/Cache-Control/304 + in-memory LRU and gzip variants (see static_server.py)
+    static = StaticAssetServer(http_dir, show_index=True)
+    # /img/<name>?w=&fmt=webp resized variants, registered before the static catch-all (see image_resizer.py)
+    resizer = ImageResizer(static)
+    resizer.add_routes(app)
+    static.add_routes(app)
 
     runner = web.AppRunner(app)
     await runner.setup()
     site = web.TCPSite(runner, "0.0.0.0", 8080)
     await site.start()
     print(f"HTTP server serving {http_dir} at http://0.0.0.0:8080")
+    return resizer
 
 # --- Main Entry ---
 async def main():
     async with bot:
         # Start HTTP server
-        await start_webserver()
+        image_resizer = await start_webserver()
 
         # Load cogs
         cogs = [
@@ -368,7 +395,21 @@ async def main():
             await load_cog_with_error_handling(cog)
         
         print("All cogs loaded. Starting bot...")
-        await bot.start(TOKEN)
+        try:
+            await bot.start(TOKEN)
+        finally:
+            # Unload cogs first so their cog_unload flushes still have the DB and the log channels
+            for extension in list(bot.extensions):
+                try:
+                    await bot.unload_extension(extension)
+                except Exception as e:
+                    print(f"Failed to unload {extension}: {e}")
+            await bot.scheduler.stop()
+            await bot.log_dispatcher.stop()
+            await bot.close()
+            await bot.db.close()
+            image_resizer.shutdown()
+            log_writer.flush()
 
 @bot.tree.command(name="sync", description="Sync slash commands (admin only).")
 async def sync_commands(interaction: discord.Interaction):
@@ -383,5 +424,18 @@ async def sync_commands(interaction: discord.Interaction):
     except Exception as e:
         await interaction.followup.send(f"❌ Sync failed: {e}", ephemeral=True)
 
+@bot.tree.command(name="pipeline_stats", description="Show on_message handler timings (admin only).")
+async def pipeline_stats(interaction: discord.Interaction):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You lack permission.", ephemeral=True)
+        return
+    lines = [f"Messages seen: **{bot.message_pipeline.messages_seen}**"]
+    for row in bot.message_pipeline.stats():
+        lines.append(
+            f"`{row['name']}` calls {row['calls']} • errors {row['errors']} • "
+            f"avg {row['avg_ms']:.2f}ms • max {row['max_ms']:.2f}ms • total {row['total_ms']:.0f}ms"
+        )
+    await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
 if __name__ == "__main__":
     asyncio.run(main())
@@ -4,8 +4,13 @@ from discord import app_commands, ui
 import os
 import datetime
 import json
+import time
 import asyncio
-import requests
+import threading
+from collections import OrderedDict
+
+import aiohttp
+from log_writer import write_log
 
 ARREST_ROLE = 1329910329701830686
 DEPLOY_ROLES = {
@@ -24,41 +29,45 @@ DEPLOY_STATE_FILE = os.path.join("data", "deployment_state.json")
 LOG_FILE = os.path.join("logs", "mdt_log.txt")
 ARREST_LOG_CHANNEL_ID = 1379091390478159972
 ARREST_ID_FILE = os.path.join("data", "arrest_id.json")
+ARREST_ID_BLOCK = int(os.getenv("ARREST_ID_BLOCK", 20))
+# Overridable so the lookups can be pointed at a local stub server
+ROBLOX_USERS_API = os.getenv("ROBLOX_USERS_API", "https://users.roblox.com")
+ROBLOX_THUMBNAILS_API = os.getenv("ROBLOX_THUMBNAILS_API", "https://thumbnails.roblox.com")
+ROBLOX_TIMEOUT = float(os.getenv("ROBLOX_TIMEOUT", 10))
+ROBLOX_CACHE_TTL = int(os.getenv("ROBLOX_CACHE_TTL", 600))
+ROBLOX_MISS_TTL = int(os.getenv("ROBLOX_MISS_TTL", 60))
+ROBLOX_CACHE_SIZE = int(os.getenv("ROBLOX_CACHE_SIZE", 1024))
+DEFAULT_AVATAR_URL = "https://tr.rbxcdn.com/6c6b8e6b7b7e7b7b7b7b7b7b7b7b7b/420/420/AvatarHeadshot/Png"
 
 def ensure_data_dirs():
     os.makedirs("data", exist_ok=True)
     os.makedirs("logs", exist_ok=True)
 
 def log_action(user, action, details):
-    ensure_data_dirs()
-    now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(f"[{now}] {user} | {action} | {details}\n")
+    write_log(LOG_FILE, action, user=str(user), user_id=getattr(user, "id", None), details=details)
 # test
 async def log_to_discord(bot, user, action, details):
-    channel = bot.get_channel(LOG_CHANNEL_ID)
-    if channel:
-        # Choose color based on action
-        if "arrest" in action.lower():
-            color = 0x8d5524  # brown for arrest log
-        elif "deployment started" in action.lower():
-            color = 0x2ecc40  # green for deployment start
-        elif "deployment ended" in action.lower():
-            color = 0xe74c3c  # red for deployment end
-        elif "location change" in action.lower() or "move" in action.lower():
-            color = 0xffd966  # yellow for move
-        else:
-            color = TAN  # default tan
-
-        embed = discord.Embed(
-            title="MDT Action Log",
-            color=color,
-            timestamp=datetime.datetime.utcnow()
-        )
-        embed.add_field(name="User", value=f"{user} ({getattr(user, 'id', 'N/A')})", inline=False)
-        embed.add_field(name="Action", value=action, inline=False)
-        embed.add_field(name="Details", value=details, inline=False)
-        await channel.send(embed=embed)
+    # Choose color based on action
+    if "arrest" in action.lower():
+        color = 0x8d5524  # brown for arrest log
+    elif "deployment started" in action.lower():
+        color = 0x2ecc40  # green for deployment start
+    elif "deployment ended" in action.lower():
+        color = 0xe74c3c  # red for deployment end
+    elif "location change" in action.lower() or "move" in action.lower():
+        color = 0xffd966  # yellow for move
+    else:
+        color = TAN  # default tan
+
+    embed = discord.Embed(
+        title="MDT Action Log",
+        color=color,
+        timestamp=datetime.datetime.utcnow()
+    )
+    embed.add_field(name="User", value=f"{user} ({getattr(user, 'id', 'N/A')})", inline=False)
+    embed.add_field(name="Action", value=action, inline=False)
+    embed.add_field(name="Details", value=details, inline=False)
+    bot.log_dispatcher.send(LOG_CHANNEL_ID, embed=embed)
 
 def load_deploy_state():
     ensure_data_dirs()
@@ -78,48 +87,158 @@ def has_arrest_role(interaction):
 def has_deploy_role(interaction):
     return any(r.id in DEPLOY_ROLES for r in getattr(interaction.user, "roles", []))
 
+class ArrestIdAllocator:
+    """
+    Hands out arrest IDs from an in-memory counter under a lock.
+    arrest_id.json only stores the high-water mark of the block reserved so far, so the
+    file is rewritten once per ARREST_ID_BLOCK IDs instead of on every arrest. A restart
+    skips the unused rest of the block: IDs can have gaps but are never handed out twice.
+    """
+
+    def __init__(self, path=ARREST_ID_FILE, block_size=ARREST_ID_BLOCK):
+        self.path = path
+        self.block_size = max(1, block_size)
+        self._lock = threading.Lock()
+        self._next = None
+        self._ceiling = None
+
+    def _read_mark(self):
+        if not os.path.exists(self.path):
+            return 1
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f).get("id", 1)
+
+    def _write_mark(self, value):
+        ensure_data_dirs()
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"id": value}, f)
+        os.replace(tmp, self.path)
+
+    def reserve(self, count=1):
+        """Reserve ``count`` consecutive IDs and return them as a range."""
+        with self._lock:
+            if self._next is None:
+                self._next = self._ceiling = self._read_mark()
+            start = self._next
+            end = start + count
+            if end > self._ceiling:
+                # Persist the new mark before any ID from the block is used
+                self._ceiling = end + self.block_size - 1
+                self._write_mark(self._ceiling)
+            self._next = end
+            return range(start, end)
+
+    def next_id(self):
+        return self.reserve(1)[0]
+
+arrest_ids = ArrestIdAllocator()
+
 def get_next_arrest_id():
-    ensure_data_dirs()
-    if not os.path.exists(ARREST_ID_FILE):
-        with open(ARREST_ID_FILE, "w", encoding="utf-8") as f:
-            json.dump({"id": 1}, f)
-        return 1
-    with open(ARREST_ID_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    arrest_id = data.get("id", 1)
-    data["id"] = arrest_id + 1
-    with open(ARREST_ID_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f)
-    return arrest_id
-
-def get_roblox_user_info(username):
-    # Get userId and displayName from username
-    url = "https://users.roblox.com/v1/usernames/users"
-    resp = requests.post(url, json={"usernames": [username], "excludeBannedUsers": False}, timeout=10)
-    if resp.status_code != 200:
-        return None
-    data = resp.json()
-    if not data["data"]:
-        return None
-    user = data["data"][0]
-    return {
-        "userId": user["id"],
-        "username": user["name"],
-        "displayName": user.get("displayName", user["name"])
-    }
-
-def get_roblox_avatar_url(user_id, size=420):
-    url = f"https://thumbnails.roblox.com/v1/users/avatar-headshot?userIds={user_id}&size={size}x{size}&format=Png&isCircular=false"
-    try:
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-        if data["data"] and "imageUrl" in data["data"][0]:
-            return data["data"][0]["imageUrl"]
-    except Exception:
-        pass
-    # fallback
-    return "https://tr.rbxcdn.com/6c6b8e6b7b7e7b7b7b7b7b7b7b7b7b/420/420/AvatarHeadshot/Png"
+    return arrest_ids.next_id()
+
+class TTLCache:
+    """Small LRU cache whose entries also expire after a per-entry TTL."""
+
+    _MISSING = object()
+
+    def __init__(self, maxsize=ROBLOX_CACHE_SIZE, ttl=ROBLOX_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key, self._MISSING)
+        if entry is self._MISSING:
+            return default
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, self._MISSING) is not self._MISSING
+
+    def set(self, key, value, ttl=None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+class RobloxClient:
+    """
+    Async Roblox API lookups over one pooled aiohttp session, with results cached
+    by lowercase username and by user id so repeat arrests don't hit the API.
+    """
+
+    def __init__(self):
+        self._session = None
+        self.users = TTLCache()
+        self.avatars = TTLCache()
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=ROBLOX_TIMEOUT),
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300)
+            )
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    async def get_user_info(self, username):
+        # Get userId and displayName from username
+        key = username.lower()
+        if key in self.users:
+            return self.users.get(key)
+        url = f"{ROBLOX_USERS_API}/v1/usernames/users"
+        async with self._get_session().post(url, json={"usernames": [username], "excludeBannedUsers": False}) as resp:
+            if resp.status != 200:
+                return None
+            data = await resp.json()
+        if not data["data"]:
+            # Cache the miss briefly so a typo retried straight away isn't another round trip
+            self.users.set(key, None, ttl=ROBLOX_MISS_TTL)
+            return None
+        user = data["data"][0]
+        info = {
+            "userId": user["id"],
+            "username": user["name"],
+            "displayName": user.get("displayName", user["name"])
+        }
+        self.users.set(key, info)
+        self.users.set(info["username"].lower(), info)
+        return info
+
+    async def get_avatar_url(self, user_id, size=420):
+        key = (user_id, size)
+        cached = self.avatars.get(key)
+        if cached:
+            return cached
+        url = f"{ROBLOX_THUMBNAILS_API}/v1/users/avatar-headshot?userIds={user_id}&size={size}x{size}&format=Png&isCircular=false"
+        try:
+            async with self._get_session().get(url) as resp:
+                resp.raise_for_status()
+                data = await resp.json()
+            if data["data"] and data["data"][0].get("imageUrl"):
+                self.avatars.set(key, data["data"][0]["imageUrl"])
+                return data["data"][0]["imageUrl"]
+        except Exception:
+            pass
+        # fallback
+        return DEFAULT_AVATAR_URL
+
+    async def lookup(self, username):
+        """(info, avatar_url) for a username; info is None if the user does not exist."""
+        # The thumbnail endpoint needs the user id, so the second call waits on the first (or the cache)
+        info = await self.get_user_info(username)
+        if not info:
+            return None, None
+        return info, await self.get_avatar_url(info["userId"])
 
 class ArrestLogModal(ui.Modal, title="Log Arrest"):
     roblox_username = ui.TextInput(label="Roblox Username", required=True)
@@ -135,21 +254,22 @@ class ArrestLogModal(ui.Modal, title="Log Arrest"):
         charges = self.charges.value.strip()
         notes = self.notes.value.strip()
         arrest_id = get_next_arrest_id()
+        # Roblox lookups can take a few seconds, acknowledge the modal first
+        await interaction.response.defer(ephemeral=True, thinking=True)
 
         # Try to get Roblox info and validate username
         info = None
         avatar_url = None
         try:
-            info = get_roblox_user_info(username)
+            info, avatar_url = await self.bot.get_cog("MDT").roblox.lookup(username)
             if not info:
-                await interaction.response.send_message(
+                await interaction.followup.send(
                     f"❌ Roblox user `{username}` does not exist. Please check the username and try again.",
                     ephemeral=True
                 )
                 return
-            avatar_url = get_roblox_avatar_url(info["userId"])
         except Exception:
-            avatar_url = "https://tr.rbxcdn.com/6c6b8e6b7b7e7b7b7b7b7b7b7b7b7b/420/420/AvatarHeadshot/Png"
+            avatar_url = DEFAULT_AVATAR_URL
 
         display_name = info["displayName"] if info else username
         roblox_username = info["username"] if info else username
@@ -189,7 +309,7 @@ class ArrestLogModal(ui.Modal, title="Log Arrest"):
         if channel:
             await channel.send(embed=embed)
 
-        await interaction.response.send_message("Arrest logged.", ephemeral=True)
+        await interaction.followup.send("Arrest logged.", ephemeral=True)
 
 class MDTView(ui.View):
     def __init__(self, bot):
@@ -397,6 +517,10 @@ class DeploymentJoinView(ui.View):
 class MDT(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.roblox = RobloxClient()
+
+    async def cog_unload(self):
+        await self.roblox.close()
 
     @app_commands.command(name="mdt", description="Open the Mobile Data Terminal.")
     @app_commands.check(lambda i: has_arrest_role(i) or has_deploy_role(i))
@@ -2,25 +2,36 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import os
+import time
+import asyncio
 import datetime
-import aiosqlite
-from typing import Optional
+from typing import Dict, Optional, Set, Tuple
+from log_writer import write_log
 
 AFK_LOG_CHANNEL_ID = 1343686645815181382
 AFK_ADMIN_ROLE_IDS = {1329910241835352064}  # Only this role can use afkremove
 AFK_LOG_FILE = os.path.join("logs", "afk.txt")
 AFK_DB_FILE = os.path.join("data", "afk.db")
 AFK_PREFIX = "[AFK] "
+# Don't repeat the notice for the same AFK user in the same channel within this many seconds
+AFK_NOTICE_WINDOW = int(os.getenv("AFK_NOTICE_WINDOW", 60))
+# Self-removals are batched and written to the DB at most this often
+AFK_FLUSH_INTERVAL = float(os.getenv("AFK_FLUSH_INTERVAL", 2.0))
 
 class AFK(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.afk_messages = {}  # user_id: (message, timestamp)
+        self._recent_notices: Dict[Tuple[int, int], float] = {}  # (channel_id, user_id): monotonic time of last notice
+        self._pending_removals: Set[int] = set()
+        self._removal_event = asyncio.Event()
+        self._db_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
 
     async def cog_load(self):
         os.makedirs("data", exist_ok=True)
         os.makedirs("logs", exist_ok=True)
-        async with aiosqlite.connect(AFK_DB_FILE) as db:
+        async with self.bot.db.acquire(AFK_DB_FILE) as db:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS afk (
                     user_id INTEGER PRIMARY KEY,
@@ -32,37 +43,81 @@ class AFK(commands.Cog):
             async with db.execute("SELECT user_id, message, timestamp FROM afk") as cursor:
                 async for row in cursor:
                     self.afk_messages[row[0]] = (row[1], row[2])
+        self._flush_task = asyncio.create_task(self._removal_writer())
+        self.bot.message_pipeline.register("afk", self.handle_message, predicate=self._wants_message)
+
+    async def cog_unload(self):
+        self.bot.message_pipeline.unregister("afk")
+        if self._flush_task:
+            self._flush_task.cancel()
+        await self._flush_removals()
+
+    async def _removal_writer(self):
+        while True:
+            await self._removal_event.wait()
+            await asyncio.sleep(AFK_FLUSH_INTERVAL)
+            self._removal_event.clear()
+            await self._flush_removals()
+
+    async def _flush_removals(self):
+        if not self._pending_removals:
+            return
+        async with self._db_lock:
+            # Skip anyone who went AFK again since the removal was queued
+            user_ids = [(uid,) for uid in self._pending_removals if uid not in self.afk_messages]
+            self._pending_removals.clear()
+            if not user_ids:
+                return
+            try:
+                async with self.bot.db.acquire(AFK_DB_FILE) as db:
+                    await db.executemany("DELETE FROM afk WHERE user_id = ?", user_ids)
+                    await db.commit()
+            except Exception as e:
+                print(f"[AFK] Failed to persist {len(user_ids)} AFK removals: {e}")
+                self._pending_removals.update(uid for (uid,) in user_ids)
+                self._removal_event.set()
+
+    def _queue_removal(self, user_id: int):
+        """Drop the user from the in-memory index now, the DB row is deleted by the write-behind task."""
+        self.afk_messages.pop(user_id, None)
+        self._pending_removals.add(user_id)
+        self._removal_event.set()
+
+    def _should_notify(self, channel_id: int, user_id: int) -> bool:
+        now = time.monotonic()
+        key = (channel_id, user_id)
+        last = self._recent_notices.get(key)
+        if last is not None and now - last < AFK_NOTICE_WINDOW:
+            return False
+        if len(self._recent_notices) > 1024:
+            self._recent_notices = {k: t for k, t in self._recent_notices.items() if now - t < AFK_NOTICE_WINDOW}
+        self._recent_notices[key] = now
+        return True
 
     async def set_afk(self, user: discord.Member, message: str):
         timestamp = datetime.datetime.utcnow().isoformat()
         self.afk_messages[user.id] = (message, timestamp)
-        async with aiosqlite.connect(AFK_DB_FILE) as db:
-            await db.execute(
-                "INSERT OR REPLACE INTO afk (user_id, message, timestamp) VALUES (?, ?, ?)",
-                (user.id, message, timestamp)
-            )
-            await db.commit()
+        self._pending_removals.discard(user.id)
+        async with self._db_lock:
+            async with self.bot.db.acquire(AFK_DB_FILE) as db:
+                await db.execute(
+                    "INSERT OR REPLACE INTO afk (user_id, message, timestamp) VALUES (?, ?, ?)",
+                    (user.id, message, timestamp)
+                )
+                await db.commit()
         await self.set_afk_nick(user)
 
     async def remove_afk(self, user: discord.Member):
-        self.afk_messages.pop(user.id, None)
-        async with aiosqlite.connect(AFK_DB_FILE) as db:
-            await db.execute("DELETE FROM afk WHERE user_id = ?", (user.id,))
-            await db.commit()
+        self._queue_removal(user.id)
         await self.remove_afk_nick(user)
 
     def log_afk_action(self, action: str, user: discord.User, moderator: discord.abc.User = None, reason: str = None):
-        now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-        with open(AFK_LOG_FILE, "a", encoding="utf-8") as f:
-            if moderator:
-                f.write(f"[{now}] {action} | User: {user} ({user.id}) | By: {moderator} ({moderator.id}) | Reason: {reason or ''}\n")
-            else:
-                f.write(f"[{now}] {action} | User: {user} ({user.id})\n")
+        if moderator:
+            write_log(AFK_LOG_FILE, action, user=str(user), user_id=user.id, by=str(moderator), by_id=moderator.id, reason=reason or "")
+        else:
+            write_log(AFK_LOG_FILE, action, user=str(user), user_id=user.id)
 
     async def send_afk_log_embed(self, guild, action, user, moderator=None, reason=None, afk_message=None):
-        channel = guild.get_channel(AFK_LOG_CHANNEL_ID)
-        if not channel:
-            return
         emoji = "💤" if action == "Set" else ("✅" if action.startswith("Removed") else "⚠️")
         embed = discord.Embed(
             title=f"{emoji} AFK {action}",
@@ -76,7 +131,7 @@ class AFK(commands.Cog):
             embed.add_field(name="AFK Message", value=afk_message, inline=False)
         if reason:
             embed.add_field(name="Reason", value=reason, inline=False)
-        await channel.send(embed=embed)
+        self.bot.log_dispatcher.send(AFK_LOG_CHANNEL_ID, embed=embed)
 
     async def set_afk_nick(self, member: discord.Member):
         if not member.display_name.startswith(AFK_PREFIX):
@@ -167,34 +222,43 @@ class AFK(commands.Cog):
         else:
             await interaction.response.send_message(f"{member.mention} is not AFK.", ephemeral=True)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
+    def _wants_message(self, message) -> bool:
+        # Most messages mention nobody and come from someone who isn't AFK
+        if message.author.id in self.afk_messages:
+            return True
+        return bool(message.mentions) and bool(self.afk_messages)
 
-        # If someone is mentioned and is AFK, respond with their AFK message (no pings)
-        mentioned_ids = {user.id for user in message.mentions if not user.bot}
-        for user_id in mentioned_ids:
-            if user_id in self.afk_messages:
-                afk_text, timestamp = self.afk_messages[user_id]
-                embed = discord.Embed(
-                    title="💤 AFK Notice",
-                    description=f"**That user is currently AFK:**\n> {afk_text}",
-                    color=discord.Color.blurple()
-                )
-                embed.set_footer(text="They will see your message when they return.")
-                await message.channel.send(embed=embed)
+    async def handle_message(self, message):
+        # Registered with the message pipeline behind _wants_message
+        author_afk = message.author.id in self.afk_messages
+
+        # If someone is mentioned and is AFK, respond with their AFK message (no pings),
+        # at most once per user per channel within AFK_NOTICE_WINDOW
+        notices = []
+        for user_id in {user.id for user in message.mentions if not user.bot}:
+            entry = self.afk_messages.get(user_id)
+            if entry is None or not self._should_notify(message.channel.id, user_id):
+                continue
+            embed = discord.Embed(
+                title="💤 AFK Notice",
+                description=f"**That user is currently AFK:**\n> {entry[0]}",
+                color=discord.Color.blurple()
+            )
+            embed.set_footer(text="They will see your message when they return.")
+            notices.append(embed)
+        if notices:
+            await message.channel.send(embeds=notices[:10])
 
         # If the author is AFK and sends a message, remove their AFK (but not if they're using the afk command)
-        if message.author.id in self.afk_messages and not message.content.lower().startswith("!afk") and not message.content.lower().startswith("/afk"):
-            await self.remove_afk(message.author)
+        if author_afk and not message.content.lower().startswith(("!afk", "/afk")):
+            self._queue_removal(message.author.id)
             embed = discord.Embed(
                 title="✅ Welcome Back!",
                 description="Your AFK status has been **removed**. Others will no longer see your AFK message.",
                 color=discord.Color.green()
             )
             embed.set_author(name=str(message.author), icon_url=message.author.display_avatar.url)
-            await message.channel.send(embed=embed)
+            await asyncio.gather(self.remove_afk_nick(message.author), message.channel.send(embed=embed))
             self.log_afk_action("Removed (Self)", message.author)
             if message.guild:
                 await self.send_afk_log_embed(message.guild, "Removed (Self)", message.author)
@@ -3,6 +3,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from discord.ui import View, Button
+from log_writer import write_log
 
 APPLICATIONS_ROLE_ID = 1355842403134603275
 APPLICATIONS_CHANNEL_ID = int(os.getenv("APPLICATIONS_CHANNEL_ID", 1329910454059008101))
@@ -18,12 +19,10 @@ os.makedirs(LOGS_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOGS_DIR, "applications_command.log")
 
 def log_application_command(user_id, open_status, trainer_availability, ping):
-    import datetime
-    timestamp = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(
-            f"[{timestamp}] User: {user_id} | Open: {open_status} | Trainer Availability: {trainer_availability} | Ping: {ping}\n"
-        )
+    write_log(
+        LOG_FILE, "applications",
+        user_id=user_id, open=open_status, trainer_availability=trainer_availability, ping=ping
+    )
 
 class ApplyButtonView(View):
     def __init__(self):
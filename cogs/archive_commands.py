@@ -1,10 +1,10 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiosqlite
 import os
 import re
 import datetime
+from log_writer import write_log
 
 ALLOWED_ROLE_IDS = [1329910280834252903, 1394667511374680105, 1355842403134603275]
 ACTION_LOG_PATH = os.path.join("logs", "archive_action_log.txt")
@@ -17,10 +17,7 @@ def has_allowed_role_appcmd(interaction: discord.Interaction):
     return any(role.id in ALLOWED_ROLE_IDS for role in getattr(interaction.user, "roles", []))
 
 def log_action(user, action, details):
-    now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    os.makedirs(os.path.dirname(ACTION_LOG_PATH), exist_ok=True)
-    with open(ACTION_LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(f"[{now}] {user} | {action} | {details}\n")
+    write_log(ACTION_LOG_PATH, action, user=str(user), user_id=getattr(user, "id", None), details=details)
 
 async def log_to_discord_channel(bot, user, action, details):
     channel = bot.get_channel(DOC_CHANNEL_ID)
@@ -76,7 +73,7 @@ class DateModal(discord.ui.Modal, title="Enter Date"):
             return
 
         db_path = os.path.join(os.getcwd(), "data", "Archive.db")
-        async with aiosqlite.connect(db_path) as db:
+        async with self.bot.db.acquire(db_path) as db:
             async with db.execute(
                 "SELECT Name, Message FROM Archive WHERE Date = ?", (date_value,)
             ) as cursor:
@@ -137,7 +134,7 @@ class LogMessage(commands.Cog):
         db_path = os.path.join(os.getcwd(), "data", "Archive.db")
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         try:
-            async with aiosqlite.connect(db_path) as db:
+            async with self.bot.db.acquire(db_path) as db:
                 await db.execute(
                     "CREATE TABLE IF NOT EXISTS Archive (Date TEXT, Name TEXT, Message TEXT)"
                 )
@@ -155,7 +152,7 @@ class LogMessage(commands.Cog):
     @commands.command(name="viewallarchives")
     async def viewallarchives(self, ctx):
         db_path = os.path.join(os.getcwd(), "data", "Archive.db")
-        async with aiosqlite.connect(db_path) as db:
+        async with self.bot.db.acquire(db_path) as db:
             async with db.execute(
                 "SELECT Date, Name FROM Archive ORDER BY Date DESC"
             ) as cursor:
@@ -181,7 +178,7 @@ class LogMessage(commands.Cog):
     @app_commands.command(name="archive-viewall", description="View all archive entries (date and name).")
     async def archive_viewall_slash(self, interaction: discord.Interaction):
         db_path = os.path.join(os.getcwd(), "data", "Archive.db")
-        async with aiosqlite.connect(db_path) as db:
+        async with self.bot.db.acquire(db_path) as db:
             async with db.execute(
                 "SELECT Date, Name FROM Archive ORDER BY Date DESC"
             ) as cursor:
@@ -226,7 +223,7 @@ class LogMessage(commands.Cog):
         db_path = os.path.join(os.getcwd(), "data", "Archive.db")
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         try:
-            async with aiosqlite.connect(db_path) as db:
+            async with self.bot.db.acquire(db_path) as db:
                 await db.execute(
                     "CREATE TABLE IF NOT EXISTS Archive (Date TEXT, Name TEXT, Message TEXT)"
                 )
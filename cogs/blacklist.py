@@ -2,10 +2,10 @@ import os
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiosqlite
 import datetime
 import uuid
 from typing import Optional
+from log_writer import write_log
 
 BLACKLIST_DB = "data/blacklist.db"
 BLACKLIST_LOG_FILE = "logs/blacklist_command.log"
@@ -23,20 +23,16 @@ EMOJI_PERMISSION = "<:Permission:1343959785095168111>"
 EMOJI_VOIDED = "<:edit_message:1343948876599787602>"
 
 def log_to_file(user_id, channel_id, message, embed=False):
-    now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    with open(BLACKLIST_LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(f"[{now}] User: {user_id} | Channel: {channel_id} | Embed: {embed} | Message: {message}\n")
-    with open(BLACKLIST_LOG_TEXT, "a", encoding="utf-8") as f:
-        f.write(f"[{now}] User: {user_id} | Channel: {channel_id} | {message}\n")
+    write_log(BLACKLIST_LOG_FILE, "message", user_id=user_id, channel_id=channel_id, embed=embed, message=message)
+    write_log(BLACKLIST_LOG_TEXT, "message", user_id=user_id, channel_id=channel_id, message=message)
 
 def log_command_to_txt(command_name, user, channel, **fields):
     log_path = os.path.join("logs", f"{command_name}.txt")
-    now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    with open(log_path, "a", encoding="utf-8") as f:
-        f.write(f"[{now}] User: {user} ({user.id}) | Channel: {channel} ({getattr(channel, 'id', channel)})\n")
-        for k, v in fields.items():
-            f.write(f"  {k}: {v}\n")
-        f.write("\n")
+    write_log(
+        log_path, command_name,
+        user=str(user), user_id=user.id, channel=str(channel), channel_id=getattr(channel, "id", channel),
+        **fields
+    )
 
 class Blacklist(commands.Cog):
     def __init__(self, bot):
@@ -44,7 +40,7 @@ class Blacklist(commands.Cog):
         self.db_path = BLACKLIST_DB
 
     async def cog_load(self):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.bot.db.acquire(self.db_path) as db:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS blacklist (
                     blacklist_id TEXT PRIMARY KEY,
@@ -66,7 +62,7 @@ class Blacklist(commands.Cog):
 
     async def add_blacklist(self, blacklist_id, user, issued_by, reason, proof, message_id=None, mcng_wide=False, ban=False):
         now = datetime.datetime.utcnow().isoformat()
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.bot.db.acquire(self.db_path) as db:
             await db.execute("""
                 INSERT INTO blacklist (
                     blacklist_id, user_id, user_name, moderator_id, moderator_name,
@@ -177,21 +173,19 @@ class Blacklist(commands.Cog):
         )
 
         # Log to logging channel
-        log_channel = interaction.guild.get_channel(BLACKLIST_LOG_CHANNEL_ID)
-        if log_channel:
-            log_embed = discord.Embed(
-                title="Blacklist Issued",
-                color=discord.Color.dark_red(),
-                timestamp=datetime.datetime.utcnow()
-            )
-            log_embed.add_field(name="User", value=f"{user} ({user.id})", inline=False)
-            log_embed.add_field(name="By", value=f"{interaction.user} ({interaction.user.id})", inline=False)
-            log_embed.add_field(name="Reason", value=reason, inline=False)
-            log_embed.add_field(name="Blacklist ID", value=blacklist_id, inline=False)
-            log_embed.add_field(name="mcng-wide", value="Yes" if mcng_wide else "No", inline=True)
-            log_embed.add_field(name="Banned", value="Yes" if ban else "No", inline=True)
-            log_embed.set_footer(text=f"Logged at {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
-            await log_channel.send(embed=log_embed)
+        log_embed = discord.Embed(
+            title="Blacklist Issued",
+            color=discord.Color.dark_red(),
+            timestamp=datetime.datetime.utcnow()
+        )
+        log_embed.add_field(name="User", value=f"{user} ({user.id})", inline=False)
+        log_embed.add_field(name="By", value=f"{interaction.user} ({interaction.user.id})", inline=False)
+        log_embed.add_field(name="Reason", value=reason, inline=False)
+        log_embed.add_field(name="Blacklist ID", value=blacklist_id, inline=False)
+        log_embed.add_field(name="mcng-wide", value="Yes" if mcng_wide else "No", inline=True)
+        log_embed.add_field(name="Banned", value="Yes" if ban else "No", inline=True)
+        log_embed.set_footer(text=f"Logged at {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
+        self.bot.log_dispatcher.send(BLACKLIST_LOG_CHANNEL_ID, embed=log_embed)
 
         # Only send a simple confirmation to the moderator, not the embed
         await interaction.response.send_message(f"User blacklisted and logged. Blacklist ID: {blacklist_id}", ephemeral=True)
@@ -204,7 +198,7 @@ class Blacklist(commands.Cog):
                 await interaction.response.send_message("You do not have permission to void blacklists.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.bot.db.acquire(self.db_path) as db:
                 cursor = await db.execute(
                     "SELECT user_id, user_name, moderator_id, moderator_name, reason, proof, date, message_id, mcng_wide, ban, voided FROM blacklist WHERE blacklist_id = ?",
                     (blacklist_id,)
@@ -270,20 +264,18 @@ class Blacklist(commands.Cog):
                 pass
 
             # Log to logging channel
-            log_channel = interaction.guild.get_channel(BLACKLIST_LOG_CHANNEL_ID)
-            if log_channel:
-                log_embed = discord.Embed(
-                    title="Blacklist Voided",
-                    color=discord.Color.green(),
-                    timestamp=datetime.datetime.utcnow()
-                )
-                log_embed.add_field(name="Blacklist ID", value=blacklist_id, inline=False)
-                log_embed.add_field(name="User", value=f"{user_name} ({user_id})", inline=False)
-                log_embed.add_field(name="By", value=f"{interaction.user} ({interaction.user.id})", inline=False)
-                log_embed.add_field(name="Original Reason", value=orig_reason, inline=False)
-                log_embed.add_field(name="Void Reason", value=reason, inline=False)
-                log_embed.set_footer(text=f"Logged at {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
-                await log_channel.send(embed=log_embed)
+            log_embed = discord.Embed(
+                title="Blacklist Voided",
+                color=discord.Color.green(),
+                timestamp=datetime.datetime.utcnow()
+            )
+            log_embed.add_field(name="Blacklist ID", value=blacklist_id, inline=False)
+            log_embed.add_field(name="User", value=f"{user_name} ({user_id})", inline=False)
+            log_embed.add_field(name="By", value=f"{interaction.user} ({interaction.user.id})", inline=False)
+            log_embed.add_field(name="Original Reason", value=orig_reason, inline=False)
+            log_embed.add_field(name="Void Reason", value=reason, inline=False)
+            log_embed.set_footer(text=f"Logged at {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
+            self.bot.log_dispatcher.send(BLACKLIST_LOG_CHANNEL_ID, embed=log_embed)
 
             # Only send the embed to the moderator as confirmation
             embed = self.get_blacklist_embed(
@@ -303,7 +295,7 @@ class Blacklist(commands.Cog):
     @app_commands.command(name="blacklist-view", description="View all details of a specific blacklist by its ID.")
     @app_commands.describe(blacklist_id="The blacklist ID to view")
     async def blacklist_view(self, interaction: discord.Interaction, blacklist_id: str):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.bot.db.acquire(self.db_path) as db:
             cursor = await db.execute(
                 "SELECT blacklist_id, user_id, user_name, moderator_id, moderator_name, reason, proof, date, mcng_wide, ban, voided, void_reason FROM blacklist WHERE blacklist_id = ?",
                 (blacklist_id,)
@@ -324,7 +316,7 @@ class Blacklist(commands.Cog):
     async def blacklist_list(self, interaction: discord.Interaction, user: discord.Member, page: Optional[int] = 1):
         PAGE_SIZE = 5
         offset = (page - 1) * PAGE_SIZE
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.bot.db.acquire(self.db_path) as db:
             cursor = await db.execute(
                 "SELECT blacklist_id, reason, date, mcng_wide, ban, voided, void_reason FROM blacklist WHERE user_id = ? ORDER BY date DESC LIMIT ? OFFSET ?",
                 (user.id, PAGE_SIZE, offset)
@@ -475,21 +467,19 @@ class Blacklist(commands.Cog):
         )
 
         # Log to logging channel
-        log_channel = interaction.guild.get_channel(BLACKLIST_LOG_CHANNEL_ID)
-        if log_channel:
-            log_embed = discord.Embed(
-                title="Blacklist Issued (by ID)",
-                color=discord.Color.dark_red(),
-                timestamp=datetime.datetime.utcnow()
-            )
-            log_embed.add_field(name="User", value=user_display, inline=False)
-            log_embed.add_field(name="By", value=f"{interaction.user} ({interaction.user.id})", inline=False)
-            log_embed.add_field(name="Reason", value=reason, inline=False)
-            log_embed.add_field(name="Blacklist ID", value=blacklist_id, inline=False)
-            log_embed.add_field(name="mcng-wide", value="Yes" if mcng_wide else "No", inline=True)
-            log_embed.add_field(name="Banned", value="Yes" if ban else "No", inline=True)
-            log_embed.set_footer(text=f"Logged at {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
-            await log_channel.send(embed=log_embed)
+        log_embed = discord.Embed(
+            title="Blacklist Issued (by ID)",
+            color=discord.Color.dark_red(),
+            timestamp=datetime.datetime.utcnow()
+        )
+        log_embed.add_field(name="User", value=user_display, inline=False)
+        log_embed.add_field(name="By", value=f"{interaction.user} ({interaction.user.id})", inline=False)
+        log_embed.add_field(name="Reason", value=reason, inline=False)
+        log_embed.add_field(name="Blacklist ID", value=blacklist_id, inline=False)
+        log_embed.add_field(name="mcng-wide", value="Yes" if mcng_wide else "No", inline=True)
+        log_embed.add_field(name="Banned", value="Yes" if ban else "No", inline=True)
+        log_embed.set_footer(text=f"Logged at {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
+        self.bot.log_dispatcher.send(BLACKLIST_LOG_CHANNEL_ID, embed=log_embed)
 
         await interaction.response.send_message(f"User blacklisted by ID and logged. Blacklist ID: {blacklist_id}", ephemeral=True)
 
@@ -528,7 +518,7 @@ class Blacklist(commands.Cog):
     async def blacklist_info_command(self, interaction: discord.Interaction):
         try:
             user_id = interaction.user.id
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.bot.db.acquire(self.db_path) as db:
                 cursor = await db.execute(
                     "SELECT blacklist_id, reason, date, mcng_wide, ban, voided, void_reason FROM blacklist WHERE user_id = ? ORDER BY date DESC",
                     (user_id,)
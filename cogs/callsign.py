@@ -4,6 +4,7 @@ from discord import app_commands
 import os
 import re
 import asyncio
+from log_writer import write_log
 
 CALLSIGN_FILE = os.path.join(os.path.dirname(__file__), "../data/callsigns.txt")
 ADMIN_ID = 840949634071658507
@@ -80,9 +81,7 @@ def callsign_sort_key(item):
     return (99, 99, 999)
 
 def log_command(user, command, detail=""):
-    os.makedirs(LOGS_DIR, exist_ok=True)
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(f"[{discord.utils.utcnow()}] {user} ({user.id}) ran {command}: {detail}\n")
+    write_log(LOG_FILE, command, user=str(user), user_id=user.id, detail=detail)
 
 def callsign_group_title(first, second):
     if first == "CO":
@@ -1,12 +1,14 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-import aiosqlite
 import os
+import time
 import random
 from datetime import datetime, timedelta
 import math
+from collections import OrderedDict
 from discord.ext.commands import cooldown, BucketType, CommandOnCooldown
+from log_writer import write_log
 
 DB_PATH = os.getenv("ECONOMY_DB_FILE", "data/economy.db")
 DAILY_AMOUNT = int(os.getenv("DAILY_AMOUNT", 250))
@@ -17,6 +19,9 @@ BANK_ROLE_TIERS = [
 ]
 
 SHOP_ITEMS_PER_PAGE = 5
+LEADERBOARD_PAGE_SIZE = 10
+LEADERBOARD_CACHE_TTL = int(os.getenv("ECON_LEADERBOARD_TTL", 30))
+INVENTORY_CACHE_SIZE = int(os.getenv("ECON_INVENTORY_CACHE_SIZE", 1000))
 ECONOMY_CHANNEL_ID = 1329910482194141185
 
 def load_shop_items():
@@ -112,21 +117,17 @@ CRIME_REWARDS = [
     {"desc": "You panicked and gave the money back. 😱", "amount": -90}
 ]
 
+ECON_LOG_FILE = os.path.join(os.path.dirname(__file__), "../logs/economy_actions.txt")
+
 def log_econ_action(command: str, user: discord.User, amount: int = None, item: str = None, extra: str = ""):
-    log_dir = os.path.join(os.path.dirname(__file__), "../logs")
-    os.makedirs(log_dir, exist_ok=True)
-    log_file = os.path.join(log_dir, "economy_actions.txt")
-    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    user_str = f"{user} ({user.id})"
-    parts = [f"[{timestamp}]", f"User: {user_str}", f"Command: {command}"]
+    fields = {"user": str(user), "user_id": user.id}
     if amount is not None:
-        parts.append(f"Amount: {amount}")
+        fields["amount"] = amount
     if item:
-        parts.append(f"Item: {item}")
+        fields["item"] = item
     if extra:
-        parts.append(f"Extra: {extra}")
-    with open(log_file, "a", encoding="utf-8") as f:
-        f.write(" | ".join(parts) + "\n")
+        fields["extra"] = extra
+    write_log(ECON_LOG_FILE, command, **fields)
 
 def economy_channel_only():
     async def predicate(ctx_or_interaction):
@@ -139,37 +140,79 @@ def economy_channel_only():
         return False
     return commands.check(predicate)
 
+# --- SCHEMA MIGRATIONS (tracked in PRAGMA user_version) ---
+async def _create_base_tables(db):
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY,
+            balance INTEGER NOT NULL,
+            last_daily TEXT,
+            last_work TEXT,
+            bank INTEGER DEFAULT 0
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS inventory (
+            user_id INTEGER,
+            item TEXT,
+            amount INTEGER,
+            value INTEGER DEFAULT NULL
+            -- No PRIMARY KEY here; SQLite will use implicit rowid
+        )
+    """)
+
+async def _add_total_column(db):
+    # Leaderboard sorts on wallet + bank, keep it as an indexed generated column
+    cursor = await db.execute("PRAGMA table_xinfo(users)")
+    if "total" not in [row[1] for row in await cursor.fetchall()]:
+        await db.execute("ALTER TABLE users ADD COLUMN total INTEGER GENERATED ALWAYS AS (balance + COALESCE(bank, 0)) VIRTUAL")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_users_total ON users (total DESC)")
+
+async def _compact_inventory(db):
+    # Fish/junk used to get one row per catch. Fold them into one row per (user, item, value)
+    # with a count in amount, which is how add_item stores them from now on.
+    await db.execute("""
+        CREATE TABLE inventory_compact (
+            user_id INTEGER,
+            item TEXT,
+            amount INTEGER,
+            value INTEGER DEFAULT NULL
+        )
+    """)
+    await db.execute("""
+        INSERT INTO inventory_compact (user_id, item, amount, value)
+        SELECT user_id, item, SUM(amount), value FROM inventory
+        GROUP BY user_id, item, value HAVING SUM(amount) > 0 ORDER BY MIN(rowid)
+    """)
+    await db.execute("DROP TABLE inventory")
+    await db.execute("ALTER TABLE inventory_compact RENAME TO inventory")
+    await db.execute("CREATE INDEX idx_inventory_user_item ON inventory (user_id, item, value)")
+    # Upsert targets for add_item: one stack per plain item, one per (item, value) for fish/junk
+    await db.execute("CREATE UNIQUE INDEX idx_inventory_plain ON inventory (user_id, item) WHERE value IS NULL")
+    await db.execute("CREATE UNIQUE INDEX idx_inventory_valued ON inventory (user_id, item, value) WHERE value IS NOT NULL")
+
+ECONOMY_MIGRATIONS = [
+    (1, _create_base_tables),
+    (2, "CREATE TABLE IF NOT EXISTS economy_meta (key TEXT PRIMARY KEY, value TEXT)"),
+    (3, _add_total_column),
+    (4, _compact_inventory),
+]
+
 class Economy(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # page -> (expires_at, rows, user_count); dropped whenever a balance changes
+        self._leaderboard_cache = {}
+        # user_id -> inventory summary, LRU-bounded; every inventory write goes through this cog and drops the entry
+        self._inventory_cache = OrderedDict()
         self.apply_bank_interest.start()
 
     async def cog_load(self):
         os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id INTEGER PRIMARY KEY,
-                    balance INTEGER NOT NULL,
-                    last_daily TEXT,
-                    last_work TEXT,
-                    bank INTEGER DEFAULT 0
-                )
-            """)
-            # --- FIXED INVENTORY TABLE ---
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS inventory (
-                    user_id INTEGER,
-                    item TEXT,
-                    amount INTEGER,
-                    value INTEGER DEFAULT NULL
-                    -- No PRIMARY KEY here; SQLite will use implicit rowid
-                )
-            """)
-            await db.commit()
+        await self.bot.db.migrate(DB_PATH, ECONOMY_MIGRATIONS)
 
     async def get_user(self, user_id):
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with self.bot.db.acquire(DB_PATH) as db:
             cursor = await db.execute("SELECT balance, last_daily, last_work, bank FROM users WHERE user_id = ?", (user_id,))
             row = await cursor.fetchone()
             if row:
@@ -182,6 +225,7 @@ class Economy(commands.Cog):
             else:
                 await db.execute("INSERT INTO users (user_id, balance, last_daily, last_work, bank) VALUES (?, ?, ?, ?, ?)", (user_id, 0, None, None, 0))
                 await db.commit()
+                self.invalidate_leaderboard()
                 return {"balance": 0, "last_daily": None, "last_work": None, "bank": 0}
 
     async def update_user(self, user_id, balance=None, last_daily=None, last_work=None, bank=None):
@@ -190,39 +234,110 @@ class Economy(commands.Cog):
         last_daily = last_daily if last_daily is not None else user["last_daily"]
         last_work = last_work if last_work is not None else user["last_work"]
         bank = bank if bank is not None else user["bank"]
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with self.bot.db.acquire(DB_PATH) as db:
             await db.execute(
                 "UPDATE users SET balance = ?, last_daily = ?, last_work = ?, bank = ? WHERE user_id = ?",
                 (balance, last_daily, last_work, bank, user_id)
             )
             await db.commit()
+        if balance != user["balance"] or bank != user["bank"]:
+            self.invalidate_leaderboard()
+
+    def invalidate_leaderboard(self):
+        self._leaderboard_cache.clear()
+
+    async def get_leaderboard_page(self, page=1):
+        """(rows, user_count) for a leaderboard page, rows are (user_id, balance, bank, total)."""
+        cached = self._leaderboard_cache.get(page)
+        if cached and cached[0] > time.monotonic():
+            return cached[1], cached[2]
+        async with self.bot.db.acquire(DB_PATH) as db:
+            cursor = await db.execute(
+                "SELECT user_id, balance, COALESCE(bank, 0), total FROM users ORDER BY total DESC LIMIT ? OFFSET ?",
+                (LEADERBOARD_PAGE_SIZE, (page - 1) * LEADERBOARD_PAGE_SIZE)
+            )
+            rows = await cursor.fetchall()
+            cursor = await db.execute("SELECT COUNT(*) FROM users")
+            user_count = (await cursor.fetchone())[0]
+        self._leaderboard_cache[page] = (time.monotonic() + LEADERBOARD_CACHE_TTL, rows, user_count)
+        return rows, user_count
 
-    # --- NEW add_item ---
     async def add_item(self, user_id, item, amount, value=None):
-        async with aiosqlite.connect(DB_PATH) as db:
-            # For fish/junk, store each instance with its value
+        async with self.bot.db.acquire(DB_PATH) as db:
             if value is not None:
-                for _ in range(amount):
-                    await db.execute(
-                        "INSERT INTO inventory (user_id, item, amount, value) VALUES (?, ?, ?, ?)",
-                        (user_id, item, 1, value)
-                    )
+                # Fish/junk: one stack per (item, value), amount counts the catches
+                await db.execute(
+                    "INSERT INTO inventory (user_id, item, amount, value) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(user_id, item, value) WHERE value IS NOT NULL DO UPDATE SET amount = amount + excluded.amount",
+                    (user_id, item, amount, value)
+                )
             else:
                 # For normal items, just update amount (value is NULL)
-                cursor = await db.execute("SELECT amount FROM inventory WHERE user_id = ? AND item = ? AND value IS NULL", (user_id, item))
-                row = await cursor.fetchone()
-                if row:
-                    await db.execute("UPDATE inventory SET amount = amount + ? WHERE user_id = ? AND item = ? AND value IS NULL", (amount, user_id, item))
-                else:
-                    await db.execute("INSERT INTO inventory (user_id, item, amount, value) VALUES (?, ?, ?, NULL)", (user_id, item, amount))
+                await db.execute(
+                    "INSERT INTO inventory (user_id, item, amount, value) VALUES (?, ?, ?, NULL) "
+                    "ON CONFLICT(user_id, item) WHERE value IS NULL DO UPDATE SET amount = amount + excluded.amount",
+                    (user_id, item, amount)
+                )
             await db.commit()
+        self.invalidate_inventory(user_id)
 
-    # --- NEW get_inventory ---
     async def get_inventory(self, user_id):
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with self.bot.db.acquire(DB_PATH) as db:
             cursor = await db.execute("SELECT item, amount, value FROM inventory WHERE user_id = ?", (user_id,))
             return await cursor.fetchall()
 
+    async def get_inventory_summary(self, user_id):
+        """[(item, count)] for everything the user owns, fish/junk stacks of all values added together."""
+        cached = self._inventory_cache.get(user_id)
+        if cached is not None:
+            self._inventory_cache.move_to_end(user_id)
+            return cached
+        async with self.bot.db.acquire(DB_PATH) as db:
+            cursor = await db.execute(
+                "SELECT item, SUM(amount) FROM inventory WHERE user_id = ? GROUP BY item HAVING SUM(amount) > 0 ORDER BY MIN(rowid)",
+                (user_id,)
+            )
+            summary = await cursor.fetchall()
+        self._inventory_cache[user_id] = summary
+        while len(self._inventory_cache) > INVENTORY_CACHE_SIZE:
+            self._inventory_cache.popitem(last=False)
+        return summary
+
+    def invalidate_inventory(self, user_id):
+        self._inventory_cache.pop(user_id, None)
+
+    async def bulk_sell(self, user_id, items, valued):
+        """
+        Sell every unit of ``items`` in one transaction: a grouped SELECT for the totals, one DELETE
+        and one balance credit. Valued rows (fish/junk) pay their stored value, plain items the shop price.
+        Returns [(item, quantity, earned)] in inventory order.
+        """
+        items = list(items)
+        placeholders = ", ".join("?" * len(items))
+        value_filter = "value IS NOT NULL" if valued else "value IS NULL"
+        sold = []
+        async with self.bot.db.transaction(DB_PATH) as db:
+            cursor = await db.execute(
+                f"SELECT item, SUM(amount), SUM(amount * COALESCE(value, 0)) FROM inventory "
+                f"WHERE user_id = ? AND {value_filter} AND amount > 0 AND item IN ({placeholders}) "
+                f"GROUP BY item ORDER BY MIN(rowid)",
+                (user_id, *items)
+            )
+            for item, quantity, value_total in await cursor.fetchall():
+                earned = value_total if valued else SHOP_ITEMS[item]["price"] * quantity
+                sold.append((item, quantity, earned))
+            if not sold:
+                return sold
+            await db.execute(
+                f"DELETE FROM inventory WHERE user_id = ? AND {value_filter} AND item IN ({placeholders})",
+                (user_id, *items)
+            )
+            await db.execute("INSERT OR IGNORE INTO users (user_id, balance, bank) VALUES (?, 0, 0)", (user_id,))
+            await db.execute("UPDATE users SET balance = balance + ? WHERE user_id = ?", (sum(earned for _, _, earned in sold), user_id))
+        self.invalidate_inventory(user_id)
+        self.invalidate_leaderboard()
+        return sold
+
     # --- DAILY ---
     def get_daily_amount(self, member):
         for role_id, amount in [
@@ -283,24 +398,40 @@ class Economy(commands.Cog):
                 return interest
         return 0.0
 
-    @tasks.loop(hours=24)
+    def get_interest_rates(self):
+        """user_id -> daily interest for every cached guild member holding a bank tier role."""
+        rates = {}
+        for guild in self.bot.guilds:
+            # Lowest tier first so a member with several tier roles ends up on the highest one
+            for role_id, interest in reversed(BANK_ROLE_TIERS):
+                role = guild.get_role(role_id)
+                if role:
+                    for member in role.members:
+                        rates[member.id] = interest
+        return rates
+
+    # Checked hourly, applied once per UTC day; the marker keeps restarts from paying twice
+    @tasks.loop(hours=1)
     async def apply_bank_interest(self):
         await self.bot.wait_until_ready()
-        async with aiosqlite.connect(DB_PATH) as db:
-            async with db.execute("SELECT user_id, bank FROM users") as cursor:
-                async for row in cursor:
-                    user_id, bank = row
-                    member = self.bot.get_user(user_id)
-                    if not member:
-                        try:
-                            member = await self.bot.fetch_user(user_id)
-                        except Exception:
-                            continue
-                    interest = self.get_bank_interest(member)
-                    if interest > 0 and bank > 0:
-                        interest_amount = int(bank * interest)
-                        await db.execute("UPDATE users SET bank = bank + ? WHERE user_id = ?", (interest_amount, user_id))
-            await db.commit()
+        today = datetime.utcnow().date().isoformat()
+        rates = self.get_interest_rates()
+        async with self.bot.db.transaction(DB_PATH) as db:
+            cursor = await db.execute("SELECT value FROM economy_meta WHERE key = 'bank_interest_date'")
+            row = await cursor.fetchone()
+            if row and row[0] == today:
+                return
+            await db.executemany(
+                "UPDATE users SET bank = bank + CAST(bank * ? AS INTEGER) WHERE user_id = ? AND bank > 0",
+                [(interest, user_id) for user_id, interest in rates.items()]
+            )
+            await db.execute(
+                "INSERT INTO economy_meta (key, value) VALUES ('bank_interest_date', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (today,)
+            )
+        print(f"[Economy] Applied bank interest for {today} to {len(rates)} tier members")
+        self.invalidate_leaderboard()
 
     # --- BALANCE ---
     @commands.command(name="bal", aliases=["balance"])
@@ -337,22 +468,13 @@ class Economy(commands.Cog):
         await self.sell_all(interaction.user, interaction)
 
     async def sell_all(self, user, destination):
-        # --- NEW LOGIC ---
-        inventory = await self.get_inventory(user.id)
+        sold = await self.bulk_sell(user.id, SHOP_ITEMS, valued=False)
         total_earned = 0
         sold_items = []
-        async with aiosqlite.connect(DB_PATH) as db:
-            for item, amount, value in inventory:
-                if amount > 0 and item in SHOP_ITEMS and value is None:
-                    price = SHOP_ITEMS[item]["price"]
-                    earned = price * amount
-                    await db.execute("UPDATE inventory SET amount = amount - ? WHERE user_id = ? AND item = ? AND value IS NULL", (amount, user.id, item))
-                    data = await self.get_user(user.id)
-                    await self.update_user(user.id, balance=data["balance"] + earned)
-                    total_earned += earned
-                    sold_items.append(f"**{item.title()}** x{amount} (**{earned}** coins)")
-                    log_econ_action("sellall", user, amount=earned, item=item, extra=f"Quantity: {amount}")
-            await db.commit()
+        for item, amount, earned in sold:
+            total_earned += earned
+            sold_items.append(f"**{item.title()}** x{amount} (**{earned}** coins)")
+            log_econ_action("sellall", user, amount=earned, item=item, extra=f"Quantity: {amount}")
         if sold_items:
             desc = "You sold:\n" + "\n".join(sold_items) + f"\n\nTotal earned: **{total_earned}** coins!"
         else:
@@ -378,40 +500,47 @@ class Economy(commands.Cog):
         await self.econ_leaderboard(interaction)
 
     async def econ_leaderboard(self, destination):
-        async with aiosqlite.connect(DB_PATH) as db:
-            cursor = await db.execute("SELECT user_id, balance, bank FROM users")
-            rows = await cursor.fetchall()
-        leaderboard = sorted(rows, key=lambda r: (r[1] or 0) + (r[2] or 0), reverse=True)[:10]
-        place_emojis = ["🥇", "🥈", "🥉"] + ["🏅"] * 7
+        guild = None
+        if hasattr(destination, "guild") and destination.guild:
+            guild = destination.guild
+        elif hasattr(destination, "user") and hasattr(destination, "guild_id"):
+            guild = self.bot.get_guild(destination.guild_id)
+        embed, total_pages = await self.get_leaderboard_embed(1, guild)
+        kwargs = {"embed": embed}
+        if total_pages > 1:
+            kwargs["view"] = EconLeaderboardView(self, guild, page=1)
+        if hasattr(destination, "response"):
+            await destination.response.send_message(**kwargs)
+        else:
+            await destination.send(**kwargs)
+
+    async def get_leaderboard_embed(self, page, guild):
+        rows, user_count = await self.get_leaderboard_page(page)
+        total_pages = max(1, math.ceil(user_count / LEADERBOARD_PAGE_SIZE))
+        place_emojis = ["🥇", "🥈", "🥉"]
+        first_rank = (page - 1) * LEADERBOARD_PAGE_SIZE + 1
 
         embed = discord.Embed(
             title="Economy Leaderboard",
-            description="Top 10 users by wallet + bank",
+            description="Top 10 users by wallet + bank" if page == 1 else f"Ranks {first_rank}-{first_rank + len(rows) - 1} by wallet + bank",
             color=0xd0b47b
         )
 
-        if not leaderboard:
+        if not rows:
             embed.description = "No users found."
         else:
             lines = []
-            guild = None
-            if hasattr(destination, "guild") and destination.guild:
-                guild = destination.guild
-            elif hasattr(destination, "user") and hasattr(destination, "guild_id"):
-                guild = self.bot.get_guild(destination.guild_id)
-            for idx, (user_id, balance, bank) in enumerate(leaderboard, start=1):
+            for idx, (user_id, balance, bank, total) in enumerate(rows, start=first_rank):
                 member = guild.get_member(user_id) if guild else None
                 name = member.mention if member else f"<@{user_id}>"
                 emoji = place_emojis[idx - 1] if idx <= len(place_emojis) else "🏅"
                 lines.append(
-                    f"{emoji} **#{idx}** {name}\nWallet: **{balance}** | Bank: **{bank}** | Total: **{balance + bank}**"
+                    f"{emoji} **#{idx}** {name}\nWallet: **{balance}** | Bank: **{bank}** | Total: **{total}**"
                 )
             embed.add_field(name="Ranks", value="\n".join(lines), inline=False)
-
-        if hasattr(destination, "response"):
-            await destination.response.send_message(embed=embed)
-        else:
-            await destination.send(embed=embed)
+        if total_pages > 1:
+            embed.set_footer(text=f"Page {page}/{total_pages}")
+        return embed, total_pages
 
     # --- WORK ---
     @commands.command(name="work")
@@ -533,35 +662,46 @@ class Economy(commands.Cog):
                     log_econ_action("sell_fail", user, item=item, extra="No items")
                 else:
                     sell_amount = min(amount, total_owned)
-                    # Get the values of the first N fish/junk
-                    async with aiosqlite.connect(DB_PATH) as db:
+                    # Take the oldest stacks first until sell_amount catches are covered
+                    sold = []
+                    async with self.bot.db.transaction(DB_PATH) as db:
                         cursor = await db.execute(
-                            "SELECT rowid, value FROM inventory WHERE user_id = ? AND item = ? AND value IS NOT NULL LIMIT ?",
-                            (user.id, item, sell_amount)
+                            "SELECT rowid, amount, value FROM inventory WHERE user_id = ? AND item = ? AND value IS NOT NULL AND amount > 0 ORDER BY rowid",
+                            (user.id, item)
                         )
-                        rows = await cursor.fetchall()
-                        if not rows:
-                            embed = discord.Embed(
-                                title="Sell",
-                                description=f"You don't have any **{item.title()}** to sell.",
-                                color=0xd0b47b
-                            )
-                            log_econ_action("sell_fail", user, item=item, extra="No items")
-                        else:
-                            total = sum(row[1] for row in rows)
-                            # Delete sold fish/junk
-                            rowids = [row[0] for row in rows]
-                            for rid in rowids:
+                        remaining = sell_amount
+                        for rid, stack, value in await cursor.fetchall():
+                            if remaining <= 0:
+                                break
+                            take = min(stack, remaining)
+                            if take == stack:
                                 await db.execute("DELETE FROM inventory WHERE rowid = ?", (rid,))
-                            await db.commit()
-                            data = await self.get_user(user.id)
-                            await self.update_user(user.id, balance=data["balance"] + total)
-                            embed = discord.Embed(
-                                title="Sell",
-                                description=f"You sold **{sell_amount} {item.title()}** for **{total}** coins!",
-                                color=0xd0b47b
-                            )
-                            log_econ_action("sell", user, amount=total, item=item, extra=f"Quantity: {sell_amount}")
+                            else:
+                                await db.execute("UPDATE inventory SET amount = amount - ? WHERE rowid = ?", (take, rid))
+                            sold.append((take, value))
+                            remaining -= take
+                        # Credit in the same transaction so the catch is never lost without a payout
+                        if sold:
+                            await db.execute("INSERT OR IGNORE INTO users (user_id, balance, bank) VALUES (?, 0, 0)", (user.id,))
+                            await db.execute("UPDATE users SET balance = balance + ? WHERE user_id = ?", (sum(take * value for take, value in sold), user.id))
+                    self.invalidate_inventory(user.id)
+                    if not sold:
+                        embed = discord.Embed(
+                            title="Sell",
+                            description=f"You don't have any **{item.title()}** to sell.",
+                            color=0xd0b47b
+                        )
+                        log_econ_action("sell_fail", user, item=item, extra="No items")
+                    else:
+                        sell_amount = sum(take for take, _ in sold)
+                        total = sum(take * value for take, value in sold)
+                        self.invalidate_leaderboard()
+                        embed = discord.Embed(
+                            title="Sell",
+                            description=f"You sold **{sell_amount} {item.title()}** for **{total}** coins!",
+                            color=0xd0b47b
+                        )
+                        log_econ_action("sell", user, amount=total, item=item, extra=f"Quantity: {sell_amount}")
             else:
                 # Normal items (static price)
                 owned = [(amt, val) for itm, amt, val in inventory if itm == item and val is None]
@@ -577,11 +717,12 @@ class Economy(commands.Cog):
                     sell_amount = min(amount, total_owned)
                     price = SHOP_ITEMS[item]["price"]
                     total = price * sell_amount
-                    async with aiosqlite.connect(DB_PATH) as db:
+                    async with self.bot.db.transaction(DB_PATH) as db:
                         await db.execute("UPDATE inventory SET amount = amount - ? WHERE user_id = ? AND item = ? AND value IS NULL", (sell_amount, user.id, item))
-                        await db.commit()
-                    data = await self.get_user(user.id)
-                    await self.update_user(user.id, balance=data["balance"] + total)
+                        await db.execute("INSERT OR IGNORE INTO users (user_id, balance, bank) VALUES (?, 0, 0)", (user.id,))
+                        await db.execute("UPDATE users SET balance = balance + ? WHERE user_id = ?", (total, user.id))
+                    self.invalidate_inventory(user.id)
+                    self.invalidate_leaderboard()
                     embed = discord.Embed(
                         title="Sell",
                         description=f"You sold **{sell_amount} {item.title()}** for **{total}** coins!",
@@ -603,15 +744,8 @@ class Economy(commands.Cog):
         await self.show_inventory(interaction.user, interaction)
 
     async def show_inventory(self, user, destination):
-        inventory = await self.get_inventory(user.id)
-        # Group by item, show total count (fish/junk and normal)
-        item_counts = {}
-        for item, amount, value in inventory:
-            if value is None:
-                item_counts[item] = item_counts.get(item, 0) + amount
-            else:
-                item_counts[item] = item_counts.get(item, 0) + 1
-        nonzero_items = [(item, amt) for item, amt in item_counts.items() if amt > 0]
+        # Grouped by item with the total count (fish/junk and normal)
+        nonzero_items = await self.get_inventory_summary(user.id)
         if not nonzero_items:
             desc = "Your inventory is empty."
         else:
@@ -629,20 +763,15 @@ class Economy(commands.Cog):
     # --- SELL AUTOCOMPLETE FOR SLASH COMMAND ---
     @sell_slash.autocomplete("item")
     async def sell_item_autocomplete(self, interaction: discord.Interaction, current: str):
-        inventory = await self.get_inventory(interaction.user.id)
-        item_counts = {}
-        for item, amount, value in inventory:
-            if value is None:
-                item_counts[item] = item_counts.get(item, 0) + amount
-            else:
-                item_counts[item] = item_counts.get(item, 0) + 1
+        # Served from the cached summary, only the first keystroke after an inventory change hits the DB
+        current = current.lower().strip()
         choices = [
             app_commands.Choice(
                 name=f"{item.title()} ({amt})",
                 value=item
             )
-            for item, amt in item_counts.items()
-            if amt > 0
+            for item, amt in await self.get_inventory_summary(interaction.user.id)
+            if item.startswith(current)
         ]
         return choices[:25]
 
@@ -656,29 +785,13 @@ class Economy(commands.Cog):
         await self.sell_all_fish(interaction.user, interaction)
 
     async def sell_all_fish(self, user, destination):
-        inventory = await self.get_inventory(user.id)
-        fish_types = FISH_TYPES + JUNK_TYPES
+        sold = await self.bulk_sell(user.id, FISH_TYPES + JUNK_TYPES, valued=True)
         total_earned = 0
         sold_items = []
-        async with aiosqlite.connect(DB_PATH) as db:
-            for item in fish_types:
-                # Get all instances with value
-                cursor = await db.execute(
-                    "SELECT rowid, value FROM inventory WHERE user_id = ? AND item = ? AND value IS NOT NULL",
-                    (user.id, item)
-                )
-                rows = await cursor.fetchall()
-                if rows:
-                    earned = sum(row[1] for row in rows)
-                    for rid, _ in rows:
-                        await db.execute("DELETE FROM inventory WHERE rowid = ?", (rid,))
-                    await db.commit()
-                    data = await self.get_user(user.id)
-                    await self.update_user(user.id, balance=data["balance"] + earned)
-                    total_earned += earned
-                    sold_items.append(f"**{item.title()}** x{len(rows)} (**{earned}** coins)")
-                    log_econ_action("sell-all-fish", user, amount=earned, item=item, extra=f"Quantity: {len(rows)}")
-            await db.commit()
+        for item, amount, earned in sold:
+            total_earned += earned
+            sold_items.append(f"**{item.title()}** x{amount} (**{earned}** coins)")
+            log_econ_action("sell-all-fish", user, amount=earned, item=item, extra=f"Quantity: {amount}")
         if sold_items:
             desc = "You sold:\n" + "\n".join(sold_items) + f"\n\nTotal earned: **{total_earned}** coins!"
         else:
@@ -1094,5 +1207,30 @@ class ShopView(discord.ui.View):
         else:
             await interaction.response.defer()
 
+class EconLeaderboardView(discord.ui.View):
+    def __init__(self, cog, guild, page=1):
+        super().__init__(timeout=60)
+        self.cog = cog
+        self.guild = guild
+        self.page = page
+
+    async def show_page(self, interaction: discord.Interaction, page):
+        embed, total_pages = await self.cog.get_leaderboard_embed(page, self.guild)
+        self.page = max(1, min(page, total_pages))
+        if self.page != page:
+            embed, total_pages = await self.cog.get_leaderboard_embed(self.page, self.guild)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page > 1:
+            await self.show_page(interaction, self.page - 1)
+        else:
+            await interaction.response.defer()
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show_page(interaction, self.page + 1)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(Economy(bot))
\ No newline at end of file
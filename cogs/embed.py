@@ -5,15 +5,14 @@ import aiosqlite
 import os
 import uuid
 from datetime import datetime
+from log_writer import write_log
 
 EMBED_CREATOR_ROLE = 1329910230066401361
 DB_PATH = os.path.join(os.path.dirname(__file__), "../data/embed_builder.db")
 LOG_PATH = os.path.join(os.path.dirname(__file__), "../logs/embed_builder.txt")
 
 def log_action(user, action, extra=""):
-    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
-    with open(LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(f"[{datetime.utcnow().isoformat()}] {user} ({user.id}) {action} {extra}\n")
+    write_log(LOG_PATH, action, user=str(user), user_id=user.id, extra=extra)
 
 class EmbedSession:
     def __init__(self, user_id):
@@ -2,10 +2,10 @@ import os
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiosqlite
 import datetime
 import uuid
 from typing import Optional
+from log_writer import log_writer, write_log
 
 INFRACTION_DB = "data/infractions.db"
 LOG_FILE = "logs/infraction_command.log"
@@ -34,20 +34,16 @@ INFRACTION_TYPES = {
 }
 
 def log_to_file(user_id, channel_id, message, embed=False):
-    now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(f"[{now}] User: {user_id} | Channel: {channel_id} | Embed: {embed} | Message: {message}\n")
-    with open(INFRACTION_LOG_TEXT, "a", encoding="utf-8") as f:
-        f.write(f"[{now}] User: {user_id} | Channel: {channel_id} | {message}\n")
+    write_log(LOG_FILE, "message", user_id=user_id, channel_id=channel_id, embed=embed, message=message)
+    write_log(INFRACTION_LOG_TEXT, "message", user_id=user_id, channel_id=channel_id, message=message)
 
 def log_command_to_txt(command_name, user, channel, **fields):
     log_path = os.path.join("logs", f"{command_name}.txt")
-    now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    with open(log_path, "a", encoding="utf-8") as f:
-        f.write(f"[{now}] User: {user} ({user.id}) | Channel: {channel} ({getattr(channel, 'id', channel)})\n")
-        for k, v in fields.items():
-            f.write(f"  {k}: {v}\n")
-        f.write("\n")
+    write_log(
+        log_path, command_name,
+        user=str(user), user_id=user.id, channel=str(channel), channel_id=getattr(channel, "id", channel),
+        **fields
+    )
 
 class ConfirmView(discord.ui.View):
     def __init__(self):
@@ -150,7 +146,7 @@ class Infraction(commands.Cog):
         self.db_path = INFRACTION_DB
 
     async def cog_load(self):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.bot.db.acquire(self.db_path) as db:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS infractions (
                     infraction_id TEXT PRIMARY KEY,
@@ -171,7 +167,7 @@ class Infraction(commands.Cog):
 
     async def add_infraction(self, infraction_id, user, issued_by, action, reason, proof, message_id=None):
         now = datetime.datetime.utcnow().isoformat()
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.bot.db.acquire(self.db_path) as db:
             await db.execute("""
                 INSERT INTO infractions (
                     infraction_id, user_id, user_name, moderator_id, moderator_name,
@@ -179,8 +175,11 @@ class Infraction(commands.Cog):
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, NULL)
             """, (infraction_id, user.id, str(user), issued_by.id, str(issued_by), action, reason, proof, now, message_id))
             await db.commit()
-        with open(INFRACTION_LOG_TEXT, "a", encoding="utf-8") as f:
-            f.write(f"[{now}] {user} ({user.id}) | By: {issued_by} ({issued_by.id}) | {action} | Reason: {reason} | Proof: {proof or 'None'} | Infraction ID: {infraction_id}\n")
+        write_log(
+            INFRACTION_LOG_TEXT, "infraction",
+            user=str(user), user_id=user.id, by=str(issued_by), by_id=issued_by.id,
+            action=action, reason=reason, proof=proof, infraction_id=infraction_id
+        )
 
     def get_infraction_embed(self, infraction_id, user, issued_by, action, reason, proof, date):
         color = INFRACTION_TYPES.get(action, {}).get("color", discord.Color.default())
@@ -477,23 +476,21 @@ class Infraction(commands.Cog):
         await interaction.followup.send(f"Infraction issued and logged. Infraction ID: {infraction_id}", ephemeral=True)
 
         # After issuing the infraction, send a log embed to the log channel
-        log_channel = interaction.guild.get_channel(INFRACTION_VIEW_CHANNEL_ID)
-        if log_channel:
-            log_embed = discord.Embed(
-                title="Infraction Issued",
-                color=discord.Color.orange(),
-                timestamp=datetime.datetime.utcnow()
-            )
-            log_embed.add_field(name="User", value=f"{personnel} ({personnel.id})", inline=False)
-            log_embed.add_field(name="By", value=f"{interaction.user} ({interaction.user.id})", inline=False)
-            log_embed.add_field(name="Action", value=action, inline=True)
-            log_embed.add_field(name="Reason", value=reason, inline=False)
-            log_embed.add_field(name="Proof", value=proof.url if proof else "None", inline=False)
-            log_embed.add_field(name="Infraction ID", value=infraction_id, inline=False)
-            log_embed.set_footer(text=f"Logged at {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
-            await log_channel.send(embed=log_embed)
-            if extra_embed:
-                await log_channel.send(embed=extra_embed)
+        log_embed = discord.Embed(
+            title="Infraction Issued",
+            color=discord.Color.orange(),
+            timestamp=datetime.datetime.utcnow()
+        )
+        log_embed.add_field(name="User", value=f"{personnel} ({personnel.id})", inline=False)
+        log_embed.add_field(name="By", value=f"{interaction.user} ({interaction.user.id})", inline=False)
+        log_embed.add_field(name="Action", value=action, inline=True)
+        log_embed.add_field(name="Reason", value=reason, inline=False)
+        log_embed.add_field(name="Proof", value=proof.url if proof else "None", inline=False)
+        log_embed.add_field(name="Infraction ID", value=infraction_id, inline=False)
+        log_embed.set_footer(text=f"Logged at {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
+        self.bot.log_dispatcher.send(INFRACTION_VIEW_CHANNEL_ID, embed=log_embed)
+        if extra_embed:
+            self.bot.log_dispatcher.send(INFRACTION_VIEW_CHANNEL_ID, embed=extra_embed)
 
     @infraction_issue.autocomplete('action')
     async def infraction_action_autocomplete(self, interaction: discord.Interaction, current: str):
@@ -506,7 +503,7 @@ class Infraction(commands.Cog):
     @app_commands.command(name="infraction-log", description="View the infraction log (last 10 entries).")
     async def infraction_log(self, interaction: discord.Interaction):
         """Show the last 10 non-voided infractions in an embed."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.bot.db.acquire(self.db_path) as db:
             cursor = await db.execute(
                 "SELECT infraction_id, user_name, moderator_name, action, reason, proof, date, voided, void_reason FROM infractions WHERE voided = 0 ORDER BY date DESC LIMIT 10"
             )
@@ -549,7 +546,7 @@ class Infraction(commands.Cog):
         if not channel:
             await ctx.send("Log channel not found.")
             return
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.bot.db.acquire(self.db_path) as db:
             cursor = await db.execute(
                 "SELECT infraction_id, user_name, moderator_name, action, reason, proof, date FROM infractions WHERE voided = 0 ORDER BY date DESC LIMIT 10"
             )
@@ -594,7 +591,7 @@ class Infraction(commands.Cog):
                 return
 
             # Fetch infraction details and message_id from the database
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.bot.db.acquire(self.db_path) as db:
                 cursor = await db.execute(
                     "SELECT user_id, user_name, action, reason, date, message_id, voided FROM infractions WHERE infraction_id = ?",
                     (infraction_id,)
@@ -616,15 +613,8 @@ class Infraction(commands.Cog):
                 )
                 await db.commit()
 
-            # Remove from logs/infraction.txt (optional, or you can keep for history)
-            log_file = os.path.join("logs", "infraction.txt")
-            if os.path.exists(log_file):
-                with open(log_file, "r", encoding="utf-8") as f:
-                    lines = f.readlines()
-                with open(log_file, "w", encoding="utf-8") as f:
-                    for line in lines:
-                        if infraction_id not in line:
-                            f.write(line)
+            # Remove from logs/infraction.txt and its rotated backups
+            log_writer.drop_matching(INFRACTION_LOG_TEXT, infraction_id)
 
             # Edit the original infraction message to show voided status
             inf_channel = interaction.guild.get_channel(INFRACTION_CHANNEL_ID)
@@ -719,21 +709,19 @@ class Infraction(commands.Cog):
             )
 
             # After voiding, send a log embed to the log channel
-            log_channel = interaction.guild.get_channel(INFRACTION_VIEW_CHANNEL_ID)
-            if log_channel:
-                log_embed = discord.Embed(
-                    title="Infraction Voided",
-                    color=discord.Color.green(),
-                    timestamp=datetime.datetime.utcnow()
-                )
-                log_embed.add_field(name="Infraction ID", value=infraction_id, inline=False)
-                log_embed.add_field(name="User", value=f"{user_name} ({user_id})", inline=False)
-                log_embed.add_field(name="By", value=f"{interaction.user} ({interaction.user.id})", inline=False)
-                log_embed.add_field(name="Original Action", value=action, inline=True)
-                log_embed.add_field(name="Original Reason", value=orig_reason, inline=False)
-                log_embed.add_field(name="Void Reason", value=reason, inline=False)
-                log_embed.set_footer(text=f"Logged at {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
-                await log_channel.send(embed=log_embed)
+            log_embed = discord.Embed(
+                title="Infraction Voided",
+                color=discord.Color.green(),
+                timestamp=datetime.datetime.utcnow()
+            )
+            log_embed.add_field(name="Infraction ID", value=infraction_id, inline=False)
+            log_embed.add_field(name="User", value=f"{user_name} ({user_id})", inline=False)
+            log_embed.add_field(name="By", value=f"{interaction.user} ({interaction.user.id})", inline=False)
+            log_embed.add_field(name="Original Action", value=action, inline=True)
+            log_embed.add_field(name="Original Reason", value=orig_reason, inline=False)
+            log_embed.add_field(name="Void Reason", value=reason, inline=False)
+            log_embed.set_footer(text=f"Logged at {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
+            self.bot.log_dispatcher.send(INFRACTION_VIEW_CHANNEL_ID, embed=log_embed)
 
             # Respond to the moderator
             embed = discord.Embed(
@@ -761,7 +749,7 @@ class Infraction(commands.Cog):
     @app_commands.command(name="infraction-view", description="View all details of a specific infraction by its ID.")
     @app_commands.describe(infraction_id="The infraction ID to view")
     async def infraction_view(self, interaction: discord.Interaction, infraction_id: str):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.bot.db.acquire(self.db_path) as db:
             cursor = await db.execute(
                 "SELECT infraction_id, user_id, user_name, moderator_id, moderator_name, action, reason, proof, date, voided, void_reason FROM infractions WHERE infraction_id = ?",
                 (infraction_id,)
@@ -793,7 +781,7 @@ class Infraction(commands.Cog):
     async def infraction_list(self, interaction: discord.Interaction, user: discord.Member, page: Optional[int] = 1):
         PAGE_SIZE = 5
         offset = (page - 1) * PAGE_SIZE
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.bot.db.acquire(self.db_path) as db:
             cursor = await db.execute(
                 "SELECT infraction_id, action, reason, date, voided, void_reason FROM infractions WHERE user_id = ? ORDER BY date DESC LIMIT ? OFFSET ?",
                 (user.id, PAGE_SIZE, offset)
@@ -1,14 +1,37 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-import aiosqlite
 import asyncio
 import os
+from bisect import bisect_right
 
 XP_PER_MESSAGE = int(os.getenv("XP_PER_MESSAGE", 10))
 XP_INCREMENT = int(os.getenv("XP_INCREMENT_PER_LEVEL", 25))
 XP_BASE = int(os.getenv("XP_BASE_REQUIREMENT", 100))
 DB_PATH = os.getenv("DB_FILE", "data/leveling.db")
+XP_FLUSH_INTERVAL = int(os.getenv("XP_FLUSH_INTERVAL", 30))  # seconds between write-behind flushes
+XP_FLUSH_THRESHOLD = int(os.getenv("XP_FLUSH_THRESHOLD", 500))  # pending users that force an early flush
+
+RANK_QUERY_CHUNK = 500  # user ids per IN (...) query, below SQLite's default 999 variable limit
+
+XP_TABLE_LEVELS = 1000  # levels precomputed up front, the table grows on demand past this
+
+
+def required_xp(level):
+    # Closed form of XP_BASE + sum(XP_BASE + XP_INCREMENT * (i - 1) for i in 1..level)
+    return XP_BASE * (level + 1) + XP_INCREMENT * level * (level - 1) // 2
+
+
+# XP_THRESHOLDS[n] is the total XP needed to move past level n
+XP_THRESHOLDS = [required_xp(level) for level in range(XP_TABLE_LEVELS)]
+
+
+def level_for_xp(xp):
+    """Return the level a user with ``xp`` total XP should be at (O(log n) lookup)."""
+    while XP_THRESHOLDS[-1] <= xp:
+        XP_THRESHOLDS.append(required_xp(len(XP_THRESHOLDS)))
+    return bisect_right(XP_THRESHOLDS, xp)
+
 
 LEVEL_ROLES = {
     5: 1368257473546551369,
@@ -30,10 +53,14 @@ class Leveling(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db_lock = asyncio.Lock()
+        # Write-behind XP buffer: cached rows are authoritative, dirty ones get flushed in batches
+        self.xp_cache = {}  # user_id: {"xp": int, "level": int}
+        self.dirty_users = set()
+        self.flushing_users = set()  # taken out of dirty_users by a flush that has not committed yet
 
     async def cog_load(self):
         os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with self.bot.db.acquire(DB_PATH) as db:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS users (
                     user_id INTEGER PRIMARY KEY,
@@ -41,43 +68,116 @@ class Leveling(commands.Cog):
                     level INTEGER NOT NULL
                 )
             """)
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_users_xp ON users (xp)")
             await db.commit()
+        self.flush_xp_loop.start()
+        self.bot.message_pipeline.register("leveling.xp", self.handle_message, guild_only=True)
+
+    async def cog_unload(self):
+        self.bot.message_pipeline.unregister("leveling.xp")
+        self.flush_xp_loop.cancel()
+        await self.flush_xp()
+
+    @tasks.loop(seconds=XP_FLUSH_INTERVAL)
+    async def flush_xp_loop(self):
+        await self.flush_xp()
+
+    async def flush_xp(self):
+        """Write every dirty cached user to leveling.db in one executemany transaction."""
+        if not self.dirty_users:
+            return
+        async with self.db_lock:
+            pending, self.dirty_users = self.dirty_users, set()
+            self.flushing_users = pending
+            rows = [(uid, self.xp_cache[uid]["xp"], self.xp_cache[uid]["level"]) for uid in pending]
+            try:
+                async with self.bot.db.transaction(DB_PATH) as db:
+                    await db.executemany(
+                        "INSERT INTO users (user_id, xp, level) VALUES (?, ?, ?) "
+                        "ON CONFLICT(user_id) DO UPDATE SET xp = excluded.xp, level = excluded.level",
+                        rows
+                    )
+            except Exception as e:
+                # Keep the rows pending so the next flush retries them
+                self.dirty_users |= pending
+                print(f"[Leveling] Failed to flush {len(rows)} XP rows: {e}")
+            finally:
+                self.flushing_users = set()
 
     def calculate_required_xp(self, level):
         # Progressive XP: Each level requires previous + XP_BASE + (XP_INCREMENT * (level-1))
-        if level == 0:
-            return XP_BASE
-        xp = XP_BASE
-        for i in range(1, level + 1):
-            xp += XP_BASE + XP_INCREMENT * (i - 1)
-        return xp
+        if level < len(XP_THRESHOLDS):
+            return XP_THRESHOLDS[level]
+        return required_xp(level)
 
-    async def get_user_data(self, user_id):
+    async def recalculate_levels(self):
+        """Re-derive every stored level from its XP. Returns how many rows changed."""
+        await self.flush_xp()
         async with self.db_lock:
-            async with aiosqlite.connect(DB_PATH) as db:
-                cursor = await db.execute("SELECT xp, level FROM users WHERE user_id = ?", (user_id,))
-                row = await cursor.fetchone()
-                if row:
-                    return {"xp": row[0], "level": row[1]}
-                else:
-                    await db.execute("INSERT INTO users (user_id, xp, level) VALUES (?, ?, ?)", (user_id, 0, 0))
-                    await db.commit()
-                    return {"xp": 0, "level": 0}
+            async with self.bot.db.transaction(DB_PATH) as db:
+                cursor = await db.execute("SELECT user_id, xp, level FROM users")
+                rows = await cursor.fetchall()
+                changed = []
+                for user_id, xp, level in rows:
+                    new_level = level_for_xp(xp)
+                    if new_level != level:
+                        changed.append((new_level, user_id))
+                if changed:
+                    await db.executemany("UPDATE users SET level = ? WHERE user_id = ?", changed)
+            for level, user_id in changed:
+                if user_id in self.xp_cache:
+                    self.xp_cache[user_id]["level"] = level
+        return len(changed)
+
+    async def get_user_data(self, user_id):
+        cached = self.xp_cache.get(user_id)
+        if cached is None:
+            async with self.db_lock:
+                cached = self.xp_cache.get(user_id)
+                if cached is None:
+                    async with self.bot.db.acquire(DB_PATH) as db:
+                        cursor = await db.execute("SELECT xp, level FROM users WHERE user_id = ?", (user_id,))
+                        row = await cursor.fetchone()
+                    cached = {"xp": row[0], "level": row[1]} if row else {"xp": 0, "level": 0}
+                    self.xp_cache[user_id] = cached
+        return dict(cached)
 
     async def update_user_data(self, user_id, xp, level):
-        async with self.db_lock:
-            async with aiosqlite.connect(DB_PATH) as db:
-                await db.execute("UPDATE users SET xp = ?, level = ? WHERE user_id = ?", (xp, level, user_id))
-                await db.commit()
+        self.xp_cache[user_id] = {"xp": xp, "level": level}
+        self.dirty_users.add(user_id)
+        if len(self.dirty_users) >= XP_FLUSH_THRESHOLD:
+            await self.flush_xp()
 
     async def get_rank(self, user_id):
-        async with aiosqlite.connect(DB_PATH) as db:
-            cursor = await db.execute("SELECT user_id, xp FROM users ORDER BY xp DESC")
-            users = await cursor.fetchall()
-            for index, (uid, _) in enumerate(users, start=1):
-                if uid == user_id:
-                    return index
-        return None
+        """
+        1-based rank by XP, or None for a user with no XP stored yet. Buffered (unflushed) users
+        are ranked by their cached XP, so this never has to flush the write-behind buffer first.
+        """
+        unflushed = self.dirty_users | self.flushing_users
+        async with self.bot.db.acquire(DB_PATH) as db:
+            if user_id in unflushed:
+                xp = self.xp_cache[user_id]["xp"]
+            else:
+                cursor = await db.execute("SELECT xp FROM users WHERE user_id = ?", (user_id,))
+                row = await cursor.fetchone()
+                if not row:
+                    return None
+                xp = row[0]
+            # Range count on idx_users_xp instead of pulling the whole table into Python
+            cursor = await db.execute("SELECT COUNT(*) FROM users WHERE xp > ?", (xp,))
+            (ahead,) = await cursor.fetchone()
+            # XP only grows, so a buffered user is missing from that count only while its stored XP is <= xp
+            passing = [uid for uid in unflushed if uid != user_id and self.xp_cache[uid]["xp"] > xp]
+            for start in range(0, len(passing), RANK_QUERY_CHUNK):
+                chunk = passing[start:start + RANK_QUERY_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor = await db.execute(
+                    f"SELECT COUNT(*) FROM users WHERE xp > ? AND user_id IN ({placeholders})",
+                    (xp, *chunk)
+                )
+                (already_counted,) = await cursor.fetchone()
+                ahead += len(chunk) - already_counted
+        return ahead + 1
 
     async def handle_role_rewards(self, member: discord.Member, level: int):
         awarded_role_id = LEVEL_ROLES.get(level)
@@ -94,20 +194,15 @@ class Leveling(commands.Cog):
         await member.add_roles(awarded_role)
         return awarded_role
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot or not message.guild:
-            return
-
+    async def handle_message(self, message):
+        # Registered with the message pipeline: only non-bot guild messages get here
         user_id = message.author.id
         data = await self.get_user_data(user_id)
         data["xp"] += XP_PER_MESSAGE
 
-        leveled_up = False
         old_level = data["level"]
-        while data["xp"] >= self.calculate_required_xp(data["level"]):
-            data["level"] += 1
-            leveled_up = True
+        data["level"] = max(old_level, level_for_xp(data["xp"]))
+        leveled_up = data["level"] > old_level
 
         await self.update_user_data(user_id, data["xp"], data["level"])
 
@@ -132,6 +227,12 @@ class Leveling(commands.Cog):
 
             await message.channel.send(embed=embed)
 
+    @commands.command(name="recalclevels")
+    @commands.has_permissions(administrator=True)
+    async def recalc_levels_command(self, ctx):
+        changed = await self.recalculate_levels()
+        await ctx.send(f"Recalculated levels from XP. Updated **{changed}** users.")
+
     @commands.command(name="rank")
     async def rank_command(self, ctx):
         await self.send_rank_embed(ctx.author, ctx)
@@ -146,6 +247,8 @@ class Leveling(commands.Cog):
         level = data["level"]
         xp_to_next = self.calculate_required_xp(level) - xp
         rank = await self.get_rank(user.id)
+        # Users with no stored XP have no row to rank against
+        rank_text = f"#{rank}" if rank is not None else "Unranked"
 
         embed = discord.Embed(
             title=f"{user.name}'s Rank",
@@ -153,7 +256,7 @@ class Leveling(commands.Cog):
                 f"Level: **{level}**\n"
                 f"XP: **{xp}**\n"
                 f"Next level in: **{xp_to_next}** XP\n"
-                f"Rank: **#{rank}**"
+                f"Rank: **{rank_text}**"
             ),
             color=0xd0b47b
         )
@@ -171,7 +274,8 @@ class Leveling(commands.Cog):
         await self.send_leaderboard_embed(interaction)
 
     async def send_leaderboard_embed(self, destination):
-        async with aiosqlite.connect(DB_PATH) as db:
+        await self.flush_xp()
+        async with self.bot.db.acquire(DB_PATH) as db:
             cursor = await db.execute(
                 "SELECT user_id, xp, level FROM users ORDER BY xp DESC LIMIT 10"
             )
@@ -1,8 +1,9 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import json
 import os
 from datetime import datetime, timedelta, timezone
+from log_writer import write_log
 
 LOA_REQUEST_ROLE = 1329910329701830686
 LOA_REVIEW_CHANNEL = 1329910521058558035
@@ -14,15 +15,41 @@ LOA_DATA_FILE = os.path.join(DATA_DIR, "loa_requests.json")
 LOA_LOG_FILE = os.path.join(LOGS_DIR, "loa.log")
 ACTIVE_LOAS_FILE = os.path.join(DATA_DIR, "active_loas.json")
 GUILD_ID = 1329908357812981882  # <-- Replace with your actual guild/server ID
+LOA_EXPIRY_JOB = "loa_expiry"
 
 def ensure_dirs():
     os.makedirs(DATA_DIR, exist_ok=True)
     os.makedirs(LOGS_DIR, exist_ok=True)
 
 def log_loa_action(msg):
-    ensure_dirs()
-    with open(LOA_LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(f"[{datetime.now(timezone.utc).isoformat()}] {msg}\n")
+    write_log(LOA_LOG_FILE, "loa", message=msg)
+
+def parse_iso_utc(s):
+    # parse stored ISO datetimes as UTC-aware
+    try:
+        d = datetime.fromisoformat(s)
+        if d.tzinfo is None:
+            return d.replace(tzinfo=timezone.utc)
+        return d.astimezone(timezone.utc)
+    except Exception:
+        return None
+
+def load_active_loas():
+    try:
+        with open(ACTIVE_LOAS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+async def schedule_loa_expiry(bot, user_id, end_date_str):
+    # One durable job per user on the bot scheduler; extending an LOA just replaces it
+    end_date = parse_iso_utc(end_date_str)
+    if end_date is None:
+        return
+    await bot.scheduler.schedule(LOA_EXPIRY_JOB, end_date.timestamp(), {"user_id": int(user_id)}, key=str(user_id))
+
+async def cancel_loa_expiry(bot, user_id):
+    await bot.scheduler.cancel(LOA_EXPIRY_JOB, str(user_id))
 
 def save_loa_request(request):
     ensure_dirs()
@@ -200,6 +227,7 @@ class LOAReviewView(discord.ui.View):
         if req_end_date:
             # store ISO string (already saved) and ensure DB/display parsing uses UTC
             add_active_loa(self.user_id, req_end_date)
+            await schedule_loa_expiry(interaction.client, self.user_id, req_end_date)
 
         try:
             if member and loa_role:
@@ -230,6 +258,7 @@ class LOAReviewView(discord.ui.View):
         member = interaction.guild.get_member(self.user_id)
         update_loa_status(self.user_id, "Denied")
         remove_active_loa(self.user_id)
+        await cancel_loa_expiry(interaction.client, self.user_id)
         await interaction.response.send_message(f"❌ LOA denied for {member.mention if member else self.user_id}.", ephemeral=True)
         log_loa_action(f"DENIED: {member} ({self.user_id}) by {interaction.user} ({interaction.user.id})")
         try:
@@ -253,7 +282,15 @@ class LOACog(commands.Cog):
         self.bot = bot
         ensure_dirs()
         self.bot.add_view(LOAReviewView(user_id=0))  # Persistent view
-        self.loa_expiry_check.start()
+
+    async def cog_load(self):
+        self.bot.scheduler.register(LOA_EXPIRY_JOB, self._expire_loa)
+        # Make sure every active LOA has a pending expiry job (covers entries from before the scheduler)
+        for user_id, end_date_str in load_active_loas().items():
+            await schedule_loa_expiry(self.bot, user_id, end_date_str)
+
+    async def cog_unload(self):
+        self.bot.scheduler.unregister(LOA_EXPIRY_JOB)
 
     @discord.app_commands.command(name="loa_request", description="Request a Leave of Absence (LOA).")
     async def loa_request(self, interaction: discord.Interaction):
@@ -380,6 +417,7 @@ class LOACog(commands.Cog):
             
             with open(ACTIVE_LOAS_FILE, "w", encoding="utf-8") as f:
                 json.dump(active_loas, f, indent=2)
+            await schedule_loa_expiry(self.bot, user.id, new_end.isoformat())
             
             log_loa_action(f"EXTENDED: {user} ({user.id}) LOA extended by {days} days by {interaction.user} ({interaction.user.id})")
             
@@ -437,6 +475,7 @@ class LOACog(commands.Cog):
                 }
                 save_loa_request(request)
                 add_active_loa(user.id, end_date.isoformat())
+                await schedule_loa_expiry(self.bot, user.id, end_date.isoformat())
 
                 embed = discord.Embed(
                     title="LOA Administered",
@@ -484,6 +523,7 @@ class LOACog(commands.Cog):
                 with open(ACTIVE_LOAS_FILE, "w", encoding="utf-8") as f:
                     json.dump(active_loas, f, indent=2)
                 removed_entry = True
+            await cancel_loa_expiry(self.bot, user.id)
             
             log_loa_action(f"ENDED: {user} ({user.id}) LOA ended by {interaction.user} ({interaction.user.id})")
             
@@ -505,16 +545,16 @@ class LOACog(commands.Cog):
             except Exception:
                 pass
 
-    @tasks.loop(minutes=10)
-    async def loa_expiry_check(self):
-        ensure_dirs()
-        now = datetime.now(timezone.utc)
-        # Check active LOAs
-        try:
-            with open(ACTIVE_LOAS_FILE, "r", encoding="utf-8") as f:
-                active_loas = json.load(f)
-        except Exception:
-            active_loas = {}
+    async def _expire_loa(self, payload):
+        user_id = str(payload["user_id"])
+        end_date = parse_iso_utc(load_active_loas().get(user_id, ""))
+        if end_date is None:
+            # LOA was ended or denied in the meantime
+            return
+        if datetime.now(timezone.utc) < end_date:
+            # End date was moved without going through the scheduler, wait for the new one
+            await schedule_loa_expiry(self.bot, user_id, end_date.isoformat())
+            return
 
         # Use correct guild lookup
         guild = self.bot.get_guild(GUILD_ID)
@@ -525,38 +565,23 @@ class LOACog(commands.Cog):
                 guild = None
 
         loa_role = guild.get_role(LOA_ACTIVE_ROLE) if guild else None
-        expired_users = []
-        for user_id, end_date_str in active_loas.items():
+        member = guild.get_member(int(user_id)) if guild else None
+        if member and loa_role and loa_role in member.roles:
             try:
-                # parse as UTC-aware
-                d = datetime.fromisoformat(end_date_str)
-                if d.tzinfo is None:
-                    end_date = d.replace(tzinfo=timezone.utc)
-                else:
-                    end_date = d.astimezone(timezone.utc)
+                await member.remove_roles(loa_role, reason="LOA expired")
+                log_loa_action(f"EXPIRED: {member} ({user_id}) LOA expired and role removed.")
+                try:
+                    dm_embed = discord.Embed(
+                        title="LOA expired",
+                        description="Your LOA has expired and the LOA role has been removed.",
+                        color=discord.Color.red()
+                    )
+                    await member.send(embed=dm_embed)
+                except Exception:
+                    pass
             except Exception:
-                continue
-            if now >= end_date:
-                member = guild.get_member(int(user_id)) if guild else None
-                if member and loa_role and loa_role in member.roles:
-                    try:
-                        await member.remove_roles(loa_role, reason="LOA expired")
-                        log_loa_action(f"EXPIRED: {member} ({user_id}) LOA expired and role removed.")
-                        try:
-                            dm_embed = discord.Embed(
-                                title="LOA expired",
-                                description="Your LOA has expired and the LOA role has been removed.",
-                                color=discord.Color.red()
-                            )
-                            await member.send(embed=dm_embed)
-                        except Exception:
-                            pass
-                    except Exception:
-                        pass
-                expired_users.append(user_id)
-        # Remove expired users from active_loas.json
-        for user_id in expired_users:
-            remove_active_loa(user_id)
+                pass
+        remove_active_loa(user_id)
 
 async def setup(bot):
     await bot.add_cog(LOACog(bot))
\ No newline at end of file
@@ -1,6 +1,7 @@
 import os
 import discord
 from discord.ext import commands
+from log_writer import write_log
 
 LOGS_DIR = os.path.join(os.path.dirname(__file__), "../logs")
 os.makedirs(LOGS_DIR, exist_ok=True)
@@ -11,15 +12,20 @@ class MessageLogger(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot:
-            return
+    async def cog_load(self):
+        self.bot.message_pipeline.register("message_logger", self.handle_message)
 
+    async def cog_unload(self):
+        self.bot.message_pipeline.unregister("message_logger")
+
+    async def handle_message(self, message: discord.Message):
         # Log to file
-        log_entry = f"[{message.created_at}] ({message.guild.name if message.guild else 'DM'}) #{message.channel} | {message.author} ({message.author.id}): {message.content}\n"
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(log_entry)
+        write_log(
+            LOG_FILE, "message",
+            created_at=message.created_at, guild=message.guild.name if message.guild else "DM",
+            channel=str(message.channel), author=str(message.author), author_id=message.author.id,
+            content=message.content
+        )
 
         # Log as embed
         embed = discord.Embed(
@@ -34,9 +40,7 @@ class MessageLogger(commands.Cog):
         if message.attachments:
             embed.add_field(name="Attachments", value="\n".join(a.url for a in message.attachments), inline=False)
 
-        channel = self.bot.get_channel(LOG_CHANNEL_ID)
-        if channel:
-            await channel.send(embed=embed)
+        self.bot.log_dispatcher.send(LOG_CHANNEL_ID, embed=embed)
 
 async def setup(bot):
     await bot.add_cog(MessageLogger(bot))
@@ -4,7 +4,7 @@ from discord.ext import commands
 import sqlite3
 import os
 from datetime import datetime
-import asyncio
+from log_writer import write_log
 
 DATA_DIR = "data"
 LOG_DIR = "logs"
@@ -42,12 +42,6 @@ class Reviews(commands.Cog):
         os.makedirs(LOG_DIR, exist_ok=True)
         self.init_db()
 
-        self._log_queue = asyncio.Queue()
-        self.log_task = self.bot.loop.create_task(self._log_sender_task())
-
-    def cog_unload(self):
-        self.log_task.cancel()
-
     def init_db(self):
         with sqlite3.connect(DB_PATH) as conn:
             c = conn.cursor()
@@ -68,36 +62,13 @@ class Reviews(commands.Cog):
             conn.commit()
 
     def write_log_to_file(self, message: str):
-        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-        line = f"[{timestamp}] {message}\n"
-        try:
-            with open(LOG_PATH, "a", encoding="utf-8") as f:
-                f.write(line)
-        except Exception as e:
-            print(f"Failed to write review log to file: {e}")
-
-    async def _log_sender_task(self):
-        await self.bot.wait_until_ready()
-        while True:
-            try:
-                message = await self._log_queue.get()
-                channel = self.bot.get_channel(REVIEW_LOG_CHANNEL_ID)
-                if channel:
-                    embed = discord.Embed(description=message, color=discord.Color.dark_grey(), timestamp=datetime.utcnow())
-                    embed.set_author(name="Review Action Log")
-                    try:
-                        await channel.send(embed=embed)
-                    except Exception as e:
-                        print(f"Failed to send review log embed: {e}")
-                self._log_queue.task_done()
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                print(f"Unexpected error in review log sender task: {e}")
+        write_log(LOG_PATH, "review", message=message)
 
     def log_action(self, message: str):
         self.write_log_to_file(message)
-        self._log_queue.put_nowait(message)
+        embed = discord.Embed(description=message, color=discord.Color.dark_grey(), timestamp=datetime.utcnow())
+        embed.set_author(name="Review Action Log")
+        self.bot.log_dispatcher.send(REVIEW_LOG_CHANNEL_ID, embed=embed)
 
     @app_commands.command(name="review", description="Add a review for a user")
     @app_commands.describe(
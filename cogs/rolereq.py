@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 import os
+from log_writer import write_log
 
 REVIEW_CHANNEL_ID = 1425949939925516368
 LOG_CHANNEL_ID = 1343686645815181382
@@ -31,7 +32,7 @@ class RoleRequestView(discord.ui.View):
         if member and role:
             await member.add_roles(role, reason="Role request approved")
             await interaction.response.send_message(f"✅ Approved and added {role.name} to {member.mention}.", ephemeral=True)
-            await log_action(interaction.guild, f"APPROVED: {member} ({member.id}) for role {role.name} ({role.id}) by {interaction.user} ({interaction.user.id})", self.proof_url)
+            await log_action(interaction.client, f"APPROVED: {member} ({member.id}) for role {role.name} ({role.id}) by {interaction.user} ({interaction.user.id})", self.proof_url)
             # DM notify
             try:
                 await member.send(f"✅ Your role request for **{role.name}** was approved!")
@@ -50,7 +51,7 @@ class RoleRequestView(discord.ui.View):
         member = interaction.guild.get_member(self.member_id)
         role = interaction.guild.get_role(self.role_id)
         await interaction.response.send_message(f"❌ Denied request for {member.mention} ({role.name}).", ephemeral=True)
-        await log_action(interaction.guild, f"DENIED: {member} ({member.id}) for role {role.name} ({role.id}) by {interaction.user} ({interaction.user.id})", self.proof_url)
+        await log_action(interaction.client, f"DENIED: {member} ({member.id}) for role {role.name} ({role.id}) by {interaction.user} ({interaction.user.id})", self.proof_url)
         # DM notify
         try:
             await member.send(f"❌ Your role request for **{role.name}** was denied.")
@@ -58,19 +59,14 @@ class RoleRequestView(discord.ui.View):
             pass
         await self.update_embed(interaction, "❌ Denied", interaction.user)
 
-async def log_action(guild, message, proof_url):
+async def log_action(bot, message, proof_url):
     # Log to .txt
-    os.makedirs(LOGS_DIR, exist_ok=True)
-    logline = f"[{discord.utils.utcnow().isoformat()}] {message}\nProof: {proof_url}\n"
-    with open(os.path.join(LOGS_DIR, f"{discord.utils.utcnow().date()}.txt"), "a", encoding="utf-8") as f:
-        f.write(logline)
+    write_log(os.path.join(LOGS_DIR, f"{discord.utils.utcnow().date()}.txt"), "rolereq", message=message, proof=proof_url)
     # Log as embed in LOG_CHANNEL_ID
-    ch = guild.get_channel(LOG_CHANNEL_ID)
-    if isinstance(ch, discord.TextChannel):
-        emb = discord.Embed(title="Role Request Log", description=message, color=discord.Color.purple())
-        if proof_url:
-            emb.set_image(url=proof_url)
-        await ch.send(embed=emb)
+    emb = discord.Embed(title="Role Request Log", description=message, color=discord.Color.purple())
+    if proof_url:
+        emb.set_image(url=proof_url)
+    bot.log_dispatcher.send(LOG_CHANNEL_ID, embed=emb)
 
 class RoleRequestCog(commands.Cog):
     def __init__(self, bot):
@@ -96,7 +92,7 @@ class RoleRequestCog(commands.Cog):
             # Ping reviewer role
             await review_channel.send(content=f"<@&{REVIEWER_ROLE_ID}>", embed=embed, view=RoleRequestView(interaction.user.id, role.id, proof_url))
             await interaction.response.send_message("Your role request has been submitted to staff.", ephemeral=True)
-            await log_action(interaction.guild, f"REQUESTED: {interaction.user} ({interaction.user.id}) for role {role.name} ({role.id})", proof_url)
+            await log_action(interaction.client, f"REQUESTED: {interaction.user} ({interaction.user.id}) for role {role.name} ({role.id})", proof_url)
         else:
             await interaction.response.send_message("Staff channel not found. Please contact an admin.", ephemeral=True)
 
@@ -1,9 +1,9 @@
 import os
-import datetime
 import discord
 from discord.ext import commands
 from discord import app_commands
 from discord.utils import get
+from log_writer import write_log
 
 ALLOWED_ROLE_ID = 1329910230066401361
 FOOTER_ICON = "https://images-ext-1.discordapp.net/external/_d7d0RmGwlFEwwKlYDfachyeC_skH7txYK5GzDan4ZI/https/cdn.discordapp.com/icons/1329908357812981882/fa763c9516fc5a9982b48c69c0a18e18.png"
@@ -15,11 +15,7 @@ os.makedirs(LOGS_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOGS_DIR, "say_command.log")
 
 def log_say_command(user_id, channel_id, message, send_as_embed):
-    timestamp = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(
-            f"[{timestamp}] User: {user_id} | Channel: {channel_id} | Embed: {send_as_embed} | Message: {message}\n"
-        )
+    write_log(LOG_FILE, "say", user_id=user_id, channel_id=channel_id, embed=send_as_embed, message=message)
 
 class Say(commands.Cog):
     def __init__(self, bot):
@@ -9,6 +9,8 @@ import datetime as dt
 import asyncio
 from typing import Dict, Any, Optional, List, Tuple
 import glob
+import sqlite3
+from log_writer import write_log
 
 # -------------------- CONFIG CONSTANTS --------------------
 IMAGE_URL = "https://cdn.discordapp.com/attachments/1409252771978280973/1409308813835894875/bottom.png?ex=68bac05c&is=68b96edc&hm=b48ce53b741b93847d34dc04a79709fa47badfd867e95afc68a6712de4d86856&"
@@ -41,12 +43,17 @@ WARN_THRESHOLD = 45  # under 45s is a warning
 STRIKE_THRESHOLD = 30  # under 30 minutes is a strike
 DEMOTION_THRESHOLD = 15  # under 15 minutes is a demotion
 
+# Failed message-count backfills are retried on the checkpoint tick, waiting 60s, 120s, ... up to this (seconds)
+MSG_BACKFILL_MAX_BACKOFF = 3600
+
 # -------------------- STORAGE PATHS --------------------
 DATA_DIR = "data"
 LOGS_DIR = os.path.join(DATA_DIR, "logs")
 STATE_FILE = os.path.join(DATA_DIR, "shift_state.json")
 RECORDS_FILE = os.path.join(DATA_DIR, "shift_records.json")
 META_FILE = os.path.join(DATA_DIR, "meta.json")  # includes logging_enabled, last_reset_ts
+# STATE_FILE/RECORDS_FILE/META_FILE are legacy, imported once into SHIFT_DB_FILE by migrate_json_store
+SHIFT_DB_FILE = os.path.join(DATA_DIR, "shifts.db")
 
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(LOGS_DIR, exist_ok=True)
@@ -90,9 +97,45 @@ def colour_info() -> discord.Colour:
     return discord.Colour.blurple()
 
 # -------------------- PERSISTENCE LAYER --------------------
+def migrate_json_store(conn: sqlite3.Connection) -> bool:
+    """One-shot import of the legacy shift_state/shift_records/meta JSON files.
+    Runs in a single transaction and renames the files to *.migrated afterwards.
+    Returns True if anything was imported."""
+    legacy = [p for p in (STATE_FILE, RECORDS_FILE, META_FILE) if os.path.exists(p)]
+    if not legacy:
+        return False
+    state, records, meta = {}, [], {}
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    if os.path.exists(RECORDS_FILE):
+        with open(RECORDS_FILE, "r", encoding="utf-8") as f:
+            records = json.load(f)
+    if os.path.exists(META_FILE):
+        with open(META_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO shift_state (user_id, start_ts, accum, on_break, last_ts, breaks) VALUES (?, ?, ?, ?, ?, ?)",
+            [(int(uid), st["start_ts"], st["accum"], int(st["on_break"]), st["last_ts"], st.get("breaks", 0)) for uid, st in state.items()]
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO shift_records (id, user_id, start_ts, end_ts, duration, breaks) VALUES (?, ?, ?, ?, ?, ?)",
+            [(r["id"], r["user_id"], r["start_ts"], r["end_ts"], r["duration"], r.get("breaks", 0)) for r in records]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO shift_meta (key, value) VALUES (?, ?)",
+            [(k, json.dumps(v)) for k, v in meta.items()]
+        )
+    for path in legacy:
+        os.replace(path, path + ".migrated")
+    print(f"[Shift] Migrated {len(state)} ongoing shifts and {len(records)} records from JSON to {SHIFT_DB_FILE}")
+    return True
+
+
 class Store:
-    """Simple JSON-backed storage.
-    state: per-user ongoing shifts
+    """SQLite-backed storage (data/shifts.db). Every mutation is its own small transaction.
+    state: per-user ongoing shifts, mirrored in memory (table shift_state)
         {
           str(user_id): {
             "start_ts": int,
@@ -101,7 +144,7 @@ class Store:
             "last_ts": int           # last timestamp of tick (for accumulation)
           }
         }
-    records: list of completed shift dicts
+    records: completed shifts, append-only table shift_records indexed on user_id and start_ts
         {
           "id": str, "user_id": int, "start_ts": int, "end_ts": int, "duration": int, "breaks": int
         }
@@ -110,26 +153,72 @@ class Store:
         "last_reset_ts": int,
         "manage_message_ids": {str(user_id): int},  # optional: last manage message id to edit
         "last_promotions": {str(user_id): int},  # last time user was pinged in promotions channel
-        "infractions": {str(user_id): {"demotions": int, "strikes": int, "warns": int}}  # infraction counts
+        "infractions": {str(user_id): {"demotions": int, "strikes": int, "warns": int}},  # infraction counts
+        "msg_counter": {"since_ts": int, "count": int, "last_message_id": int}  # MSG_COUNT_CHANNEL_ID checkpoint
     }
+    meta is kept in memory and written back key by key (table shift_meta) by save().
+    totals: {user_id: int} running sum of completed record durations, kept in step with
+        every record insert/delete so leaderboards never rescan shift_records.
     """
 
     def __init__(self):
         self.state: Dict[str, Any] = {}
-        self.records: List[Dict[str, Any]] = []
         self.meta: Dict[str, Any] = {}
+        self.totals: Dict[int, int] = {}
+        self.conn = sqlite3.connect(SHIFT_DB_FILE)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_db()
+        migrate_json_store(self.conn)
         self.load()
 
+    def _init_db(self):
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS shift_state (
+                    user_id INTEGER PRIMARY KEY,
+                    start_ts INTEGER NOT NULL,
+                    accum INTEGER NOT NULL,
+                    on_break INTEGER NOT NULL,
+                    last_ts INTEGER NOT NULL,
+                    breaks INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS shift_records (
+                    id TEXT PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    start_ts INTEGER NOT NULL,
+                    end_ts INTEGER NOT NULL,
+                    duration INTEGER NOT NULL,
+                    breaks INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_shift_records_user ON shift_records (user_id)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_shift_records_start ON shift_records (start_ts)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS shift_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+
     def load(self):
-        if os.path.exists(STATE_FILE):
-            with open(STATE_FILE, "r", encoding="utf-8") as f:
-                self.state = json.load(f)
-        if os.path.exists(RECORDS_FILE):
-            with open(RECORDS_FILE, "r", encoding="utf-8") as f:
-                self.records = json.load(f)
-        if os.path.exists(META_FILE):
-            with open(META_FILE, "r", encoding="utf-8") as f:
-                self.meta = json.load(f)
+        self.state = {}
+        for uid, start_ts, accum, on_break, last_ts, breaks in self.conn.execute(
+            "SELECT user_id, start_ts, accum, on_break, last_ts, breaks FROM shift_state"
+        ):
+            self.state[str(uid)] = {
+                "start_ts": start_ts,
+                "accum": accum,
+                "on_break": bool(on_break),
+                "last_ts": last_ts,
+                "breaks": breaks,
+            }
+        self.meta = {key: json.loads(value) for key, value in self.conn.execute("SELECT key, value FROM shift_meta")}
+        self.totals = {
+            uid: total for uid, total in self.conn.execute("SELECT user_id, SUM(duration) FROM shift_records GROUP BY user_id")
+        }
         # defaults
         if "logging_enabled" not in self.meta:
             self.meta["logging_enabled"] = True
@@ -145,14 +234,71 @@ class Store:
             self.meta["cooldown_extensions"] = {}  # {user_id: extension_seconds}
         if "admin_cooldowns" not in self.meta:
             self.meta["admin_cooldowns"] = {}  # {user_id: admin_specified_days}
+        if self.meta.get("msg_counter", {}).get("since_ts") != self.meta["last_reset_ts"]:
+            # no checkpoint for the current reset window, backfill starts from the reset itself
+            self.reset_msg_counter(self.meta["last_reset_ts"])
+
+    def save(self, *keys: str):
+        """Persist meta (only `keys` if given). Shift state and records are written by their own helpers."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO shift_meta (key, value) VALUES (?, ?)",
+                [(k, json.dumps(self.meta[k])) for k in (keys or self.meta.keys())]
+            )
+
+    def reset_msg_counter(self, since_ts: int):
+        self.meta["msg_counter"] = {
+            "since_ts": since_ts,
+            "count": 0,
+            "last_message_id": discord.utils.time_snowflake(int_to_ts(since_ts)),
+        }
+
+    def close(self):
+        self.conn.close()
+
+    def _write_state(self, user_id: int):
+        st = self.state[str(user_id)]
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO shift_state (user_id, start_ts, accum, on_break, last_ts, breaks) VALUES (?, ?, ?, ?, ?, ?)",
+                (user_id, st["start_ts"], st["accum"], int(st["on_break"]), st["last_ts"], st.get("breaks", 0))
+            )
 
-    def save(self):
-        with open(STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.state, f, indent=2)
-        with open(RECORDS_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.records, f, indent=2)
-        with open(META_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.meta, f, indent=2)
+    # ---- Record helpers ----
+    def add_record(self, record: Dict[str, Any]):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO shift_records (id, user_id, start_ts, end_ts, duration, breaks) VALUES (?, ?, ?, ?, ?, ?)",
+                (record["id"], record["user_id"], record["start_ts"], record["end_ts"], record["duration"], record.get("breaks", 0))
+            )
+        self._add_total(record["user_id"], record["duration"])
+
+    def _add_total(self, user_id: int, seconds: int):
+        self.totals[user_id] = self.totals.get(user_id, 0) + seconds
+
+    def records_for_user(self, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most recent `limit` records for a user, oldest first."""
+        rows = self.conn.execute(
+            "SELECT id, user_id, start_ts, end_ts, duration, breaks FROM shift_records WHERE user_id = ? ORDER BY start_ts DESC, rowid DESC LIMIT ?",
+            (user_id, limit)
+        ).fetchall()
+        return [
+            {"id": r[0], "user_id": r[1], "start_ts": r[2], "end_ts": r[3], "duration": r[4], "breaks": r[5]}
+            for r in reversed(rows)
+        ]
+
+    def count_records_since(self, start_ts: int) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM shift_records WHERE start_ts >= ?", (start_ts,)).fetchone()[0]
+
+    def clear_records(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM shift_records")
+        self.totals = {}
+
+    def clear_state(self):
+        self.state = {}
+        with self.conn:
+            self.conn.execute("DELETE FROM shift_state")
 
     # ---- Shift state helpers ----
     def is_on_shift(self, user_id: int) -> bool:
@@ -170,7 +316,7 @@ class Store:
             "last_ts": now,
             "breaks": 0,
         }
-        self.save()
+        self._write_state(user_id)
 
     def toggle_break(self, user_id: int) -> bool:
         now = ts_to_int(utcnow())
@@ -179,14 +325,14 @@ class Store:
             # resume: set last_ts to now
             st["on_break"] = False
             st["last_ts"] = now
-            self.save()
+            self._write_state(user_id)
             return False  # now off break
         else:
             # go on break: accumulate until now
             st["accum"] += max(0, now - st["last_ts"])
             st["on_break"] = True
             st["breaks"] += 1
-            self.save()
+            self._write_state(user_id)
             return True   # now on break
 
     def stop_shift(self, user_id: int) -> Optional[Dict[str, Any]]:
@@ -204,28 +350,35 @@ class Store:
             "duration": st["accum"],
             "breaks": st.get("breaks", 0),
         }
+        with self.conn:
+            self.conn.execute("DELETE FROM shift_state WHERE user_id = ?", (user_id,))
+            self.conn.execute(
+                "INSERT INTO shift_records (id, user_id, start_ts, end_ts, duration, breaks) VALUES (?, ?, ?, ?, ?, ?)",
+                (record["id"], record["user_id"], record["start_ts"], record["end_ts"], record["duration"], record["breaks"])
+            )
         del self.state[str(user_id)]
-        self.records.append(record)
-        self.save()
+        self._add_total(user_id, record["duration"])
         return record
 
     def void_shift(self, user_id: int) -> bool:
         if str(user_id) in self.state:
             del self.state[str(user_id)]
-            self.save()
+            with self.conn:
+                self.conn.execute("DELETE FROM shift_state WHERE user_id = ?", (user_id,))
             return True
         return False
 
     def void_record_by_id(self, rec_id: str) -> bool:
-        for i, r in enumerate(self.records):
-            if r["id"] == rec_id:
-                del self.records[i]
-                self.save()
-                return True
-        return False
+        row = self.conn.execute("SELECT user_id, duration FROM shift_records WHERE id = ?", (rec_id,)).fetchone()
+        if not row:
+            return False
+        with self.conn:
+            self.conn.execute("DELETE FROM shift_records WHERE id = ?", (rec_id,))
+        self._add_total(row[0], -row[1])
+        return True
 
     def total_for_user(self, user_id: int) -> int:
-        total = sum(r["duration"] for r in self.records if r["user_id"] == user_id)
+        total = self.totals.get(user_id, 0)
         # add current active if any
         st = self.state.get(str(user_id))
         if st and not st["on_break"]:
@@ -238,7 +391,8 @@ class Store:
     def get_statistics(self) -> Tuple[int, int]:
         # number of unique shifts = number of records
         # total time = sum durations
-        return len(self.records), sum(r["duration"] for r in self.records)
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(duration), 0) FROM shift_records").fetchone()
+        return count, total
 
     def get_promotion_cooldown(self, user_id: int) -> int:
         """Get promotion cooldown in days for a user based on their highest role."""
@@ -662,28 +816,94 @@ class ShiftCog(commands.Cog):
         self.store = Store()
         # re-add persistent view on startup
         self.bot.add_view(ShiftManageView(bot))
+        # Messages in MSG_COUNT_CHANNEL_ID newer than this snowflake are counted live by _on_counted_message,
+        # older ones since the last checkpoint are counted once by _backfill_msg_counter.
+        self._msg_live_boundary = discord.utils.time_snowflake(utcnow())
+        self._msg_backfilled = False
+        self._msg_backfill_failures = 0
+        self._msg_backfill_retry_at = 0.0
+        self._msg_counter_dirty = False
+
+    async def cog_load(self):
+        self._msg_backfill_task = asyncio.create_task(self._backfill_msg_counter())
+        self.checkpoint_msg_counter.start()
+        self.bot.scheduler.register("promo_cooldown_end", self._send_cooldown_end_dm)
+        self.bot.message_pipeline.register("shift.msg_counter", self._on_counted_message,
+                                           channel_ids=[MSG_COUNT_CHANNEL_ID], allow_bots=True)
+        self.bot.message_pipeline.register("shift.promotions", self._on_promotions_message,
+                                           channel_ids=[PROMOTIONS_CHANNEL_ID], guild_only=True, require_mentions=True)
+
+    async def cog_unload(self):
+        self.bot.scheduler.unregister("promo_cooldown_end")
+        self.bot.message_pipeline.unregister("shift.msg_counter")
+        self.bot.message_pipeline.unregister("shift.promotions")
+        self._msg_backfill_task.cancel()
+        self.checkpoint_msg_counter.cancel()
+        self._save_msg_counter()
+        self.store.close()
+
+    # ---------- MESSAGE COUNTER ----------
+    async def _backfill_msg_counter(self):
+        """Count only the gap between the last checkpoint and this process starting."""
+        await self.bot.wait_until_ready()
+        counter = self.store.meta["msg_counter"]
+        ch = self.bot.get_channel(MSG_COUNT_CHANNEL_ID)
+        if isinstance(ch, discord.TextChannel) and counter["last_message_id"] < self._msg_live_boundary:
+            try:
+                async for msg in ch.history(
+                    limit=None,
+                    after=discord.Object(id=counter["last_message_id"]),
+                    before=discord.Object(id=self._msg_live_boundary),
+                    oldest_first=True,
+                ):
+                    counter["count"] += 1
+                    counter["last_message_id"] = max(counter["last_message_id"], msg.id)
+            except Exception as e:
+                # leave the checkpoint untouched, checkpoint_msg_counter retries from where this stopped
+                self._msg_backfill_failures += 1
+                delay = min(MSG_BACKFILL_MAX_BACKOFF, 60 * 2 ** (self._msg_backfill_failures - 1))
+                self._msg_backfill_retry_at = asyncio.get_running_loop().time() + delay
+                print(f"Error backfilling message counter (attempt {self._msg_backfill_failures}), retrying in {delay}s: {e}")
+                return
+        counter["last_message_id"] = max(counter["last_message_id"], self._msg_live_boundary)
+        self._msg_backfilled = True
+        self._save_msg_counter(force=True)
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        """Track when users are pinged in the promotions channel for cooldown calculation."""
-        # Only track messages in the promotions channel
-        if message.channel.id != PROMOTIONS_CHANNEL_ID:
-            return
-        
-        # Skip bot messages
-        if message.author.bot:
-            return
-        
-        # Check if message contains any user mentions
-        if not message.mentions:
+    def _count_message(self, message: discord.Message):
+        if message.id <= self._msg_live_boundary:
             return
-        
+        counter = self.store.meta["msg_counter"]
+        counter["count"] += 1
+        counter["last_message_id"] = max(counter["last_message_id"], message.id)
+        self._msg_counter_dirty = True
+
+    def _save_msg_counter(self, force: bool = False):
+        # Never checkpoint past an unfilled gap, otherwise a crash would skip it for good
+        if self._msg_backfilled and (force or self._msg_counter_dirty):
+            self.store.save("msg_counter")
+            self._msg_counter_dirty = False
+
+    @tasks.loop(seconds=60)
+    async def checkpoint_msg_counter(self):
+        if (not self._msg_backfilled and self._msg_backfill_task.done()
+                and asyncio.get_running_loop().time() >= self._msg_backfill_retry_at):
+            self._msg_backfill_task = asyncio.create_task(self._backfill_msg_counter())
+        self._save_msg_counter()
+
+    def message_count(self) -> str:
+        count = self.store.meta["msg_counter"]["count"]
+        return str(count) if self._msg_backfilled else f"{count}+ (still syncing)"
+
+    async def _on_counted_message(self, message: discord.Message):
+        self._count_message(message)
+
+    async def _on_promotions_message(self, message: discord.Message):
+        """Track when users are pinged in the promotions channel for cooldown calculation."""
+        # The pipeline only routes non-bot guild messages with mentions in PROMOTIONS_CHANNEL_ID here
         # Record the timestamp for each mentioned user
         timestamp = ts_to_int(utcnow())
         guild = message.guild
-        if not guild:
-            return
-            
+
         updated = False
         for user in message.mentions:
             # Get the full member object to check roles
@@ -705,8 +925,8 @@ class ShiftCog(commands.Cog):
                             await member.send(embed=embed)
                         except Exception:
                             pass
-                        # schedule end DM (best-effort; not persistent across restarts)
-                        asyncio.create_task(self._schedule_cooldown_end_dm(member.id, timestamp + seconds_remaining))
+                        # schedule end DM (durable, survives restarts)
+                        await self._schedule_cooldown_end_dm(member.id, timestamp + seconds_remaining)
                 except Exception as e:
                     print(f"Failed to DM cooldown info to {user.display_name}: {e}")
             elif member:
@@ -716,7 +936,7 @@ class ShiftCog(commands.Cog):
         
         # Save the updated data
         if updated:
-            self.store.save()
+            self.store.save("last_promotions")
 
     # ---------- EMBED HELPERS ----------
     def base_embed(self, title: str, colour: discord.Colour) -> discord.Embed:
@@ -741,15 +961,11 @@ class ShiftCog(commands.Cog):
 
     async def log_event(self, guild: discord.Guild, message: str):
         # write to file
-        logline = f"[{utcnow().isoformat()}] {message}\n"
-        with open(os.path.join(LOGS_DIR, f"{utcnow().date()}.log"), "a", encoding="utf-8") as f:
-            f.write(logline)
-        # send embed
-        ch = guild.get_channel(LOG_CHANNEL_ID)
-        if isinstance(ch, discord.TextChannel):
-            emb = self.base_embed("Shift Log", colour_info())
-            emb.description = message
-            await ch.send(embed=emb)
+        write_log(os.path.join(LOGS_DIR, f"{utcnow().date()}.log"), "shift", message=message)
+        # queue embed for the log channel
+        emb = self.base_embed("Shift Log", colour_info())
+        emb.description = message
+        self.bot.log_dispatcher.send(LOG_CHANNEL_ID, embed=emb)
 
     # ---------- COMMANDS ----------
     @app_commands.command(name="shift_manage", description="Open the shift management panel.")
@@ -874,7 +1090,7 @@ class ShiftCog(commands.Cog):
             await interaction.response.send_message(embed=self.embed_info(f"Voided ongoing shift for {target.mention}."), ephemeral=True)
         elif action.value == "records":
             # show last 10 records
-            recs = [r for r in self.store.records if r["user_id"] == target.id][-10:]
+            recs = self.store.records_for_user(target.id, limit=10)
             emb = self.base_embed("Shift Records", colour_info())
             if not recs:
                 emb.description = "No records."
@@ -907,8 +1123,7 @@ class ShiftCog(commands.Cog):
                 "duration": time_minutes * 60,
                 "breaks": 0,
             }
-            self.store.records.append(fake_record)
-            self.store.save()
+            self.store.add_record(fake_record)
             await self.log_event(guild, f"➕ Admin {user.mention} added {time_minutes} minutes to {target.mention}'s total shift time.")
             await interaction.response.send_message(embed=self.embed_info(f"Added {time_minutes} minutes to {target.mention}'s total shift time."), ephemeral=True)
         elif action.value == "subtract_time":
@@ -927,8 +1142,7 @@ class ShiftCog(commands.Cog):
                 "duration": -(time_minutes * 60),  # Negative duration
                 "breaks": 0,
             }
-            self.store.records.append(fake_record)
-            self.store.save()
+            self.store.add_record(fake_record)
             await self.log_event(guild, f"➖ Admin {user.mention} subtracted {time_minutes} minutes from {target.mention}'s total shift time.")
             await interaction.response.send_message(embed=self.embed_info(f"Subtracted {time_minutes} minutes from {target.mention}'s total shift time."), ephemeral=True)
 
@@ -985,24 +1199,26 @@ class ShiftCog(commands.Cog):
             week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
             week_start_ts = ts_to_int(week_start)
 
-            # Remove all records started this week
-            before_count = len(self.store.records)
-            self.store.records = [r for r in self.store.records if r["start_ts"] < week_start_ts]
-            removed_count = before_count - len(self.store.records)
+            # Count records started this week (all records are cleared below)
+            removed_count = self.store.count_records_since(week_start_ts)
 
             # Remove all ongoing shifts
             ongoing_count = len(self.store.state)
-            self.store.state = {}
+            self.store.clear_state()
 
             # Reset stats since last reset
             self.store.meta["last_reset_ts"] = ts_to_int(now)
+            self.store.reset_msg_counter(ts_to_int(now))
+            self.store.meta["msg_counter"]["last_message_id"] = max(
+                self.store.meta["msg_counter"]["last_message_id"], self._msg_live_boundary
+            )
 
             # --- NEW: Reset all infractions and promotions ---
             self.store.meta["infractions"] = {}
             self.store.meta["last_promotions"] = {}
 
             # --- NEW: Set all users' total shift time to 0 by clearing all records ---
-            self.store.records = []
+            self.store.clear_records()
 
             self.store.save()
 
@@ -1036,24 +1252,15 @@ class ShiftCog(commands.Cog):
                 # extra: number of people with manage role
                 manage_role = guild.get_role(ROLE_MANAGE_REQUIRED)
                 role_count = len(manage_role.members) if manage_role else 0
-                # messages since last reset - with timeout protection
+                # messages since last reset, kept by the live counter
                 last_reset = int_to_ts(self.store.meta.get("last_reset_ts", ts_to_int(utcnow())))
-                
-                # Use asyncio.wait_for to add a timeout to message counting
-                try:
-                    msg_count = await asyncio.wait_for(
-                        self.count_messages_since(guild, last_reset), 
-                        timeout=10.0  # 10 second timeout
-                    )
-                except asyncio.TimeoutError:
-                    msg_count = 0  # Default to 0 if timeout occurs
-                    print("Message counting timed out, using 0 as default")
-                
+                msg_count = self.message_count()
+
                 emb = self.base_embed("Shift Stats (Global)", colour_info())
                 emb.add_field(name="Total unique shifts", value=str(num_records), inline=True)
                 emb.add_field(name="Total shift time", value=human_td(total_seconds), inline=True)
                 emb.add_field(name="Since reset", value=f"<t:{ts_to_int(last_reset)}:F>", inline=True)
-                emb.add_field(name="Messages since reset (in personnel-chat channel)", value=str(msg_count), inline=True)
+                emb.add_field(name="Messages since reset (in personnel-chat channel)", value=msg_count, inline=True)
                 emb.add_field(name="Members with personnel role", value=str(role_count), inline=True)
                 await interaction.response.send_message(embed=emb, ephemeral=False)
                 return
@@ -1150,32 +1357,6 @@ class ShiftCog(commands.Cog):
         else:
             return DEFAULT_QUOTA
 
-    async def count_messages_since(self, guild: discord.Guild, since: dt.datetime) -> int:
-        ch = guild.get_channel(MSG_COUNT_CHANNEL_ID)
-        if not isinstance(ch, discord.TextChannel):
-            return 0
-        
-        try:
-            # Use a more efficient approach with reasonable limits
-            # Count messages in reverse order (newest first) for better performance
-            count = 0
-            max_messages = 1000  # Reasonable limit to prevent timeout
-            message_count = 0
-            
-            async for msg in ch.history(after=since, limit=max_messages, oldest_first=False):
-                message_count += 1
-                count += 1
-                
-                # Stop if we've reached our limit
-                if message_count >= max_messages:
-                    break
-                    
-            return count
-        except Exception as e:
-            # If there's any error (timeout, permission, etc.), return 0
-            print(f"Error counting messages: {e}")
-            return 0
-
     async def _build_lists(self, guild: discord.Guild) -> Tuple[List[Tuple[discord.Member, int]], Dict[str, List[Tuple[discord.Member, int]]]]:
         manage_role = guild.get_role(ROLE_MANAGE_REQUIRED)
         if not manage_role:
@@ -1359,22 +1540,15 @@ class ShiftCog(commands.Cog):
             # Count members with manage role
             manage_role = guild.get_role(ROLE_MANAGE_REQUIRED)
             role_count = len(manage_role.members) if manage_role else 0
-            # Messages since last reset with timeout
+            # Messages since last reset, kept by the live counter
             last_reset = int_to_ts(self.store.meta.get("last_reset_ts", ts_to_int(utcnow())))
-            try:
-                msg_count = await asyncio.wait_for(self.count_messages_since(guild, last_reset), timeout=5.0)
-            except asyncio.TimeoutError:
-                msg_count = 0
-                print("Message counting timed out, using 0 as default")
-            except Exception as e:
-                print(f"Error counting messages: {e}")
-                msg_count = 0
-            
+            msg_count = self.message_count()
+
             emb = self.base_embed("Shift Stats (Global)", colour_info())
             emb.add_field(name="Total unique shifts", value=str(num_records), inline=True)
             emb.add_field(name="Total shift time", value=human_td(total_seconds), inline=True)
             emb.add_field(name="Since reset", value=f"<t:{ts_to_int(last_reset)}:F>", inline=True)
-            emb.add_field(name="Messages since reset (in personnel-chat channel)", value=str(msg_count), inline=True)
+            emb.add_field(name="Messages since reset (in personnel-chat channel)", value=msg_count, inline=True)
             emb.add_field(name="Members with personnel role", value=str(role_count), inline=True)
             await interaction.followup.send(embed=emb, ephemeral=False)
         except Exception as e:
@@ -1498,11 +1672,13 @@ class ShiftCog(commands.Cog):
         return cooldown_days, remaining
 
     async def _schedule_cooldown_end_dm(self, user_id: int, end_ts: int):
-        """Sleep until `end_ts` and DM the user that cooldown is over."""
+        """Queue the cooldown-expired DM on the bot scheduler, replacing any earlier one for this user."""
+        await self.bot.scheduler.schedule("promo_cooldown_end", end_ts, {"user_id": user_id}, key=str(user_id))
+
+    async def _send_cooldown_end_dm(self, payload: Dict[str, Any]):
+        """Scheduler handler: DM the user that cooldown is over."""
+        user_id = payload["user_id"]
         try:
-            now = ts_to_int(utcnow())
-            to_sleep = max(0, end_ts - now)
-            await asyncio.sleep(to_sleep)
             # fetch user and DM
             user = self.bot.get_user(user_id)
             if user is None:
@@ -1657,7 +1833,7 @@ class ShiftCog(commands.Cog):
                 pass
             
             # Schedule end DM
-            asyncio.create_task(self._schedule_cooldown_end_dm(user.id, cooldown_ts))
+            await self._schedule_cooldown_end_dm(user.id, cooldown_ts)
             
             await self.log_event(guild, f"🔒 Admin {admin_user.mention} added {days}-day cooldown for {user.mention}.")
             await interaction.response.send_message(embed=self.embed_info(f"Added {days}-day cooldown for {user.mention}. Ends <t:{cooldown_ts}:R>."), ephemeral=True)
@@ -1670,6 +1846,7 @@ class ShiftCog(commands.Cog):
             if str(user.id) in self.store.meta.get("admin_cooldowns", {}):
                 del self.store.meta["admin_cooldowns"][str(user.id)]
             self.store.save()
+            await self.bot.scheduler.cancel("promo_cooldown_end", str(user.id))
             
             # DM the user
             try:
@@ -1722,8 +1899,8 @@ class ShiftCog(commands.Cog):
             except Exception:
                 pass
             
-            # Reschedule end DM
-            asyncio.create_task(self._schedule_cooldown_end_dm(user.id, new_end_ts))
+            # Reschedule end DM (replaces the pending one)
+            await self._schedule_cooldown_end_dm(user.id, new_end_ts)
             
             await self.log_event(guild, f"⏰ Admin {admin_user.mention} extended cooldown for {user.mention} by {days} days. New end: <t:{new_end_ts}:R>.")
             await interaction.response.send_message(embed=self.embed_info(f"Extended cooldown for {user.mention} by {days} days. New end: <t:{new_end_ts}:R>."), ephemeral=True)
@@ -30,26 +30,70 @@ LOGS_DIR = os.path.abspath(LOGS_DIR)
 os.makedirs(LOGS_DIR, exist_ok=True)
 
 PERSIST_FILE = os.path.join(LOGS_DIR, "ticket_embed_id.txt")
-DELETION_SCHEDULE_FILE = os.path.join(LOGS_DIR, "pending_ticket_deletions.txt")
-
-def log_transcript(channel, messages):
-    transcripts_dir = "transcripts"
-    os.makedirs(transcripts_dir, exist_ok=True)
-    filename = os.path.join(transcripts_dir, f"transcript_{channel.id}_{int(datetime.datetime.utcnow().timestamp())}.txt")
-    with open(filename, "w", encoding="utf-8") as f:
-        for msg in messages:
-            time = msg.created_at.strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"[{time}] {msg.author} ({msg.author.id}): {msg.content}\n")
-    return filename
-
-async def send_transcript_and_logs(channel, opener, guild):
-    # Transcript
-    messages = [msg async for msg in channel.history(limit=None, oldest_first=True)]
-    transcript_path = log_transcript(channel, messages)
-    html_transcript = generate_html_transcript(channel, messages)
-    html_path = os.path.join("transcripts", f"transcript_{channel.id}_{int(datetime.datetime.utcnow().timestamp())}.html")
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write(html_transcript)
+DELETION_SCHEDULE_FILE = os.path.join(LOGS_DIR, "pending_ticket_deletions.txt")  # legacy, migrated into bot.scheduler
+TICKET_DELETE_JOB = "ticket_delete"
+
+HTML_TRANSCRIPT_HEAD = [
+    "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Ticket Transcript</title>",
+    "<style>body{font-family:sans-serif;background:#222;color:#eee;} .msg{margin:10px 0;padding:10px;border-radius:8px;background:#333;} .author{font-weight:bold;} .avatar{width:32px;height:32px;vertical-align:middle;border-radius:50%;margin-right:8px;} .time{color:#aaa;font-size:0.9em;margin-left:8px;}</style>",
+    "</head><body>",
+]
+
+class TranscriptWriter:
+    """
+    Writes the .txt and .html transcripts of a channel side by side, one message at a time,
+    so a single pass over the history produces both files without holding the messages in memory.
+    """
+
+    def __init__(self, channel):
+        transcripts_dir = "transcripts"
+        os.makedirs(transcripts_dir, exist_ok=True)
+        stamp = int(datetime.datetime.utcnow().timestamp())
+        self.txt_path = os.path.join(transcripts_dir, f"transcript_{channel.id}_{stamp}.txt")
+        self.html_path = os.path.join(transcripts_dir, f"transcript_{channel.id}_{stamp}.html")
+        self.count = 0
+        self.first_human_author = None
+        self._txt = open(self.txt_path, "w", encoding="utf-8")
+        self._html = open(self.html_path, "w", encoding="utf-8")
+        self._html.write("\n".join(HTML_TRANSCRIPT_HEAD + [f"<h2>Transcript for #{channel.name}</h2>"]))
+
+    def write(self, msg):
+        time = msg.created_at.strftime("%Y-%m-%d %H:%M:%S")
+        self._txt.write(f"[{time}] {msg.author} ({msg.author.id}): {msg.content}\n")
+        avatar_url = msg.author.display_avatar.url if hasattr(msg.author, "display_avatar") else msg.author.avatar_url
+        content = discord.utils.escape_markdown(msg.content)
+        self._html.write(
+            f"\n<div class='msg'><img class='avatar' src='{avatar_url}'/>"
+            f"<span class='author'>{msg.author}</span>"
+            f"<span class='time'>{time}</span><br>{content}</div>"
+        )
+        if self.first_human_author is None and not msg.author.bot:
+            self.first_human_author = msg.author
+        self.count += 1
+
+    def close(self):
+        self._txt.close()
+        self._html.write("\n</body></html>")
+        self._html.close()
+
+async def write_transcript(channel):
+    # channel.history pages 100 messages per request, each page is written out as it arrives
+    writer = TranscriptWriter(channel)
+    try:
+        async for msg in channel.history(limit=None, oldest_first=True):
+            writer.write(msg)
+    finally:
+        writer.close()
+    return writer
+
+async def send_transcript_and_logs(channel, opener, guild, fallback_opener=None):
+    # Transcript (one history pass for both files)
+    transcript = await write_transcript(channel)
+    transcript_path = transcript.txt_path
+    html_path = transcript.html_path
+    if opener is None:
+        # No opener in the topic: first non-bot author, else whoever closed the ticket
+        opener = transcript.first_human_author or fallback_opener
 
     # DM transcript to opener (embed + .txt transcript file)
     try:
@@ -58,7 +102,7 @@ async def send_transcript_and_logs(channel, opener, guild):
             description=f"Here is the transcript for your ticket **{channel.name}**.\n"
                         f"Opened: <t:{int(channel.created_at.timestamp())}:f>\n"
                         f"Closed: <t:{int(datetime.datetime.utcnow().timestamp())}:f>\n"
-                        f"Messages: {len(messages)}",
+                        f"Messages: {transcript.count}",
             color=discord.Color.blue()
         )
         summary_embed.set_footer(text="Thank you for contacting support!")
@@ -75,7 +119,7 @@ async def send_transcript_and_logs(channel, opener, guild):
             description=f"**Ticket:** {channel.mention} (`{channel.id}`)\n"
                         f"**Opened by:** {opener.mention} (`{opener.id}`)\n"
                         f"**Closed at:** <t:{int(datetime.datetime.utcnow().timestamp())}:f>\n"
-                        f"**Messages:** {len(messages)}",
+                        f"**Messages:** {transcript.count}",
             color=discord.Color.blue()
         )
         summary_embed.set_footer(text="Transcript attached.")
@@ -294,15 +338,7 @@ class ConfirmCloseView(View):
         opener = None
         if opener_id:
             opener = interaction.guild.get_member(opener_id) or await interaction.guild.fetch_member(opener_id)
-        else:
-            # fallback to old logic
-            messages = [msg async for msg in interaction.channel.history(limit=None, oldest_first=True)]
-            for msg in messages:
-                if not msg.author.bot:
-                    opener = msg.author
-                    break
-            if opener is None:
-                opener = interaction.user
+        # Otherwise send_transcript_and_logs picks the first non-bot author while writing the transcript
 
         # Calculate next exact half hour in UTC
         now = datetime.datetime.utcnow()
@@ -319,10 +355,9 @@ class ConfirmCloseView(View):
             color=discord.Color.red()
         ))
         # Transcript and logs
-        await send_transcript_and_logs(interaction.channel, opener, interaction.guild)
+        await send_transcript_and_logs(interaction.channel, opener, interaction.guild, fallback_opener=interaction.user)
         # Schedule deletion
-        save_pending_deletion(interaction.channel.id, delete_at)
-        interaction.client.loop.create_task(schedule_ticket_deletion(interaction.client, interaction.channel.id, delete_at))
+        await schedule_ticket_deletion(interaction.client, interaction.channel.id, delete_at)
         self.stop()
 
     @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary, custom_id="cancel_close_button")
@@ -330,32 +365,12 @@ class ConfirmCloseView(View):
         await interaction.response.send_message("Ticket close cancelled.", ephemeral=True)
         self.stop()
 
-def save_pending_deletion(channel_id, delete_at):
-    lines = []
-    if os.path.exists(DELETION_SCHEDULE_FILE):
-        with open(DELETION_SCHEDULE_FILE, "r") as f:
-            lines = [line.strip() for line in f if line.strip()]
-    # Remove any existing entry for this channel
-    lines = [line for line in lines if not line.startswith(f"{channel_id}:")]
-    lines.append(f"{channel_id}:{delete_at}")
-    with open(DELETION_SCHEDULE_FILE, "w") as f:
-        f.write("\n".join(lines) + "\n")
-
-def remove_pending_deletion(channel_id):
-    if not os.path.exists(DELETION_SCHEDULE_FILE):
-        return
-    with open(DELETION_SCHEDULE_FILE, "r") as f:
-        lines = [line.strip() for line in f if line.strip()]
-    lines = [line for line in lines if not line.startswith(f"{channel_id}:")]
-    with open(DELETION_SCHEDULE_FILE, "w") as f:
-        f.write("\n".join(lines) + "\n")
-
 async def schedule_ticket_deletion(bot, channel_id, delete_at):
-    now = datetime.datetime.utcnow().timestamp()
-    wait_time = delete_at - now
-    logging.info(f"[TicketSystem] Scheduling deletion for channel {channel_id} in {wait_time:.2f} seconds.")
-    if wait_time > 0:
-        await asyncio.sleep(wait_time)
+    # Durable job on the bot scheduler, rescheduling the same channel replaces the old job
+    await bot.scheduler.schedule(TICKET_DELETE_JOB, delete_at, {"channel_id": int(channel_id)}, key=str(channel_id))
+    logging.info(f"[TicketSystem] Scheduled deletion for channel {channel_id} at {delete_at:.0f}.")
+
+async def delete_ticket_channel(bot, channel_id):
     # Try to get the channel from cache
     channel = bot.get_channel(int(channel_id))
     if not channel:
@@ -365,7 +380,6 @@ async def schedule_ticket_deletion(bot, channel_id, delete_at):
             logging.info(f"[TicketSystem] Successfully fetched channel {channel_id} from API.")
         except Exception as e:
             logging.error(f"[TicketSystem] Could not fetch channel {channel_id}: {e}")
-            remove_pending_deletion(channel_id)
             return
     if channel:
         try:
@@ -379,7 +393,21 @@ async def schedule_ticket_deletion(bot, channel_id, delete_at):
             logging.error(f"[TicketSystem] Failed to delete ticket channel {channel_id}: {e}")
     else:
         logging.error(f"[TicketSystem] Channel {channel_id} not found for deletion.")
-    remove_pending_deletion(channel_id)
+
+async def migrate_pending_deletions(bot):
+    # One-off import of the old channel_id:ts text file into the scheduler
+    if not os.path.exists(DELETION_SCHEDULE_FILE):
+        return
+    with open(DELETION_SCHEDULE_FILE, "r") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    for line in lines:
+        if ":" in line:
+            channel_id, delete_at = line.split(":", 1)
+            try:
+                await schedule_ticket_deletion(bot, int(channel_id), float(delete_at))
+            except Exception:
+                continue
+    os.replace(DELETION_SCHEDULE_FILE, DELETION_SCHEDULE_FILE + ".migrated")
 
 async def ensure_persistent_ticket_embed(bot):
     channel = bot.get_channel(CHANNEL_ASSISTANCE)
@@ -429,46 +457,23 @@ async def ensure_persistent_ticket_embed(bot):
     with open(PERSIST_FILE, "w") as f:
         f.write(str(sent.id))
 
-async def resume_pending_deletions(bot):
-    if not os.path.exists(DELETION_SCHEDULE_FILE):
-        return
-    with open(DELETION_SCHEDULE_FILE, "r") as f:
-        lines = [line.strip() for line in f if line.strip()]
-    for line in lines:
-        if ":" in line:
-            channel_id, delete_at = line.split(":", 1)
-            try:
-                bot.loop.create_task(schedule_ticket_deletion(bot, int(channel_id), float(delete_at)))
-            except Exception:
-                continue
-
-def generate_html_transcript(channel, messages):
-    html = [
-        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Ticket Transcript</title>",
-        "<style>body{font-family:sans-serif;background:#222;color:#eee;} .msg{margin:10px 0;padding:10px;border-radius:8px;background:#333;} .author{font-weight:bold;} .avatar{width:32px;height:32px;vertical-align:middle;border-radius:50%;margin-right:8px;} .time{color:#aaa;font-size:0.9em;margin-left:8px;}</style>",
-        "</head><body>",
-        f"<h2>Transcript for #{channel.name}</h2>"
-    ]
-    for msg in messages:
-        avatar_url = msg.author.display_avatar.url if hasattr(msg.author, "display_avatar") else msg.author.avatar_url
-        time = msg.created_at.strftime("%Y-%m-%d %H:%M:%S")
-        content = discord.utils.escape_markdown(msg.content)
-        html.append(
-            f"<div class='msg'><img class='avatar' src='{avatar_url}'/>"
-            f"<span class='author'>{msg.author}</span>"
-            f"<span class='time'>{time}</span><br>{content}</div>"
-        )
-    html.append("</body></html>")
-    return "\n".join(html)
-
 class TicketSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.bot.loop.create_task(self._startup_embed())
-        self.bot.loop.create_task(resume_pending_deletions(self.bot))
         self.bot.add_view(TicketTypeView())
         self.bot.add_view(TicketActionView())
 
+    async def cog_load(self):
+        self.bot.scheduler.register(TICKET_DELETE_JOB, self._run_ticket_deletion)
+        await migrate_pending_deletions(self.bot)
+
+    async def cog_unload(self):
+        self.bot.scheduler.unregister(TICKET_DELETE_JOB)
+
+    async def _run_ticket_deletion(self, payload):
+        await delete_ticket_channel(self.bot, payload["channel_id"])
+
     async def _startup_embed(self):
         await self.bot.wait_until_ready()
         await ensure_persistent_ticket_embed(self.bot)
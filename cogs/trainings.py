@@ -1,11 +1,11 @@
 import os
-import traceback
 import discord
 from discord.ext import commands
 from discord import app_commands
 import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Dict
+from log_writer import write_log
 
 TRAINING_ROLE_ID = 1329910342301515838  # role allowed to run command
 ANNOUNCE_CHANNEL_ID = 1329910495536484374
@@ -25,7 +25,7 @@ async def log_action(bot: commands.Bot, actor, action: str, extra: str = ""):
     """
     Full action logging:
      - write to local logs/trainings.txt
-     - try to post a short message to LOG_CHANNEL_ID
+     - queue a short message for LOG_CHANNEL_ID
     actor may be a discord.User/Member or a string.
     """
     ts = datetime.now(timezone.utc).isoformat()
@@ -34,31 +34,11 @@ async def log_action(bot: commands.Bot, actor, action: str, extra: str = ""):
     except Exception:
         actor_repr = str(actor)
 
-    line = f"[{ts}] {actor_repr} • {action}"
-    if extra:
-        # keep extra on one line
-        safe_extra = " ".join(str(extra).splitlines())
-        line = f"{line} • {safe_extra}"
-    # write local file
-    try:
-        os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
-        with open(LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
-    except Exception:
-        # silent fail for local write, but still try to post to channel
-        pass
+    # write local file, keeping extra on one line
+    write_log(LOG_PATH, action, actor=actor_repr, extra=" ".join(str(extra).splitlines()) if extra else "")
 
-    # send to log channel (best-effort)
-    try:
-        ch = bot.get_channel(LOG_CHANNEL_ID) or await bot.fetch_channel(LOG_CHANNEL_ID)
-        await ch.send(f"`{ts}` {actor_repr} • **{action}** {('• ' + extra) if extra else ''}")
-    except Exception:
-        # write traceback to file if channel post fails
-        try:
-            with open(LOG_PATH, "a", encoding="utf-8") as f:
-                f.write(traceback.format_exc() + "\n")
-        except Exception:
-            pass
+    # queue for the log channel (batched and retried by bot.log_dispatcher)
+    bot.log_dispatcher.send(LOG_CHANNEL_ID, content=f"`{ts}` {actor_repr} • **{action}** {('• ' + extra) if extra else ''}")
 
 class ConfirmUnvoteView(discord.ui.View):
     def __init__(self, parent_view: "TrainingVoteView", user_id: int, timeout: int = 30):
@@ -0,0 +1,161 @@
+import os
+import asyncio
+import contextlib
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import aiosqlite
+
+DEFAULT_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 3))
+BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", 5000))
+
+# A migration step: one SQL statement, or a coroutine function taking the connection.
+Migration = Union[str, Callable[[aiosqlite.Connection], Awaitable[None]]]
+
+# Applied to every pooled connection right after it is opened.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
+
+
+class _ConnectionPool:
+    """A small fixed-size pool of long-lived connections to one SQLite file."""
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = max(1, size)
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._all: List[aiosqlite.Connection] = []
+        self._open_lock = asyncio.Lock()
+
+    async def _open_connection(self) -> aiosqlite.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = await aiosqlite.connect(self.path)
+        for pragma in CONNECTION_PRAGMAS:
+            await conn.execute(pragma)
+        return conn
+
+    async def get(self) -> aiosqlite.Connection:
+        if self._idle.empty() and len(self._all) < self.size:
+            async with self._open_lock:
+                if self._idle.empty() and len(self._all) < self.size:
+                    conn = await self._open_connection()
+                    self._all.append(conn)
+                    return conn
+        return await self._idle.get()
+
+    async def put(self, conn: aiosqlite.Connection):
+        # Never hand a half-finished transaction to the next borrower.
+        if conn.in_transaction:
+            try:
+                await conn.rollback()
+            except Exception as e:
+                print(f"[DB] Rollback on release failed for {self.path}: {e}")
+        self._idle.put_nowait(conn)
+
+    async def close(self):
+        for conn in self._all:
+            try:
+                await conn.close()
+            except Exception as e:
+                print(f"[DB] Failed to close connection to {self.path}: {e}")
+        self._all.clear()
+        self._idle = asyncio.Queue()
+
+
+class DatabaseManager:
+    """
+    Shared SQLite service attached to the bot as ``bot.db``.
+    Keeps a pool of long-lived WAL connections per database file so cogs
+    don't pay for a new worker thread and file open on every query.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE):
+        self.pool_size = pool_size
+        self._pools: Dict[str, _ConnectionPool] = {}
+        self._closed = False
+
+    def _pool_for(self, path: str) -> _ConnectionPool:
+        if self._closed:
+            raise RuntimeError(f"DatabaseManager is closed, cannot open {path}")
+        key = os.path.abspath(path)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = _ConnectionPool(key, self.pool_size)
+            self._pools[key] = pool
+        return pool
+
+    async def open(self, path: str):
+        """Open (or warm) the pool for a database file, usually from cog_load."""
+        pool = self._pool_for(path)
+        await pool.put(await pool.get())
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, path: str):
+        """
+        Borrow a pooled connection for ``path``.
+        Callers commit their own writes, anything left uncommitted is rolled back on release.
+        """
+        pool = self._pool_for(path)
+        conn = await pool.get()
+        try:
+            yield conn
+        finally:
+            await pool.put(conn)
+
+    @contextlib.asynccontextmanager
+    async def transaction(self, path: str):
+        """Borrow a connection inside BEGIN IMMEDIATE, committed on success and rolled back on error."""
+        async with self.acquire(path) as conn:
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                await conn.rollback()
+                raise
+            else:
+                await conn.commit()
+
+    async def migrate(self, path: str, migrations: Sequence[Tuple[int, Migration]]) -> int:
+        """
+        Bring a database up to date with a list of ``(version, step)`` migrations.
+        The applied version is kept in ``PRAGMA user_version``; every pending step runs in its own
+        transaction together with the version bump, so a failed step leaves the database untouched.
+        A step is either a SQL statement or ``async step(conn)``. Returns the resulting version.
+        """
+        async with self.acquire(path) as conn:
+            cursor = await conn.execute("PRAGMA user_version")
+            current = (await cursor.fetchone())[0]
+        for version, step in sorted(migrations, key=lambda m: m[0]):
+            if version <= current:
+                continue
+            async with self.transaction(path) as conn:
+                if isinstance(step, str):
+                    await conn.execute(step)
+                else:
+                    await step(conn)
+                # PRAGMA doesn't take bound parameters, version is always an int here
+                await conn.execute(f"PRAGMA user_version = {int(version)}")
+            print(f"[DB] Migrated {os.path.basename(path)} to schema version {version}")
+            current = version
+        return current
+
+    async def close(self, path: Optional[str] = None):
+        """
+        Close the pool for one database, or every pool when no path is given.
+        After a full close the manager refuses to open new pools.
+        """
+        if path is not None:
+            pool = self._pools.pop(os.path.abspath(path), None)
+            if pool:
+                await pool.close()
+            return
+        self._closed = True
+        for pool in self._pools.values():
+            await pool.close()
+        self._pools.clear()
@@ -1,60 +1,147 @@
 import os
 import json
 import base64
-import uuid
+import hashlib
 import threading
 import asyncio
+from collections import OrderedDict
 from typing import Optional, List, Dict, Any
 
 import discord
 from discord import app_commands, ui
 from discord.ext import commands
 
+from embed_cache import embed_cache
+
 EMBED_DIR = os.path.join(os.path.dirname(__file__), "data", "embeds")
 os.makedirs(EMBED_DIR, exist_ok=True)
+# Legacy whole-file map, imported into SEND_MAP_LOG once and renamed to .migrated
 SEND_MAP_FILE = os.path.join(EMBED_DIR, "send_map.json")
-_SEND_MAP_LOCK = threading.Lock()
+# Append-only JSON lines: {"k": key, "e": entry} puts, {"k": key, "d": 1} deletes
+SEND_MAP_LOG = os.path.join(EMBED_DIR, "send_map.jsonl")
+# Least recently used entries beyond this are evicted
+SEND_MAP_MAX_ENTRIES = int(os.getenv("SEND_MAP_MAX_ENTRIES", 5000))
+# Rewrite the log once it holds this many superseded lines (and more than there are live entries)
+SEND_MAP_COMPACT_THRESHOLD = int(os.getenv("SEND_MAP_COMPACT_THRESHOLD", 1000))
 
 LOG_CHANNEL_ID = None  # optional
 
 
-def _load_send_map() -> Dict[str, Any]:
-    with _SEND_MAP_LOCK:
+class SendMapStore:
+    """
+    In-memory send_map (select option key -> persisted target) backed by an append-only log.
+    Lookups are dict hits; a new entry appends one line instead of rewriting the whole file.
+    Keys are derived from the entry content so rebuilding the same view reuses its keys.
+    """
+
+    def __init__(self, log_path: str = SEND_MAP_LOG, legacy_path: str = SEND_MAP_FILE,
+                 max_entries: int = SEND_MAP_MAX_ENTRIES):
+        self.log_path = log_path
+        self.legacy_path = legacy_path
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._log_lines = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line after a crash
+                    self._log_lines += 1
+                    if rec.get("d"):
+                        self._entries.pop(rec["k"], None)
+                    else:
+                        self._entries[rec["k"]] = rec["e"]
+                        self._entries.move_to_end(rec["k"])
+        if os.path.exists(self.legacy_path):
+            try:
+                with open(self.legacy_path, "r", encoding="utf-8") as f:
+                    legacy = json.load(f)
+                for key, entry in legacy.items():
+                    self._entries.setdefault(key, entry)
+                self._compact_locked()
+                os.replace(self.legacy_path, self.legacy_path + ".migrated")
+                print(f"[EmbedNew] Migrated {len(legacy)} send_map entries to {self.log_path}")
+            except Exception as e:
+                print(f"[EmbedNew] Failed to migrate {self.legacy_path}: {e}")
+        self._evict_locked()
+
+    def _append(self, rec: Dict[str, Any]):
         try:
-            if os.path.exists(SEND_MAP_FILE):
-                with open(SEND_MAP_FILE, "r", encoding="utf-8") as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        return {}
-
-
-def _save_send_map(m: Dict[str, Any]):
-    with _SEND_MAP_LOCK:
-        tmp = SEND_MAP_FILE + ".tmp"
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            self._log_lines += 1
+        except Exception as e:
+            print(f"[EmbedNew] Failed to persist send_map entry {rec.get('k')}: {e}")
+
+    def _evict_locked(self):
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            self._append({"k": key, "d": 1})
+        garbage = self._log_lines - len(self._entries)
+        if garbage > SEND_MAP_COMPACT_THRESHOLD and garbage > len(self._entries):
+            self._compact_locked()
+
+    def _compact_locked(self):
+        # Least recently used first, so a reload keeps the recency order
+        tmp = self.log_path + ".tmp"
         try:
             with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(m, f, ensure_ascii=False, indent=2)
-            os.replace(tmp, SEND_MAP_FILE)
-        except Exception:
+                for key, entry in self._entries.items():
+                    f.write(json.dumps({"k": key, "e": entry}, ensure_ascii=False) + "\n")
+            os.replace(tmp, self.log_path)
+            self._log_lines = len(self._entries)
+        except Exception as e:
+            print(f"[EmbedNew] send_map compaction failed: {e}")
             try:
                 if os.path.exists(tmp):
                     os.remove(tmp)
             except Exception:
                 pass
 
+    def put(self, entry: Dict[str, Any]) -> str:
+        key = hashlib.sha1(json.dumps(entry, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:32]
+        with self._lock:
+            self._load()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return key
+            self._entries[key] = entry
+            self._append({"k": key, "e": entry})
+            self._evict_locked()
+        return key
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def compact(self):
+        with self._lock:
+            self._load()
+            self._compact_locked()
+
+
+_send_map = SendMapStore()
+
 
 def _put_send_map_entry(entry: Dict[str, Any]) -> str:
-    m = _load_send_map()
-    key = uuid.uuid4().hex
-    m[key] = entry
-    _save_send_map(m)
-    return key
+    return _send_map.put(entry)
 
 
 def _get_send_map_entry(key: str) -> Optional[Dict[str, Any]]:
-    m = _load_send_map()
-    return m.get(key)
+    return _send_map.get(key)
 
 
 def _parse_color(val):
@@ -164,6 +251,54 @@ def _build_discord_embed(eobj: Dict[str, Any]) -> discord.Embed:
     return emb
 
 
+def _embeds_from_obj(obj) -> List[Dict[str, Any]]:
+    """Embed dicts from a decoded send_json payload (embeds list, messages list or a bare embed)."""
+    if isinstance(obj, dict) and obj.get("embeds"):
+        return obj.get("embeds", [])
+    if isinstance(obj, dict) and obj.get("messages"):
+        # Handle new message format - flatten all embeds from all messages
+        embeds_list = []
+        for message in obj.get("messages", []):
+            embeds_list.extend(message.get("embeds", []))
+        return embeds_list
+    if isinstance(obj, list):
+        return obj
+    return [obj]
+
+
+def _embeds_from_entry(entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if entry.get("type") == "send_json":
+        return _embeds_from_obj(_decode_base64_json_token(entry.get("b64", "")))
+    if entry.get("type") == "ref_message":
+        message_obj = entry.get("message")
+        if isinstance(message_obj, dict) and message_obj.get("embeds"):
+            return message_obj.get("embeds", [])
+        return [message_obj] if isinstance(message_obj, dict) else (message_obj or [])
+    embed_obj = entry.get("embed")  # ref_embed
+    return [embed_obj] if isinstance(embed_obj, dict) else (embed_obj or [])
+
+
+def _embeds_from_saved(saved: Dict[str, Any]) -> List[Dict[str, Any]]:
+    payload = saved.get("payload") or saved
+    # Handle both old embed format and new message format
+    if payload.get("embeds"):
+        return payload.get("embeds", [])
+    embeds_list = []
+    for message in payload.get("messages", []) or []:
+        embeds_list.extend(message.get("embeds", []))
+    return embeds_list
+
+
+def _compile_embeds(embeds_list) -> List[discord.Embed]:
+    discord_embeds = []
+    for eobj in embeds_list or []:
+        try:
+            discord_embeds.append(_build_discord_embed(eobj))
+        except Exception:
+            continue
+    return discord_embeds
+
+
 class PayloadView(ui.View):
     """View which stores long targets persistently and ensures select sends only the referenced embed ephemerally."""
     def __init__(self, payload: Dict[str, Any], bot: commands.Bot, *, timeout: Optional[float] = None, persistent: bool = False):
@@ -174,6 +309,8 @@ class PayloadView(ui.View):
         self.persistent = persistent
         # local map of keys created for this view (not required but useful)
         self._local_keys: List[str] = []
+        # send:KEY targets resolved from this view's own referenced_messages, built once
+        self._compiled_refs: Dict[str, List[discord.Embed]] = {}
 
         # Handle both new message format and legacy embed format
         first = None
@@ -265,68 +402,6 @@ class PayloadView(ui.View):
                     await interaction.followup.send("No value selected.", ephemeral=True)
                     return
 
-                # if send_map: lookup persisted entry
-                if isinstance(val, str) and val.startswith("send_map:"):
-                    key = val.split(":", 1)[1]
-                    entry = _get_send_map_entry(key)
-                    if not entry:
-                        await interaction.followup.send("Referenced embed not found (maybe expired or deleted).", ephemeral=True)
-                        return
-                    # handle entry types
-                    if entry.get("type") == "send_json":
-                        try:
-                            obj = _decode_base64_json_token(entry.get("b64", ""))
-                        except Exception as ex:
-                            await interaction.followup.send(f"Invalid embedded JSON: {ex}", ephemeral=True)
-                            return
-                        if isinstance(obj, dict) and obj.get("embeds"):
-                            embeds_list = obj.get("embeds", [])
-                        elif isinstance(obj, dict) and obj.get("messages"):
-                            # Handle new message format - flatten all embeds from all messages
-                            embeds_list = []
-                            for message in obj.get("messages", []):
-                                embeds_list.extend(message.get("embeds", []))
-                        elif isinstance(obj, list):
-                            embeds_list = obj
-                        else:
-                            embeds_list = [obj]
-                    elif entry.get("type") == "ref_message":
-                        message_obj = entry.get("message")
-                        if isinstance(message_obj, dict) and message_obj.get("embeds"):
-                            embeds_list = message_obj.get("embeds", [])
-                        else:
-                            embeds_list = [message_obj] if isinstance(message_obj, dict) else (message_obj or [])
-                    elif entry.get("type") == "ref_embed":
-                        embed_obj = entry.get("embed")
-                        embeds_list = [embed_obj] if isinstance(embed_obj, dict) else (embed_obj or [])
-                    else:
-                        await interaction.followup.send("Unknown mapped entry type.", ephemeral=True)
-                        return
-
-                    # send all embeds as a single message ephemerally
-                    if embeds_list:
-                        try:
-                            # Build all embeds
-                            discord_embeds = []
-                            for eobj in embeds_list:
-                                try:
-                                    em = _build_discord_embed(eobj)
-                                    discord_embeds.append(em)
-                                except Exception:
-                                    continue
-                            
-                            if discord_embeds:
-                                await interaction.followup.send(embeds=discord_embeds, ephemeral=True)
-                            else:
-                                await interaction.followup.send("No valid embeds were found.", ephemeral=True)
-                        except Exception as e:
-                            await interaction.followup.send(f"Error sending embeds: {e}", ephemeral=True)
-                    else:
-                        await interaction.followup.send("No embeds were found.", ephemeral=True)
-                    # NOTE: do NOT send a success confirmation message for ephemeral sends
-                    return
-
-                # non-mapped targets handled normally (send:KEY loads saved file; link: posts URL)
                 await self._handle_target_send(interaction, val, True)
 
             sel.callback = make_sel_cb
@@ -334,6 +409,7 @@ class PayloadView(ui.View):
 
     async def _handle_target_send(self, interaction: discord.Interaction, target: str, ephemeral: bool):
         # target may be: send:KEY, send_json:<b64> (rare), link:<url>, or send_map:<key>
+        # Built embeds are cached (see embed_cache.py), so repeat clicks skip decoding and disk reads
         try:
             if not target:
                 await interaction.followup.send("No target specified.", ephemeral=True)
@@ -343,85 +419,46 @@ class PayloadView(ui.View):
             if target.startswith("send_json:"):
                 b64 = target.split(":", 1)[1]
                 try:
-                    obj = _decode_base64_json_token(b64)
+                    discord_embeds = embed_cache.get(
+                        embed_cache.payload_key(b64),
+                        lambda: _compile_embeds(_embeds_from_obj(_decode_base64_json_token(b64)))
+                    )
                 except Exception as ex:
                     await interaction.followup.send(f"Invalid embedded JSON: {ex}", ephemeral=True)
                     return
-                if isinstance(obj, dict) and obj.get("embeds"):
-                    embeds_list = obj.get("embeds", [])
-                elif isinstance(obj, dict) and obj.get("messages"):
-                    # Handle new message format - flatten all embeds from all messages
-                    embeds_list = []
-                    for message in obj.get("messages", []):
-                        embeds_list.extend(message.get("embeds", []))
-                elif isinstance(obj, list):
-                    embeds_list = obj
-                else:
-                    embeds_list = [obj]
 
             elif target.startswith("send_map:"):
                 key = target.split(":", 1)[1]
                 entry = _get_send_map_entry(key)
                 if not entry:
-                    await interaction.followup.send("Referenced embed not found.", ephemeral=True)
+                    await interaction.followup.send("Referenced embed not found (maybe expired or deleted).", ephemeral=True)
                     return
-                if entry.get("type") == "send_json":
-                    try:
-                        obj = _decode_base64_json_token(entry.get("b64", ""))
-                    except Exception as ex:
-                        await interaction.followup.send(f"Invalid embedded JSON: {ex}", ephemeral=True)
-                        return
-                    if isinstance(obj, dict) and obj.get("embeds"):
-                        embeds_list = obj.get("embeds", [])
-                    elif isinstance(obj, dict) and obj.get("messages"):
-                        # Handle new message format - flatten all embeds from all messages
-                        embeds_list = []
-                        for message in obj.get("messages", []):
-                            embeds_list.extend(message.get("embeds", []))
-                    elif isinstance(obj, list):
-                        embeds_list = obj
-                    else:
-                        embeds_list = [obj]
-                elif entry.get("type") == "ref_message":
-                    message_obj = entry.get("message")
-                    if isinstance(message_obj, dict) and message_obj.get("embeds"):
-                        embeds_list = message_obj.get("embeds", [])
-                    else:
-                        embeds_list = [message_obj] if isinstance(message_obj, dict) else (message_obj or [])
-                elif entry.get("type") == "ref_embed":
-                    embed_obj = entry.get("embed")
-                    embeds_list = [embed_obj] if isinstance(embed_obj, dict) else (embed_obj or [])
-                else:
+                if entry.get("type") not in ("send_json", "ref_message", "ref_embed"):
                     await interaction.followup.send("Unknown mapped entry type.", ephemeral=True)
                     return
+                try:
+                    # send_map entries never change once written, the key alone identifies them
+                    discord_embeds = embed_cache.get(target, lambda: _compile_embeds(_embeds_from_entry(entry)))
+                except Exception as ex:
+                    await interaction.followup.send(f"Invalid embedded JSON: {ex}", ephemeral=True)
+                    return
 
             elif target.startswith("send:"):
                 key = target.split(":", 1)[1]
                 # prefer referenced_messages inside original payload if provided (not persisted)
                 ref = (self.payload.get("referenced_messages") or {}).get(key)
                 if ref:
-                    if isinstance(ref, dict) and ref.get("embeds"):
-                        embeds_list = ref.get("embeds", [])
-                    else:
-                        embeds_list = [ref]
+                    if key not in self._compiled_refs:
+                        embeds_list = ref.get("embeds", []) if isinstance(ref, dict) and ref.get("embeds") else [ref]
+                        self._compiled_refs[key] = _compile_embeds(embeds_list)
+                    discord_embeds = self._compiled_refs[key]
                 else:
                     path = os.path.join(EMBED_DIR, f"{key}.json")
-                    if not os.path.exists(path):
+                    try:
+                        discord_embeds = embed_cache.get_file(path, lambda saved: _compile_embeds(_embeds_from_saved(saved)))
+                    except FileNotFoundError:
                         await interaction.followup.send(f"Referenced message '{key}' not found.", ephemeral=True)
                         return
-                    try:
-                        with open(path, "r", encoding="utf-8") as f:
-                            saved = json.load(f)
-                        payload = saved.get("payload") or saved
-                        # Handle both old embed format and new message format
-                        if payload.get("embeds"):
-                            embeds_list = payload.get("embeds", [])
-                        elif payload.get("messages"):
-                            embeds_list = []
-                            for message in payload.get("messages", []):
-                                embeds_list.extend(message.get("embeds", []))
-                        else:
-                            embeds_list = []
                     except Exception as ex:
                         await interaction.followup.send(f"Failed to load saved message: {ex}", ephemeral=True)
                         return
@@ -436,31 +473,18 @@ class PayloadView(ui.View):
                 return
 
             # send all resolved embeds as a single message
-            if embeds_list:
-                try:
-                    # Build all embeds
-                    discord_embeds = []
-                    for eobj in embeds_list:
-                        try:
-                            em = _build_discord_embed(eobj)
-                            discord_embeds.append(em)
-                        except Exception:
-                            continue
-                    
-                    if discord_embeds:
-                        if ephemeral:
-                            await interaction.followup.send(embeds=discord_embeds, ephemeral=True)
-                        else:
-                            if interaction.channel:
-                                await interaction.channel.send(embeds=discord_embeds)
-                            else:
-                                await interaction.followup.send(embeds=discord_embeds, ephemeral=True)
-                    else:
-                        await interaction.followup.send("No valid embeds were found.", ephemeral=True)
-                except Exception as e:
-                    await interaction.followup.send(f"Error sending embeds: {e}", ephemeral=True)
-            else:
-                await interaction.followup.send("No embeds were found.", ephemeral=True)
+            if not discord_embeds:
+                await interaction.followup.send("No valid embeds were found.", ephemeral=True)
+                return
+            try:
+                if ephemeral:
+                    await interaction.followup.send(embeds=discord_embeds, ephemeral=True)
+                elif interaction.channel:
+                    await interaction.channel.send(embeds=discord_embeds)
+                else:
+                    await interaction.followup.send(embeds=discord_embeds, ephemeral=True)
+            except Exception as e:
+                await interaction.followup.send(f"Error sending embeds: {e}", ephemeral=True)
 
         except Exception as ex:
             try:
@@ -492,6 +516,9 @@ class EmbedNewCog(commands.Cog):
         # Register persistent views on startup
         self._register_persistent_views()
 
+    def cog_unload(self):
+        _send_map.compact()
+
     def _register_persistent_views(self):
         """Register persistent views to survive bot restarts."""
         # Create a generic persistent view that can handle any payload
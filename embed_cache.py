@@ -0,0 +1,77 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", 256))
+
+
+class CompiledEmbedCache:
+    """
+    LRU cache of ready-to-send embeds for embed buttons and selects, shared through ``embed_cache``.
+    In-memory payloads are keyed by a hash of the payload; saved embed files are keyed by path
+    and rebuilt when their mtime or size changes. Cached values are shared between sends, so
+    callers must not mutate what they get back.
+    """
+
+    def __init__(self, max_entries: int = EMBED_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[Tuple[int, int]], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def payload_key(payload: str) -> str:
+        return "payload:" + hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: Hashable, version: Optional[Tuple[int, int]]):
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, cached[1]
+            self.misses += 1
+            return False, None
+
+    def _store(self, key: Hashable, version: Optional[Tuple[int, int]], value: Any):
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the cached value for an immutable payload, calling ``build()`` on a miss."""
+        found, value = self._lookup(key, None)
+        if found:
+            return value
+        value = build()
+        self._store(key, None, value)
+        return value
+
+    def get_file(self, path: str, build: Callable[[Any], Any]) -> Any:
+        """
+        Return ``build(parsed_json)`` for a saved embed file, re-reading it only when it changed.
+        Raises FileNotFoundError if the file does not exist.
+        """
+        st = os.stat(path)
+        version = (st.st_mtime_ns, st.st_size)
+        found, value = self._lookup(("file", path), version)
+        if found:
+            return value
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        value = build(data)
+        self._store(("file", path), version, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+embed_cache = CompiledEmbedCache()
@@ -0,0 +1,155 @@
+import os
+import asyncio
+import hashlib
+import mimetypes
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from aiohttp import web
+
+from static_server import StaticAssetServer
+
+IMG_CACHE_DIR = os.path.join("data", "img_cache")
+IMG_WORKERS = int(os.getenv("IMG_WORKERS", 2))
+IMG_MAX_WIDTH = int(os.getenv("IMG_MAX_WIDTH", 2048))
+# Requested widths are rounded up to a multiple of this, which bounds the number of variants per image
+IMG_WIDTH_STEP = int(os.getenv("IMG_WIDTH_STEP", 16))
+IMG_QUALITY = int(os.getenv("IMG_QUALITY", 80))
+
+IMG_FORMATS = {"webp": "WEBP", "png": "PNG", "jpeg": "JPEG", "jpg": "JPEG"}
+
+
+def _render_variant(src: str, dst: str, width: Optional[int], fmt: str, quality: int):
+    """Runs in a worker process: resize ``src`` to ``width`` (never upscaling) and save it as ``fmt``."""
+    from PIL import Image
+
+    with Image.open(src) as img:
+        img.load()
+        if width and width < img.width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.LANCZOS)
+        if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        options = {"optimize": True}
+        if fmt in ("WEBP", "JPEG"):
+            options["quality"] = quality
+        if fmt == "WEBP":
+            options["method"] = 4
+        tmp = f"{dst}.{os.getpid()}.tmp"
+        img.save(tmp, fmt, **options)
+    os.replace(tmp, dst)
+
+
+def _remove_stale_variants(cache_dir: str, prefix: str, current: str) -> int:
+    """Delete cached variants named ``prefix*`` that are not ``current*`` (older versions of one source)."""
+    removed = 0
+    for name in os.listdir(cache_dir):
+        # In-flight renders write to a .tmp first, leave those to finish
+        if name.startswith(prefix) and not name.startswith(current) and not name.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+class ImageResizer:
+    """
+    ``/img/<name>?w=<width>&fmt=webp|png|jpeg`` for files in the static root.
+    Variants are rendered with Pillow in a process pool, written to IMG_CACHE_DIR under a name
+    derived from the source file version and the parameters, and served through their own
+    StaticAssetServer so they get the same ETag/304/LRU handling as the originals. Rendering a
+    new version of a source deletes the variants of its older versions.
+    """
+
+    def __init__(self, source: StaticAssetServer, cache_dir: str = IMG_CACHE_DIR, workers: int = IMG_WORKERS):
+        self.source = source
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.variants = StaticAssetServer(cache_dir, show_index=False)
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._rendering: Dict[str, asyncio.Future] = {}
+
+    def add_routes(self, app: web.Application):
+        # Must be added before the static catch-all route
+        app.router.add_get("/img/{name}", self.handle)
+
+    def shutdown(self):
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    @staticmethod
+    def _parse_width(raw: Optional[str]) -> Optional[int]:
+        if not raw:
+            return None
+        try:
+            width = int(raw)
+        except ValueError:
+            raise web.HTTPBadRequest(text="w must be an integer")
+        if width < 1:
+            raise web.HTTPBadRequest(text="w must be positive")
+        width = min(width, IMG_MAX_WIDTH)
+        return -(-width // IMG_WIDTH_STEP) * IMG_WIDTH_STEP
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        src = self.source.resolve(request.match_info["name"])
+        if src is None or not await asyncio.to_thread(os.path.isfile, src):
+            raise web.HTTPNotFound()
+
+        width = self._parse_width(request.query.get("w"))
+        fmt_name = request.query.get("fmt", "").lower()
+        if fmt_name and fmt_name not in IMG_FORMATS:
+            raise web.HTTPBadRequest(text=f"fmt must be one of {', '.join(IMG_FORMATS)}")
+        if width is None and not fmt_name:
+            return await self.source.serve(request, src)
+
+        content_type = mimetypes.guess_type(src)[0] or ""
+        # Pillow can't read SVG either, fail here instead of in the worker pool
+        if not content_type.startswith("image/") or content_type == "image/svg+xml":
+            raise web.HTTPUnsupportedMediaType(text="Only raster images can be resized or converted")
+
+        stem, ext = os.path.splitext(os.path.basename(src))
+        fmt_name = fmt_name or ext.lstrip(".").lower()
+        if fmt_name not in IMG_FORMATS:
+            raise web.HTTPBadRequest(text="fmt is required for this file type")
+        fmt = IMG_FORMATS[fmt_name]
+
+        st = await asyncio.to_thread(os.stat, src)
+        # Names are <stem>-<source id>-<source version>-..., so editing the original yields fresh
+        # variants and the old version's files can be found by prefix and removed
+        source_id = hashlib.sha1(src.encode("utf-8")).hexdigest()[:12]
+        version = hashlib.sha1(f"{st.st_mtime_ns}:{st.st_size}".encode("utf-8")).hexdigest()[:12]
+        prefix = f"{stem}-{source_id}-"
+        extension = "jpg" if fmt == "JPEG" else fmt_name
+        dst = os.path.join(self.cache_dir, f"{prefix}{version}-w{width or 0}-q{IMG_QUALITY}.{extension}")
+
+        if not await asyncio.to_thread(os.path.exists, dst):
+            try:
+                await self._render(src, dst, width, fmt)
+            except Exception as e:
+                print(f"[ImageResizer] Failed to render {dst}: {e}")
+                raise web.HTTPInternalServerError(text="Image processing failed")
+            try:
+                await asyncio.to_thread(_remove_stale_variants, self.cache_dir, prefix, f"{prefix}{version}-")
+            except Exception as e:
+                print(f"[ImageResizer] Failed to clean up old variants of {src}: {e}")
+        return await self.variants.serve(request, dst)
+
+    async def _render(self, src: str, dst: str, width: Optional[int], fmt: str):
+        # Concurrent requests for the same variant share one render
+        pending = self._rendering.get(dst)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        future = asyncio.get_running_loop().run_in_executor(
+            self._pool, _render_variant, src, dst, width, fmt, IMG_QUALITY
+        )
+        self._rendering[dst] = future
+        try:
+            await asyncio.shield(future)
+        finally:
+            self._rendering.pop(dst, None)
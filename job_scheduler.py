@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import heapq
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+SCHEDULER_DB_FILE = os.path.join("data", "scheduler.db")
+# A failing job is retried with exponential backoff, then dropped after this many attempts
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 5))
+JOB_RETRY_BASE_DELAY = float(os.getenv("JOB_RETRY_BASE_DELAY", 30))
+JOB_RETRY_MAX_DELAY = float(os.getenv("JOB_RETRY_MAX_DELAY", 3600))
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+async def _add_attempts_column(db):
+    cursor = await db.execute("PRAGMA table_info(jobs)")
+    if "attempts" not in [row[1] for row in await cursor.fetchall()]:
+        await db.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+
+SCHEDULER_MIGRATIONS = [
+    (1, """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            job_key TEXT,
+            due_ts REAL NOT NULL,
+            payload TEXT NOT NULL,
+            UNIQUE (kind, job_key)
+        )
+    """),
+    (2, _add_attempts_column),
+]
+
+
+class JobScheduler:
+    """
+    Durable one-shot job scheduler attached to the bot as ``bot.scheduler``.
+    Jobs live in data/scheduler.db and in a min-heap keyed by due time; a single
+    background task sleeps until the earliest deadline instead of one sleeping
+    task per job. Cogs register a handler per job kind, jobs whose handler is not
+    registered yet stay parked until it is. A job is deleted once its handler succeeds;
+    a failing one is rescheduled with backoff up to JOB_MAX_ATTEMPTS times.
+    """
+
+    def __init__(self, bot, db_path: str = SCHEDULER_DB_FILE):
+        self.bot = bot
+        self.db_path = db_path
+        self._handlers: Dict[str, JobHandler] = {}
+        self._heap: List[Tuple[float, int]] = []
+        self._jobs: Dict[int, Tuple[str, Optional[str], float, Dict[str, Any]]] = {}
+        self._parked: Dict[str, List[int]] = {}
+        self._attempts: Dict[int, int] = {}  # failed attempts so far, only for jobs that failed
+        self._running: set = set()
+        self._dispatch_tasks: set = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._loaded = False
+        self._schema_ready = False
+
+    async def _ensure_schema(self):
+        if self._schema_ready:
+            return
+        await self.bot.db.migrate(self.db_path, SCHEDULER_MIGRATIONS)
+        self._schema_ready = True
+
+    def _push(self, job_id: int, kind: str, key: Optional[str], due_ts: float, payload: Dict[str, Any]):
+        self._jobs[job_id] = (kind, key, due_ts, payload)
+        heapq.heappush(self._heap, (due_ts, job_id))
+        self._wakeup.set()
+
+    def _forget(self, job_id: int):
+        # Heap entries are dropped lazily when they surface without a matching job
+        self._jobs.pop(job_id, None)
+        self._attempts.pop(job_id, None)
+
+    async def start(self):
+        """Load pending jobs and start the dispatch loop. Safe to call more than once (e.g. from on_ready)."""
+        if self._task and not self._task.done():
+            return
+        await self._ensure_schema()
+        # From here on schedule() pushes straight into the heap, the load below skips those
+        self._loaded = True
+        async with self.bot.db.acquire(self.db_path) as db:
+            cursor = await db.execute("SELECT job_id, kind, job_key, due_ts, payload, attempts FROM jobs")
+            rows = await cursor.fetchall()
+        for job_id, kind, key, due_ts, payload, attempts in rows:
+            if job_id not in self._jobs:
+                self._push(job_id, kind, key, due_ts, json.loads(payload))
+                if attempts:
+                    self._attempts[job_id] = attempts
+        self._task = asyncio.create_task(self._run())
+        print(f"[Scheduler] Loaded {len(rows)} pending jobs")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def register(self, kind: str, handler: JobHandler):
+        """Route jobs of ``kind`` to ``handler(payload)``. Re-queues any jobs parked while no handler existed."""
+        self._handlers[kind] = handler
+        for job_id in self._parked.pop(kind, []):
+            job = self._jobs.get(job_id)
+            if job:
+                heapq.heappush(self._heap, (job[2], job_id))
+        self._wakeup.set()
+
+    def unregister(self, kind: str):
+        self._handlers.pop(kind, None)
+
+    async def schedule(self, kind: str, due_ts: float, payload: Dict[str, Any], key: Optional[str] = None) -> int:
+        """
+        Persist a job to run at ``due_ts`` (unix seconds).
+        A job with the same kind and key replaces the pending one, which is how reschedules work.
+        """
+        await self._ensure_schema()
+        async with self.bot.db.acquire(self.db_path) as db:
+            if key is not None:
+                cursor = await db.execute("SELECT job_id FROM jobs WHERE kind = ? AND job_key = ?", (kind, key))
+                row = await cursor.fetchone()
+                if row:
+                    self._forget(row[0])
+                await db.execute("DELETE FROM jobs WHERE kind = ? AND job_key = ?", (kind, key))
+            cursor = await db.execute(
+                "INSERT INTO jobs (kind, job_key, due_ts, payload) VALUES (?, ?, ?, ?)",
+                (kind, key, due_ts, json.dumps(payload))
+            )
+            job_id = cursor.lastrowid
+            await db.commit()
+        if self._loaded:
+            self._push(job_id, kind, key, due_ts, payload)
+        return job_id
+
+    async def cancel(self, kind: str, key: str) -> bool:
+        await self._ensure_schema()
+        async with self.bot.db.acquire(self.db_path) as db:
+            cursor = await db.execute("SELECT job_id FROM jobs WHERE kind = ? AND job_key = ?", (kind, key))
+            row = await cursor.fetchone()
+            if not row:
+                return False
+            await db.execute("DELETE FROM jobs WHERE job_id = ?", (row[0],))
+            await db.commit()
+        self._forget(row[0])
+        return True
+
+    def pending(self, kind: str) -> List[Tuple[Optional[str], float, Dict[str, Any]]]:
+        """(key, due_ts, payload) for every pending job of ``kind``."""
+        return [(key, due_ts, payload) for k, key, due_ts, payload in self._jobs.values() if k == kind]
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            # Drop heap entries for cancelled/replaced jobs
+            while self._heap and self._jobs.get(self._heap[0][1], (None, None, None))[2] != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, job_id = heapq.heappop(self._heap)
+            if job_id in self._running:
+                continue
+            kind = self._jobs[job_id][0]
+            if kind not in self._handlers:
+                self._parked.setdefault(kind, []).append(job_id)
+                continue
+            self._running.add(job_id)
+            task = asyncio.create_task(self._dispatch(job_id))
+            self._dispatch_tasks.add(task)
+            task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self, job_id: int):
+        kind, key, _, payload = self._jobs[job_id]
+        try:
+            await self._handlers[kind](payload)
+        except Exception as e:
+            await self._retry_later(job_id, kind, key, payload, e)
+            return
+        finally:
+            self._running.discard(job_id)
+        # Only delete if the job was not replaced while the handler ran
+        if job_id in self._jobs:
+            self._forget(job_id)
+            await self._delete(job_id, kind, key)
+
+    async def _retry_later(self, job_id: int, kind: str, key: Optional[str], payload: Dict[str, Any], error: Exception):
+        if job_id not in self._jobs:
+            print(f"[Scheduler] Job {kind}:{key} failed: {error}")
+            return
+        attempts = self._attempts.get(job_id, 0) + 1
+        if attempts >= JOB_MAX_ATTEMPTS:
+            print(f"[Scheduler] Job {kind}:{key} failed {attempts} times, giving up: {error}")
+            self._forget(job_id)
+            await self._delete(job_id, kind, key)
+            return
+        delay = min(JOB_RETRY_MAX_DELAY, JOB_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+        print(f"[Scheduler] Job {kind}:{key} failed (attempt {attempts}/{JOB_MAX_ATTEMPTS}), retrying in {delay:.0f}s: {error}")
+        due_ts = time.time() + delay
+        try:
+            async with self.bot.db.acquire(self.db_path) as db:
+                await db.execute("UPDATE jobs SET due_ts = ?, attempts = ? WHERE job_id = ?", (due_ts, attempts, job_id))
+                await db.commit()
+        except Exception as e:
+            print(f"[Scheduler] Failed to reschedule job {kind}:{key}: {e}")
+        # Still retried in this process even if the row could not be updated
+        if job_id in self._jobs:
+            self._push(job_id, kind, key, due_ts, payload)
+            self._attempts[job_id] = attempts
+
+    async def _delete(self, job_id: int, kind: str, key: Optional[str]):
+        try:
+            async with self.bot.db.acquire(self.db_path) as db:
+                await db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+                await db.commit()
+        except Exception as e:
+            print(f"[Scheduler] Failed to delete finished job {kind}:{key}: {e}")
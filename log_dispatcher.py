@@ -0,0 +1,143 @@
+import os
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import discord
+
+# How long a channel's worker waits for more entries before sending what it has
+LOG_BATCH_WINDOW = float(os.getenv("LOG_BATCH_WINDOW", 1.0))
+# Discord allows 5 messages per 5s per channel, stay a little under that
+LOG_CHANNEL_MIN_INTERVAL = float(os.getenv("LOG_CHANNEL_MIN_INTERVAL", 1.2))
+LOG_SEND_RETRIES = int(os.getenv("LOG_SEND_RETRIES", 5))
+LOG_QUEUE_LIMIT = int(os.getenv("LOG_QUEUE_LIMIT", 1000))
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+MAX_CONTENT_CHARS = 2000
+
+LogEntry = Tuple[Optional[discord.Embed], Optional[str]]
+
+
+class LogDispatcher:
+    """
+    Bot-wide sender for log channels, attached to the bot as ``bot.log_dispatcher``.
+    ``send`` only queues the entry, so command handlers never wait on a log post.
+    One worker per channel packs queued entries into as few messages as Discord allows
+    (10 embeds / 6000 embed characters / 2000 characters of text), spaces messages out
+    per channel and retries transient failures with exponential backoff. A batch Discord
+    rejects as invalid is split and re-sent, so only the offending entry is lost.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._sending: set = set()  # channels with a batch collected but not yet sent
+
+    def send(self, channel_id: int, embed: Optional[discord.Embed] = None, content: Optional[str] = None):
+        """Queue an embed and/or a line of text for a log channel. Returns immediately."""
+        if embed is None and not content:
+            return
+        if content:
+            content = content[:MAX_CONTENT_CHARS]
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = self._queues[channel_id] = asyncio.Queue(maxsize=LOG_QUEUE_LIMIT)
+        worker = self._workers.get(channel_id)
+        if worker is None or worker.done():
+            self._workers[channel_id] = asyncio.create_task(self._worker(channel_id, queue))
+        try:
+            queue.put_nowait((embed, content))
+        except asyncio.QueueFull:
+            print(f"[LogDispatcher] Queue for channel {channel_id} is full, dropping log entry")
+
+    async def stop(self, timeout: float = 5.0):
+        """Give queued entries up to ``timeout`` seconds to go out, then stop the workers."""
+        if self.bot.is_ready():
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while (self._sending or any(not q.empty() for q in self._queues.values())) and loop.time() < deadline:
+                await asyncio.sleep(0.1)
+        for task in self._workers.values():
+            task.cancel()
+        self._workers.clear()
+
+    @staticmethod
+    def _fits(batch: List[LogEntry], entry: LogEntry) -> bool:
+        embeds = [e for e, _ in batch if e is not None]
+        lines = [c for _, c in batch if c]
+        embed, content = entry
+        if embed is not None:
+            if len(embeds) >= MAX_EMBEDS_PER_MESSAGE:
+                return False
+            if sum(len(e) for e in embeds) + len(embed) > MAX_EMBED_CHARS_PER_MESSAGE:
+                return False
+        if content and sum(len(c) + 1 for c in lines) + len(content) > MAX_CONTENT_CHARS:
+            return False
+        return True
+
+    async def _worker(self, channel_id: int, queue: asyncio.Queue):
+        await self.bot.wait_until_ready()
+        loop = asyncio.get_running_loop()
+        carry: Optional[LogEntry] = None
+        last_send = 0.0
+        while True:
+            batch = [carry if carry is not None else await queue.get()]
+            carry = None
+            self._sending.add(channel_id)
+            deadline = loop.time() + LOG_BATCH_WINDOW
+            while True:
+                timeout = deadline - loop.time()
+                if queue.empty() and timeout <= 0:
+                    break
+                try:
+                    entry = queue.get_nowait() if not queue.empty() else await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not self._fits(batch, entry):
+                    carry = entry
+                    break
+                batch.append(entry)
+
+            wait = last_send + LOG_CHANNEL_MIN_INTERVAL - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self._send_batch(channel_id, batch)
+            last_send = loop.time()
+            if carry is None:
+                self._sending.discard(channel_id)
+
+    async def _send_batch(self, channel_id: int, batch: List[LogEntry]):
+        kwargs = {}
+        embeds = [e for e, _ in batch if e is not None]
+        lines = [c for _, c in batch if c]
+        if embeds:
+            kwargs["embeds"] = embeds
+        if lines:
+            kwargs["content"] = "\n".join(lines)
+
+        for attempt in range(LOG_SEND_RETRIES):
+            try:
+                channel = self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+                await channel.send(**kwargs)
+                return
+            except (discord.Forbidden, discord.NotFound) as e:
+                print(f"[LogDispatcher] Dropping {len(batch)} log entries for channel {channel_id}: {e}")
+                return
+            except discord.HTTPException as e:
+                if e.status == 400 and len(batch) > 1:
+                    # One bad entry (e.g. an over-long embed field) fails the whole message,
+                    # send each half on its own so only that entry is dropped
+                    middle = len(batch) // 2
+                    await self._send_batch(channel_id, batch[:middle])
+                    await self._send_batch(channel_id, batch[middle:])
+                    return
+                # 4xx other than rate limits won't succeed on retry (discord.py already sleeps out 429s)
+                if e.status < 500 and e.status != 429:
+                    print(f"[LogDispatcher] Dropping {len(batch)} log entries for channel {channel_id}: {e}")
+                    return
+                error = e
+            except Exception as e:
+                error = e
+            await asyncio.sleep(min(60, 2 ** attempt))
+        print(f"[LogDispatcher] Giving up on {len(batch)} log entries for channel {channel_id}: {error}")
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+import datetime
+from typing import Any, Dict, List, Optional
+
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 10))
+# Also roll a file over when its last write was on an earlier UTC day (off by default)
+LOG_ROTATE_DAILY = os.getenv("LOG_ROTATE_DAILY", "0") == "1"
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", 1.0))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", 500))
+
+
+class LogWriter:
+    """
+    Shared JSON-lines log writer used by every cog through ``write_log``.
+    Records are queued and written by one background thread in batches, so file I/O
+    never runs on the event loop. Files roll over to ``.1`` .. ``.N`` once they pass
+    LOG_MAX_BYTES (and optionally once a day), keeping at most LOG_BACKUP_COUNT old files.
+    """
+
+    def __init__(self, max_bytes: int = LOG_MAX_BYTES, backup_count: int = LOG_BACKUP_COUNT,
+                 rotate_daily: bool = LOG_ROTATE_DAILY, flush_interval: float = LOG_FLUSH_INTERVAL):
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rotate_daily = rotate_daily
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def write(self, path: str, event: str, **fields: Any):
+        """Queue one record; ``ts`` and ``event`` are added in front of ``fields``."""
+        record = {"ts": datetime.datetime.now(datetime.timezone.utc).isoformat(), "event": event}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        self._ensure_thread()
+        self._queue.put(("write", path, line))
+
+    def drop_matching(self, path: str, needle: str):
+        """
+        Remove lines containing ``needle`` from the file and its rotated backups,
+        after everything queued before it is written.
+        """
+        self._ensure_thread()
+        self._queue.put(("drop", path, needle))
+
+    def flush(self, timeout: float = 5.0):
+        """Block until everything queued so far is on disk (used on shutdown)."""
+        if not self._thread or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(("flush", None, done))
+        done.wait(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Collect whatever else arrives within the flush interval into the same batch
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < LOG_BATCH_SIZE and batch[-1][0] == "write":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._process(batch)
+
+    def _process(self, batch: List[tuple]):
+        pending: Dict[str, List[str]] = {}
+        for op, path, arg in batch:
+            if op == "write":
+                pending.setdefault(path, []).append(arg)
+                continue
+            self._write_pending(pending)
+            pending = {}
+            if op == "drop":
+                self._drop(path, arg)
+            elif op == "flush":
+                arg.set()
+        self._write_pending(pending)
+
+    def _write_pending(self, pending: Dict[str, List[str]]):
+        for path, lines in pending.items():
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                if self._should_rotate(path):
+                    self._rotate(path)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+            except Exception as e:
+                print(f"[LogWriter] Failed to write {len(lines)} records to {path}: {e}")
+
+    def _should_rotate(self, path: str) -> bool:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return False
+        if self.max_bytes and st.st_size >= self.max_bytes:
+            return True
+        if self.rotate_daily:
+            last_write = datetime.datetime.fromtimestamp(st.st_mtime, datetime.timezone.utc).date()
+            return last_write < datetime.datetime.now(datetime.timezone.utc).date()
+        return False
+
+    def _rotate(self, path: str):
+        if self.backup_count <= 0:
+            os.remove(path)
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{path}.{i + 1}")
+        os.replace(path, f"{path}.1")
+
+    def _drop(self, path: str, needle: str):
+        for target in [path] + [f"{path}.{i}" for i in range(1, self.backup_count + 1)]:
+            try:
+                if not os.path.exists(target):
+                    continue
+                with open(target, "r", encoding="utf-8") as f:
+                    lines = f.readlines()
+                kept = [line for line in lines if needle not in line]
+                if len(kept) == len(lines):
+                    continue
+                with open(target, "w", encoding="utf-8") as f:
+                    f.writelines(kept)
+            except Exception as e:
+                print(f"[LogWriter] Failed to drop lines from {target}: {e}")
+
+
+log_writer = LogWriter()
+atexit.register(log_writer.flush)
+
+
+def write_log(path: str, event: str, **fields: Any):
+    log_writer.write(path, event, **fields)
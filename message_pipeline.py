@@ -0,0 +1,117 @@
+import time
+import asyncio
+import traceback
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+import discord
+
+MessageHandler = Callable[[discord.Message], Awaitable[None]]
+MessagePredicate = Callable[[discord.Message], bool]
+
+
+@dataclass(eq=False)
+class _Route:
+    name: str
+    handler: MessageHandler
+    guild_only: bool
+    allow_bots: bool
+    require_mentions: bool
+    predicate: Optional[MessagePredicate]
+    calls: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    channel_ids: frozenset = field(default_factory=frozenset)
+
+    def matches(self, message: discord.Message) -> bool:
+        if not self.allow_bots and message.author.bot:
+            return False
+        if self.guild_only and message.guild is None:
+            return False
+        if self.require_mentions and not message.mentions:
+            return False
+        return self.predicate is None or bool(self.predicate(message))
+
+
+class MessagePipeline:
+    """
+    Single on_message listener shared by every cog, attached to the bot as ``bot.message_pipeline``.
+    Cogs register a handler together with cheap filters (channel ids, guild only, bots,
+    has mentions, or a custom predicate). Each message is checked against the handlers for its
+    channel plus the channel-agnostic ones in one pass, and only the matching handlers run.
+    Per-handler call counts and timings are kept for ``stats()``.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._routes: Dict[str, _Route] = {}
+        self._by_channel: Dict[int, List[_Route]] = {}
+        self._any_channel: List[_Route] = []
+        self.messages_seen = 0
+
+    def register(self, name: str, handler: MessageHandler, *, channel_ids: Optional[Iterable[int]] = None,
+                 guild_only: bool = False, allow_bots: bool = False, require_mentions: bool = False,
+                 predicate: Optional[MessagePredicate] = None):
+        """Route matching messages to ``handler(message)``. Registering an existing name replaces it."""
+        self.unregister(name)
+        route = _Route(name, handler, guild_only, allow_bots, require_mentions, predicate,
+                       channel_ids=frozenset(channel_ids or ()))
+        self._routes[name] = route
+        if route.channel_ids:
+            for channel_id in route.channel_ids:
+                self._by_channel.setdefault(channel_id, []).append(route)
+        else:
+            self._any_channel.append(route)
+
+    def unregister(self, name: str):
+        route = self._routes.pop(name, None)
+        if route is None:
+            return
+        if not route.channel_ids:
+            self._any_channel.remove(route)
+            return
+        for channel_id in route.channel_ids:
+            routes = self._by_channel[channel_id]
+            routes.remove(route)
+            if not routes:
+                del self._by_channel[channel_id]
+
+    async def dispatch(self, message: discord.Message):
+        self.messages_seen += 1
+        matched = [r for r in self._by_channel.get(message.channel.id, ()) if r.matches(message)]
+        matched.extend(r for r in self._any_channel if r.matches(message))
+        if not matched:
+            return
+        if len(matched) == 1:
+            await self._run(matched[0], message)
+        else:
+            await asyncio.gather(*(self._run(route, message) for route in matched))
+
+    async def _run(self, route: _Route, message: discord.Message):
+        start = time.perf_counter()
+        try:
+            await route.handler(message)
+        except Exception:
+            route.errors += 1
+            print(f"[MessagePipeline] Handler {route.name} failed:\n{traceback.format_exc()}")
+        finally:
+            elapsed = time.perf_counter() - start
+            route.calls += 1
+            route.total_time += elapsed
+            route.max_time = max(route.max_time, elapsed)
+
+    def stats(self) -> List[Dict[str, object]]:
+        """Per-handler counters, slowest total time first."""
+        rows = [
+            {
+                "name": r.name,
+                "calls": r.calls,
+                "errors": r.errors,
+                "total_ms": r.total_time * 1000,
+                "avg_ms": (r.total_time / r.calls * 1000) if r.calls else 0.0,
+                "max_ms": r.max_time * 1000,
+            }
+            for r in self._routes.values()
+        ]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
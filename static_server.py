@@ -0,0 +1,199 @@
+import os
+import gzip
+import stat
+import html
+import time
+import asyncio
+import hashlib
+import mimetypes
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+from aiohttp import web
+
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", 3600))
+# Total bytes of file bodies (plus compressed variants) kept in memory
+STATIC_CACHE_BYTES = int(os.getenv("STATIC_CACHE_BYTES", 64 * 1024 * 1024))
+# Bigger files are streamed from disk instead of cached
+STATIC_MAX_FILE_BYTES = int(os.getenv("STATIC_MAX_FILE_BYTES", 8 * 1024 * 1024))
+# A cached file is re-stat'ed at most this often, so hot hits do no disk I/O at all
+STATIC_REVALIDATE_SECONDS = float(os.getenv("STATIC_REVALIDATE_SECONDS", 2.0))
+
+# Compressed on load when no .gz sidecar exists; images are already compressed
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+COMPRESS_MIN_BYTES = 1024
+
+
+class _CachedFile:
+    __slots__ = ("version", "checked_at", "body", "gzip_body", "etag", "content_type", "last_modified")
+
+    def __init__(self, version, body, gzip_body, etag, content_type, last_modified):
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.body = body
+        self.gzip_body = gzip_body
+        self.etag = etag
+        self.content_type = content_type
+        self.last_modified = last_modified
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + (len(self.gzip_body) if self.gzip_body else 0)
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _read_variants(path: str, content_type: str) -> Tuple[bytes, Optional[bytes], str]:
+    """(body, gzip body or None, strong ETag); runs in a worker thread."""
+    with open(path, "rb") as f:
+        body = f.read()
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    gz_path = path + ".gz"
+    if os.path.exists(gz_path) and os.path.getmtime(gz_path) >= os.path.getmtime(path):
+        with open(gz_path, "rb") as f:
+            return body, f.read(), etag
+    if len(body) >= COMPRESS_MIN_BYTES and content_type.startswith(COMPRESSIBLE_TYPES):
+        return body, gzip.compress(body, compresslevel=6), etag
+    return body, None, etag
+
+
+class StaticAssetServer:
+    """
+    Serves a directory over aiohttp with strong ETags, Cache-Control and 304 responses.
+    Small files are kept in an in-memory LRU (bounded by STATIC_CACHE_BYTES) together with a
+    gzip variant: a pre-built ``<file>.gz`` next to the file if present, otherwise compressed
+    once on load for text types. Disk reads run in a worker thread.
+    """
+
+    def __init__(self, root: str, max_age: int = STATIC_MAX_AGE, cache_bytes: int = STATIC_CACHE_BYTES,
+                 show_index: bool = True):
+        self.root = os.path.realpath(root)
+        self.max_age = max_age
+        self.cache_bytes = cache_bytes
+        self.show_index = show_index
+        self._cache: "OrderedDict[str, _CachedFile]" = OrderedDict()
+        self._cached_bytes = 0
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    def add_routes(self, app: web.Application):
+        app.router.add_get("/{path:.*}", self.handle)
+
+    def resolve(self, rel_path: str) -> Optional[str]:
+        """Absolute path under root for a request path, or None if it escapes root or is hidden."""
+        parts = [p for p in rel_path.split("/") if p]
+        if any(p.startswith(".") for p in parts):
+            return None
+        path = os.path.realpath(os.path.join(self.root, *parts))
+        if path != self.root and not path.startswith(self.root + os.sep):
+            return None
+        return path
+
+    def _cache_headers(self, etag: str, last_modified: float) -> Dict[str, str]:
+        return {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Last-Modified": time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(last_modified)),
+        }
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        path = self.resolve(request.match_info.get("path", ""))
+        if path is None:
+            raise web.HTTPNotFound()
+        return await self.serve(request, path)
+
+    async def serve(self, request: web.Request, path: str) -> web.StreamResponse:
+        """Respond with the file at ``path`` (already resolved/validated by the caller)."""
+        entry = self._cache.get(path)
+        if entry is not None and time.monotonic() - entry.checked_at < STATIC_REVALIDATE_SECONDS:
+            self._cache.move_to_end(path)
+        else:
+            try:
+                st = await asyncio.to_thread(os.stat, path)
+            except (FileNotFoundError, NotADirectoryError):
+                self._evict(path)
+                raise web.HTTPNotFound()
+            if stat.S_ISDIR(st.st_mode):
+                if not self.show_index:
+                    raise web.HTTPForbidden()
+                return await self._index(request, path)
+            if st.st_size > STATIC_MAX_FILE_BYTES:
+                # aiohttp's FileResponse streams with its own ETag/304 handling
+                response = web.FileResponse(path)
+                response.headers["Cache-Control"] = f"public, max-age={self.max_age}"
+                return response
+            entry = await self._load(path, (st.st_mtime_ns, st.st_size), st.st_mtime)
+
+        headers = self._cache_headers(entry.etag, entry.last_modified)
+        if _etag_matches(request.headers.get("If-None-Match"), entry.etag):
+            return web.Response(status=304, headers=headers)
+
+        body = entry.body
+        if entry.gzip_body is not None:
+            headers["Vary"] = "Accept-Encoding"
+            if "gzip" in request.headers.get("Accept-Encoding", ""):
+                headers["Content-Encoding"] = "gzip"
+                body = entry.gzip_body
+        return web.Response(body=body, content_type=entry.content_type, headers=headers)
+
+    async def _load(self, path: str, version: Tuple[int, int], mtime: float) -> _CachedFile:
+        entry = self._cache.get(path)
+        if entry is not None and entry.version == version:
+            entry.checked_at = time.monotonic()
+            self._cache.move_to_end(path)
+            return entry
+        # Concurrent misses for the same file share one read
+        pending = self._loading.get(path)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._loading[path] = future
+        try:
+            content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            body, gzip_body, etag = await asyncio.to_thread(_read_variants, path, content_type)
+            entry = _CachedFile(version, body, gzip_body, etag, content_type, mtime)
+            self._store(path, entry)
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._loading[path]
+
+    def _store(self, path: str, entry: _CachedFile):
+        self._evict(path)
+        if entry.size > self.cache_bytes:
+            return
+        self._cache[path] = entry
+        self._cached_bytes += entry.size
+        while self._cached_bytes > self.cache_bytes:
+            _, old = self._cache.popitem(last=False)
+            self._cached_bytes -= old.size
+
+    def _evict(self, path: str):
+        old = self._cache.pop(path, None)
+        if old is not None:
+            self._cached_bytes -= old.size
+
+    async def _index(self, request: web.Request, path: str) -> web.Response:
+        names = sorted(n for n in await asyncio.to_thread(os.listdir, path) if not n.startswith("."))
+        base = request.path.rstrip("/")
+        rel = os.path.relpath(path, self.root)
+        title = "Index of /" + ("" if rel == "." else rel.replace(os.sep, "/"))
+        items = "".join(
+            f'<li><a href="{base}/{quote(name)}">{html.escape(name)}</a></li>' for name in names
+        )
+        body = f"<html><head><title>{html.escape(title)}</title></head><body><h1>{html.escape(title)}</h1><ul>{items}</ul></body></html>"
+        return web.Response(text=body, content_type="text/html")
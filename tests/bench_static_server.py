@@ -0,0 +1,96 @@
+"""
+Load test for StaticAssetServer against a local aiohttp TestServer.
+
+    python tests/bench_static_server.py [--root HTTP] [--requests 2000] [--concurrency 50]
+
+Reports requests/second for cold (empty cache), warm (cached) and If-None-Match (304) traffic,
+plus how many times the server touched the disk during each phase (cached files are
+re-stat'ed at most once per STATIC_REVALIDATE_SECONDS, file bodies are only read on a miss).
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+import static_server
+from static_server import StaticAssetServer
+
+_disk = {"stat": 0, "read": 0}
+_root = ""
+_real_stat = os.stat
+_real_read = static_server._read_variants
+
+
+def _counting_stat(path, *args, **kwargs):
+    if str(path).startswith(_root):
+        _disk["stat"] += 1
+    return _real_stat(path, *args, **kwargs)
+
+
+def _counting_read(path, content_type):
+    _disk["read"] += 1
+    return _real_read(path, content_type)
+
+
+async def _phase(client, name, paths, total, concurrency, headers_for=None):
+    _disk.update(stat=0, read=0)
+    sem = asyncio.Semaphore(concurrency)
+    statuses = {}
+    received = 0
+
+    async def one(i):
+        nonlocal received
+        path = paths[i % len(paths)]
+        headers = headers_for(path) if headers_for else None
+        async with sem:
+            async with client.get(path, headers=headers) as r:
+                body = await r.read()
+                received += len(body)
+                statuses[r.status] = statuses.get(r.status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<14} {total / elapsed:9.0f} req/s  {received / elapsed / 1e6:8.1f} MB/s  "
+          f"status={statuses}  stat()={_disk['stat']} reads={_disk['read']}")
+
+
+async def main(root, total, concurrency):
+    global _root
+    _root = os.path.realpath(root)
+    os.stat = _counting_stat
+    static_server._read_variants = _counting_read
+    names = sorted(n for n in os.listdir(root) if not n.startswith(".") and os.path.isfile(os.path.join(root, n)))
+    if not names:
+        raise SystemExit(f"No files to serve in {root}")
+    paths = ["/" + n for n in names]
+
+    app = web.Application()
+    server = StaticAssetServer(root)
+    server.add_routes(app)
+    async with TestClient(TestServer(app)) as client:
+        print(f"{len(paths)} files from {root}, {total} requests per phase, concurrency {concurrency}")
+        # Cold: every file is loaded once, the rest of the phase is served from the fresh cache
+        await _phase(client, "cold", paths, total, concurrency)
+        await _phase(client, "warm", paths, total, concurrency)
+        etags = {}
+        for path in paths:
+            async with client.get(path) as r:
+                etags[path] = r.headers.get("ETag", "")
+        await _phase(client, "if-none-match", paths, total, concurrency,
+                     headers_for=lambda p: {"If-None-Match": etags[p]})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--root", default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "HTTP"))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.root, args.requests, args.concurrency))
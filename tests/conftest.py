@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the bot's root modules and cogs the same way bot.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import random
+
+from cogs.MDT import ArrestIdAllocator
+
+
+async def _reserve_concurrently(allocator, counts):
+    return await asyncio.gather(*(asyncio.to_thread(allocator.reserve, n) for n in counts))
+
+
+def test_parallel_reserves_never_duplicate(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / "arrest_id.json")
+    allocator = ArrestIdAllocator(path=path, block_size=20)
+    counts = [random.randint(1, 5) for _ in range(500)]
+
+    blocks = asyncio.run(_reserve_concurrently(allocator, counts))
+
+    ids = [i for block in blocks for i in block]
+    assert len(ids) == len(set(ids)) == sum(counts)
+    for block, count in zip(blocks, counts):
+        # Every reservation is one contiguous run of the requested size
+        assert list(block) == list(range(block[0], block[0] + count))
+    # Within one process nothing is skipped
+    assert sorted(ids) == list(range(1, sum(counts) + 1))
+    # The persisted mark always covers everything handed out
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f)["id"] >= max(ids)
+
+
+def test_restart_continues_above_persisted_mark(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / "arrest_id.json")
+    first = ArrestIdAllocator(path=path, block_size=20)
+    before = asyncio.run(_reserve_concurrently(first, [1] * 300))
+
+    # A new allocator (bot restart) must not reuse anything from the previous run
+    second = ArrestIdAllocator(path=path, block_size=20)
+    after = asyncio.run(_reserve_concurrently(second, [1] * 300))
+
+    old_ids = {i for block in before for i in block}
+    new_ids = {i for block in after for i in block}
+    assert len(new_ids) == 300
+    assert not old_ids & new_ids
+    assert min(new_ids) > max(old_ids)
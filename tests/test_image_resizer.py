@@ -0,0 +1,142 @@
+import asyncio
+import io
+import os
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from PIL import Image
+
+from image_resizer import ImageResizer
+from static_server import StaticAssetServer
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _png(path, size=(100, 50), colour=(200, 30, 30)):
+    Image.new("RGB", size, colour).save(path, "PNG")
+
+
+async def _client(root, cache_dir):
+    app = web.Application()
+    static = StaticAssetServer(str(root))
+    resizer = ImageResizer(static, cache_dir=str(cache_dir), workers=1)
+    resizer.add_routes(app)
+    static.add_routes(app)
+    renders = []
+    render = resizer._render
+
+    async def counting_render(src, dst, width, fmt):
+        renders.append(os.path.basename(dst))
+        await render(src, dst, width, fmt)
+
+    resizer._render = counting_render
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    return client, resizer, renders
+
+
+def test_resize_webp_and_variant_reuse(tmp_path):
+    root, cache = tmp_path / "HTTP", tmp_path / "img_cache"
+    root.mkdir()
+    _png(root / "badge.png")
+
+    async def scenario():
+        client, resizer, renders = await _client(root, cache)
+        try:
+            resp = await client.get("/img/badge.png?w=20")
+            assert resp.status == 200
+            assert resp.content_type == "image/png"
+            with Image.open(io.BytesIO(await resp.read())) as img:
+                # Widths round up to IMG_WIDTH_STEP, height keeps the aspect ratio
+                assert (img.format, img.size) == ("PNG", (32, 16))
+
+            resp = await client.get("/img/badge.png?fmt=webp")
+            assert resp.status == 200
+            assert resp.content_type == "image/webp"
+            with Image.open(io.BytesIO(await resp.read())) as img:
+                assert (img.format, img.size) == ("WEBP", (100, 50))
+
+            # Repeat requests (and widths that round to the same step) reuse the cached files
+            for query in ("w=20", "w=32", "fmt=webp"):
+                assert (await client.get(f"/img/badge.png?{query}")).status == 200
+            assert len(renders) == 2
+            assert len(os.listdir(cache)) == 2
+
+            # Never upscales
+            resp = await client.get("/img/badge.png?w=400&fmt=jpeg")
+            with Image.open(io.BytesIO(await resp.read())) as img:
+                assert (img.format, img.size) == ("JPEG", (100, 50))
+        finally:
+            await client.close()
+            resizer.shutdown()
+
+    _run(scenario())
+
+
+def test_editing_the_source_removes_old_variants(tmp_path):
+    root, cache = tmp_path / "HTTP", tmp_path / "img_cache"
+    root.mkdir()
+    _png(root / "badge.png")
+    # Same stem, different source: its variants must survive badge.png's cleanup
+    _png(root / "badge.jpeg", colour=(0, 0, 255))
+
+    async def scenario():
+        client, resizer, renders = await _client(root, cache)
+        try:
+            for query in ("w=16", "w=48", "fmt=webp"):
+                assert (await client.get(f"/img/badge.png?{query}")).status == 200
+            assert (await client.get("/img/badge.jpeg?w=16")).status == 200
+            old = set(os.listdir(cache))
+            assert len(old) == 4
+
+            _png(root / "badge.png", size=(64, 64))
+            stat = os.stat(root / "badge.png")
+            os.utime(root / "badge.png", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            resp = await client.get("/img/badge.png?w=16")
+            with Image.open(io.BytesIO(await resp.read())) as img:
+                assert img.size == (16, 16)
+
+            left = set(os.listdir(cache))
+            assert len(left) == 2
+            assert len(left - old) == 1  # the new badge.png variant
+            assert len(left & old) == 1  # badge.jpeg's variant
+        finally:
+            await client.close()
+            resizer.shutdown()
+
+    _run(scenario())
+
+
+def test_bad_requests(tmp_path):
+    root, cache = tmp_path / "HTTP", tmp_path / "img_cache"
+    root.mkdir()
+    _png(root / "badge.png")
+    (root / "index.html").write_text("<h1>hi</h1>")
+    (root / "logo.svg").write_text("<svg xmlns='http://www.w3.org/2000/svg'/>")
+    (root / "anim.gif").write_bytes(b"GIF89a")
+
+    async def scenario():
+        client, resizer, renders = await _client(root, cache)
+        try:
+            assert (await client.get("/img/missing.png?w=10")).status == 404
+            assert (await client.get("/img/.hidden.png?w=10")).status == 404
+            assert (await client.get("/img/badge.png?w=abc")).status == 400
+            assert (await client.get("/img/badge.png?w=0")).status == 400
+            assert (await client.get("/img/badge.png?fmt=bmp")).status == 400
+            # A raster type Pillow could read but without a target format
+            assert (await client.get("/img/anim.gif?w=10")).status == 400
+            # Non-images are rejected before anything reaches the worker pool
+            assert (await client.get("/img/index.html?fmt=webp")).status == 415
+            assert (await client.get("/img/logo.svg?w=10")).status == 415
+            assert renders == []
+            # Without parameters the original is served as-is
+            resp = await client.get("/img/index.html")
+            assert resp.status == 200
+            assert await resp.text() == "<h1>hi</h1>"
+        finally:
+            await client.close()
+            resizer.shutdown()
+
+    _run(scenario())
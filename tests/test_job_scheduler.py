@@ -0,0 +1,120 @@
+import asyncio
+import contextlib
+import time
+
+import job_scheduler
+from db_manager import DatabaseManager
+from job_scheduler import JobScheduler
+
+
+class _Bot:
+    def __init__(self):
+        self.db = DatabaseManager()
+
+
+@contextlib.asynccontextmanager
+async def _scheduler(path, **handlers):
+    bot = _Bot()
+    scheduler = JobScheduler(bot, db_path=path)
+    for kind, handler in handlers.items():
+        scheduler.register(kind, handler)
+    try:
+        await scheduler.start()
+        yield bot, scheduler
+    finally:
+        # Close the pools even when an assertion fails, their threads would keep the test process alive
+        await scheduler.stop()
+        await bot.db.close()
+
+
+async def _rows(bot, path):
+    async with bot.db.acquire(path) as db:
+        cursor = await db.execute("SELECT job_key, attempts FROM jobs")
+        return await cursor.fetchall()
+
+
+async def _wait_until(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if await condition():
+            return
+        await asyncio.sleep(0.05)
+
+
+def test_failed_job_is_kept_and_retried_until_it_succeeds(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_scheduler, "JOB_RETRY_BASE_DELAY", 0.3)
+    path = str(tmp_path / "scheduler.db")
+    calls = []
+
+    async def flaky(payload):
+        calls.append(payload["n"])
+        if len(calls) < 3:
+            raise RuntimeError("boom")
+
+    async def run():
+        async with _scheduler(path, flaky=flaky) as (bot, scheduler):
+            await scheduler.schedule("flaky", time.time(), {"n": 1}, key="a")
+            await asyncio.sleep(0.1)
+            # The first failure keeps the row and records the attempt
+            assert calls == [1]
+            assert await _rows(bot, path) == [("a", 1)]
+
+            async def done():
+                return len(calls) == 3 and not await _rows(bot, path)
+
+            await _wait_until(done)
+            assert calls == [1, 1, 1]
+            assert await _rows(bot, path) == []
+            assert scheduler.pending("flaky") == []
+
+    asyncio.run(run())
+
+
+def test_failing_job_is_dropped_after_max_attempts(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_scheduler, "JOB_RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(job_scheduler, "JOB_MAX_ATTEMPTS", 3)
+    path = str(tmp_path / "scheduler.db")
+    calls = []
+
+    async def broken(payload):
+        calls.append(1)
+        raise RuntimeError("always")
+
+    async def run():
+        async with _scheduler(path, broken=broken) as (bot, scheduler):
+            await scheduler.schedule("broken", time.time(), {}, key="b")
+
+            async def done():
+                return len(calls) == 3 and not await _rows(bot, path)
+
+            await _wait_until(done)
+            await asyncio.sleep(0.1)
+            assert len(calls) == 3
+            assert await _rows(bot, path) == []
+            assert scheduler.pending("broken") == []
+
+    asyncio.run(run())
+
+
+def test_attempts_and_backoff_survive_a_restart(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_scheduler, "JOB_RETRY_BASE_DELAY", 60)
+    path = str(tmp_path / "scheduler.db")
+
+    async def broken(payload):
+        raise RuntimeError("down")
+
+    async def fail_once():
+        async with _scheduler(path, broken=broken) as (bot, scheduler):
+            await scheduler.schedule("broken", time.time(), {}, key="c")
+            await asyncio.sleep(0.1)
+
+    async def reload():
+        async with _scheduler(path) as (bot, scheduler):
+            return scheduler.pending("broken"), dict(scheduler._attempts)
+
+    asyncio.run(fail_once())
+    pending, attempts = asyncio.run(reload())
+    [(key, due_ts, _)] = pending
+    assert key == "c"
+    assert due_ts > time.time() + 30
+    assert list(attempts.values()) == [1]
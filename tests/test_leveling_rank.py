@@ -0,0 +1,69 @@
+import asyncio
+import random
+import types
+
+from cogs import leveling
+from db_manager import DatabaseManager
+
+
+def _cog():
+    bot = types.SimpleNamespace(db=DatabaseManager())
+    cog = leveling.Leveling(bot)
+    return bot, cog
+
+
+async def _create_table(bot, path):
+    async with bot.db.acquire(path) as db:
+        await db.execute("CREATE TABLE users (user_id INTEGER PRIMARY KEY, xp INTEGER NOT NULL, level INTEGER NOT NULL)")
+        await db.commit()
+
+
+def test_rank_counts_buffered_users_without_flushing(tmp_path, monkeypatch):
+    path = str(tmp_path / "leveling.db")
+    monkeypatch.setattr(leveling, "DB_PATH", path)
+    monkeypatch.setattr(leveling, "RANK_QUERY_CHUNK", 7)  # exercise the chunked IN queries
+    rng = random.Random(1234)
+
+    async def run():
+        bot, cog = _cog()
+        try:
+            await _create_table(bot, path)
+            users = list(range(1, 61))
+            for _ in range(20):
+                # A few users earn XP, some of it flushed and some still buffered
+                for uid in rng.sample(users, 25):
+                    data = await cog.get_user_data(uid)
+                    await cog.update_user_data(uid, data["xp"] + rng.randint(1, 5) * 10, data["level"])
+                if rng.random() < 0.5:
+                    await cog.flush_xp()
+
+                ranks = {uid: await cog.get_rank(uid) for uid in users}
+                await cog.flush_xp()
+                expected = {uid: await cog.get_rank(uid) for uid in users}
+
+                assert ranks == expected
+            # Users that never earned XP stay unranked
+            assert await cog.get_rank(999) is None
+        finally:
+            await bot.db.close()
+
+    asyncio.run(run())
+
+
+def test_rank_does_not_flush(tmp_path, monkeypatch):
+    path = str(tmp_path / "leveling.db")
+    monkeypatch.setattr(leveling, "DB_PATH", path)
+
+    async def run():
+        bot, cog = _cog()
+        try:
+            await _create_table(bot, path)
+            await cog.update_user_data(1, 100, 0)
+            await cog.update_user_data(2, 50, 0)
+            assert await cog.get_rank(2) == 2
+            assert await cog.get_rank(1) == 1
+            assert cog.dirty_users == {1, 2}
+        finally:
+            await bot.db.close()
+
+    asyncio.run(run())
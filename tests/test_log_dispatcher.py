@@ -0,0 +1,91 @@
+import asyncio
+import types
+
+import discord
+
+import log_dispatcher
+from log_dispatcher import LogDispatcher
+
+CHANNEL_ID = 123
+
+
+class _RejectingChannel:
+    """Records sends and answers 400 for any message containing an embed titled "bad"."""
+
+    def __init__(self):
+        self.sent = []
+        self.attempts = 0
+
+    async def send(self, embeds=None, content=None):
+        self.attempts += 1
+        embeds = embeds or []
+        if any(e.title == "bad" for e in embeds) or (content and "bad" in content.split("\n")):
+            raise discord.HTTPException(types.SimpleNamespace(status=400, reason="Bad Request"), "Invalid Form Body")
+        self.sent.append(([e.title for e in embeds], content))
+
+
+class _Bot:
+    def __init__(self, channel):
+        self.channel = channel
+
+    def get_channel(self, channel_id):
+        return self.channel
+
+    def is_ready(self):
+        return True
+
+    async def wait_until_ready(self):
+        pass
+
+
+def _titles(channel):
+    return [title for embeds, _ in channel.sent for title in embeds]
+
+
+def test_rejected_batch_only_drops_the_bad_entry():
+    channel = _RejectingChannel()
+    dispatcher = LogDispatcher(_Bot(channel))
+    batch = [(discord.Embed(title=f"entry {i}"), None) for i in range(10)]
+    batch[6] = (discord.Embed(title="bad"), None)
+
+    asyncio.run(dispatcher._send_batch(CHANNEL_ID, batch))
+
+    assert _titles(channel) == [f"entry {i}" for i in range(10) if i != 6]
+    assert channel.attempts < 20
+
+
+def test_rejected_text_lines_are_split_too():
+    channel = _RejectingChannel()
+    dispatcher = LogDispatcher(_Bot(channel))
+    batch = [(None, "one"), (None, "bad"), (None, "two"), (None, "three")]
+
+    asyncio.run(dispatcher._send_batch(CHANNEL_ID, batch))
+
+    lines = [line for _, content in channel.sent for line in content.split("\n")]
+    assert lines == ["one", "two", "three"]
+
+
+def test_single_rejected_entry_is_not_retried():
+    channel = _RejectingChannel()
+    dispatcher = LogDispatcher(_Bot(channel))
+
+    asyncio.run(dispatcher._send_batch(CHANNEL_ID, [(discord.Embed(title="bad"), None)]))
+
+    assert channel.sent == []
+    assert channel.attempts == 1
+
+
+def test_queued_entries_survive_a_bad_neighbour(monkeypatch):
+    monkeypatch.setattr(log_dispatcher, "LOG_BATCH_WINDOW", 0.05)
+    monkeypatch.setattr(log_dispatcher, "LOG_CHANNEL_MIN_INTERVAL", 0)
+    channel = _RejectingChannel()
+
+    async def run():
+        dispatcher = LogDispatcher(_Bot(channel))
+        for i in range(5):
+            dispatcher.send(CHANNEL_ID, embed=discord.Embed(title="bad" if i == 2 else f"entry {i}"))
+        await dispatcher.stop(timeout=2.0)
+
+    asyncio.run(run())
+
+    assert _titles(channel) == ["entry 0", "entry 1", "entry 3", "entry 4"]
@@ -0,0 +1,43 @@
+import json
+
+from log_writer import LogWriter
+
+
+def _events(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["id"] for line in f]
+
+
+def test_drop_matching_also_rewrites_rotated_backups(tmp_path):
+    path = str(tmp_path / "infraction.txt")
+    writer = LogWriter(max_bytes=1, backup_count=3, flush_interval=0.01)
+    # max_bytes=1 rolls the file over before every batch, so each flush leaves one file behind
+    for ids in (["a1", "keep1"], ["a1-dup", "keep2"], ["keep3", "a1"]):
+        for infraction_id in ids:
+            writer.write(path, "infraction", id=infraction_id)
+        writer.flush()
+
+    writer.drop_matching(path, "a1")
+    writer.flush()
+
+    assert _events(path) == ["keep3"]
+    assert _events(path + ".1") == ["keep2"]
+    assert _events(path + ".2") == ["keep1"]
+
+
+def test_drop_matching_leaves_untouched_files_alone(tmp_path):
+    path = str(tmp_path / "infraction.txt")
+    writer = LogWriter(max_bytes=1, backup_count=2, flush_interval=0.01)
+    writer.write(path, "infraction", id="old")
+    writer.flush()
+    writer.write(path, "infraction", id="new")
+    writer.flush()
+    backup = tmp_path / "infraction.txt.1"
+    before = backup.stat().st_mtime_ns
+
+    writer.drop_matching(path, "new")
+    writer.flush()
+
+    assert _events(path) == []
+    assert _events(str(backup)) == ["old"]
+    assert backup.stat().st_mtime_ns == before
@@ -0,0 +1,139 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from cogs import MDT
+from cogs.MDT import DEFAULT_AVATAR_URL, RobloxClient
+
+USERS = {"builderman": {"id": 156, "name": "builderman", "displayName": "Builder"}}
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class _StubRoblox:
+    """Local stand-in for the users and thumbnails APIs that counts calls and can be made slow."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.delay = 0.0
+
+    async def usernames(self, request):
+        self.calls["users"] += 1
+        await asyncio.sleep(self.delay)
+        body = await request.json()
+        found = [USERS[name.lower()] for name in body["usernames"] if name.lower() in USERS]
+        return web.json_response({"data": found})
+
+    async def headshot(self, request):
+        self.calls["avatars"] += 1
+        await asyncio.sleep(self.delay)
+        user_id = request.query["userIds"]
+        size = request.query["size"]
+        return web.json_response({"data": [{"targetId": int(user_id), "imageUrl": f"https://cdn.test/{user_id}/{size}.png"}]})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post("/v1/usernames/users", self.usernames)
+        app.router.add_get("/v1/users/avatar-headshot", self.headshot)
+        return app
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = _StubRoblox()
+    stub.monkeypatch = monkeypatch
+    return stub
+
+
+async def _started(stub):
+    """Start the stub on a local port and point RobloxClient's base URLs at it."""
+    server = TestServer(stub.app())
+    await server.start_server()
+    base = str(server.make_url("")).rstrip("/")
+    stub.monkeypatch.setattr(MDT, "ROBLOX_USERS_API", base)
+    stub.monkeypatch.setattr(MDT, "ROBLOX_THUMBNAILS_API", base)
+    return server
+
+
+def test_username_resolves_to_id_and_avatar(stub):
+    async def scenario():
+        server = await _started(stub)
+        client = RobloxClient()
+        try:
+            info, avatar = await client.lookup("BuilderMan")
+        finally:
+            await client.close()
+            await server.close()
+        assert info == {"userId": 156, "username": "builderman", "displayName": "Builder"}
+        assert avatar == "https://cdn.test/156/420x420.png"
+
+    _run(scenario())
+
+
+def test_repeat_lookups_hit_the_cache(stub):
+    async def scenario():
+        server = await _started(stub)
+        client = RobloxClient()
+        try:
+            first = await client.lookup("builderman")
+            # Different casing shares the cache entry
+            for name in ("builderman", "BUILDERMAN", "BuilderMan"):
+                assert await client.lookup(name) == first
+        finally:
+            await client.close()
+            await server.close()
+        assert stub.calls == {"users": 1, "avatars": 1}
+
+    _run(scenario())
+
+
+def test_missing_user_is_cached_briefly(stub, monkeypatch):
+    monkeypatch.setattr(MDT, "ROBLOX_MISS_TTL", 0.2)
+
+    async def scenario():
+        server = await _started(stub)
+        client = RobloxClient()
+        try:
+            assert await client.lookup("nobody") == (None, None)
+            assert await client.lookup("Nobody") == (None, None)
+            assert stub.calls == {"users": 1}
+            await asyncio.sleep(0.3)
+            # The miss expires on its own, much sooner than a hit
+            assert await client.lookup("nobody") == (None, None)
+            assert stub.calls == {"users": 2}
+        finally:
+            await client.close()
+            await server.close()
+
+    _run(scenario())
+
+
+def test_timeouts(stub, monkeypatch):
+    monkeypatch.setattr(MDT, "ROBLOX_TIMEOUT", 0.2)
+
+    async def scenario():
+        server = await _started(stub)
+        client = RobloxClient()
+        try:
+            # A slow users API raises so the arrest modal can fall back to the typed username
+            stub.delay = 0.5
+            with pytest.raises(asyncio.TimeoutError):
+                await client.get_user_info("builderman")
+            # A slow thumbnails API falls back to the default avatar
+            assert await client.get_avatar_url(156) == DEFAULT_AVATAR_URL
+
+            # Neither failure was cached
+            stub.delay = 0.0
+            info, avatar = await client.lookup("builderman")
+            assert info["userId"] == 156
+            assert avatar == "https://cdn.test/156/420x420.png"
+        finally:
+            await client.close()
+            await server.close()
+
+    _run(scenario())
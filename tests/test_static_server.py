@@ -0,0 +1,120 @@
+import asyncio
+import gzip
+import os
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+import static_server
+from static_server import StaticAssetServer
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _client(root):
+    app = web.Application()
+    StaticAssetServer(str(root)).add_routes(app)
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    return client
+
+
+def test_etag_cache_control_and_304(tmp_path):
+    (tmp_path / "banner.png").write_bytes(b"\x89PNG" + os.urandom(4096))
+
+    async def scenario():
+        client = await _client(tmp_path)
+        try:
+            r = await client.get("/banner.png")
+            assert r.status == 200
+            etag = r.headers["ETag"]
+            assert etag.startswith('"') and etag.endswith('"')
+            assert "max-age=" in r.headers["Cache-Control"]
+            assert len(await r.read()) == 4100
+
+            r = await client.get("/banner.png", headers={"If-None-Match": etag})
+            assert r.status == 304
+            r = await client.get("/banner.png", headers={"If-None-Match": "W/" + etag})
+            assert r.status == 304
+        finally:
+            await client.close()
+
+    _run(scenario())
+
+
+def test_gzip_variant_and_hidden_paths(tmp_path):
+    (tmp_path / "style.css").write_text("body { color: red; }\n" * 200)
+    (tmp_path / ".env").write_text("SECRET=1")
+
+    async def scenario():
+        client = await _client(tmp_path)
+        try:
+            r = await client.get("/style.css", headers={"Accept-Encoding": "gzip"}, auto_decompress=False)
+            assert r.headers["Content-Encoding"] == "gzip"
+            assert gzip.decompress(await r.read()).decode() == "body { color: red; }\n" * 200
+            r = await client.get("/style.css", headers={"Accept-Encoding": "identity"})
+            assert "Content-Encoding" not in r.headers
+            assert (await client.get("/.env")).status == 404
+            assert (await client.get("/../README.md")).status == 404
+        finally:
+            await client.close()
+
+    _run(scenario())
+
+
+def test_warm_hits_do_no_disk_io(tmp_path, monkeypatch):
+    (tmp_path / "logo.png").write_bytes(os.urandom(2048))
+    root = str(tmp_path)
+    stats, reads = [], []
+    real_stat, real_read = os.stat, static_server._read_variants
+
+    def counting_stat(path, *args, **kwargs):
+        if str(path).startswith(root):
+            stats.append(path)
+        return real_stat(path, *args, **kwargs)
+
+    def counting_read(path, content_type):
+        reads.append(path)
+        return real_read(path, content_type)
+
+    monkeypatch.setattr(os, "stat", counting_stat)
+    monkeypatch.setattr(static_server, "_read_variants", counting_read)
+    monkeypatch.setattr(static_server, "STATIC_REVALIDATE_SECONDS", 60.0)
+
+    async def scenario():
+        client = await _client(tmp_path)
+        try:
+            assert (await client.get("/logo.png")).status == 200
+            cold_stats, cold_reads = len(stats), len(reads)
+            for _ in range(50):
+                r = await client.get("/logo.png")
+                await r.read()
+                assert r.status == 200
+            assert (len(stats), len(reads)) == (cold_stats, cold_reads)
+            assert cold_reads == 1
+        finally:
+            await client.close()
+
+    _run(scenario())
+
+
+def test_changed_file_is_reloaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(static_server, "STATIC_REVALIDATE_SECONDS", 0.0)
+    target = tmp_path / "notes.txt"
+    target.write_text("first")
+
+    async def scenario():
+        client = await _client(tmp_path)
+        try:
+            first = await client.get("/notes.txt")
+            assert await first.text() == "first"
+            target.write_text("second version")
+            second = await client.get("/notes.txt")
+            assert await second.text() == "second version"
+            assert second.headers["ETag"] != first.headers["ETag"]
+        finally:
+            await client.close()
+
+    _run(scenario())